@@ -1,11 +1,89 @@
+#include <pybind11/numpy.h> // Структурированные массивы для пакетного выполнения
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h> // Необходим для автоматической конвертации std::vector
 
+#include <cctype>
+#include <cstring>
+#include <limits>
+#include <mutex>
+#include <sstream>
+
+#include "../include/fault_sim.hpp"
+#include "../include/program.hpp"
 #include "../include/vram.hpp"
 #include "../include/vram_test.hpp" // Не забудь добавить этот хедер
 
 namespace py = pybind11;
 
+// Отдаём вектор в NumPy без копирования: массив владеет вектором через капсулу
+template <typename T>
+static py::array_t<T> to_numpy(std::vector<T> &&vec) {
+    auto *const owned = new std::vector<T>(std::move(vec));
+    py::capsule const owner(owned, [](void *p) { delete static_cast<std::vector<T> *>(p); });
+    return py::array_t<T>(owned->size(), owned->data(), owner);
+}
+
+// dtype записей пакетного выполнения: (type: uint8, i: адрес).
+// Регистрируется при первом использовании, чтобы импорт модуля не тянул NumPy
+static py::array_t<VramTest::StepResult> results_to_numpy(VramTest::StepResults &&results) {
+    static bool const registered = [] {
+        PYBIND11_NUMPY_DTYPE(VramTest::StepResult, type, i);
+        return true;
+    }();
+    (void)registered;
+    return to_numpy(std::move(results));
+}
+
+template <typename T>
+static int64_t load_int(char const *const item) {
+    T value;
+    std::memcpy(&value, item, sizeof(T));
+    return value;
+}
+
+// Целочисленный 1-D массив из любого объекта с буферным протоколом (NumPy, array.array)
+// или из последовательности чисел. NumPy для этого не импортируется
+template <typename T>
+static std::vector<T> to_ints(py::handle const obj) {
+    if (!PyObject_CheckBuffer(obj.ptr())) return obj.cast<std::vector<T>>();
+
+    py::buffer_info const info = py::reinterpret_borrow<py::buffer>(obj).request();
+    char const kind = info.format.back();
+    if (info.ndim != 1 || !std::strchr("bBhHiIlLqQ", kind))
+        throw py::type_error("1-D integer array expected");
+
+    bool const is_signed = std::islower(kind);
+    std::vector<T> out(info.size);
+    for (py::ssize_t k = 0; k < info.size; k++) {
+        char const *const item = static_cast<char const *>(info.ptr) + k * info.strides[0];
+        int64_t value = 0;
+        switch (info.itemsize) {
+        case 1: value = is_signed ? load_int<int8_t>(item) : load_int<uint8_t>(item); break;
+        case 2: value = is_signed ? load_int<int16_t>(item) : load_int<uint16_t>(item); break;
+        case 4: value = is_signed ? load_int<int32_t>(item) : load_int<uint32_t>(item); break;
+        case 8: value = load_int<int64_t>(item); break;
+        default: throw py::type_error("Unsupported integer size");
+        }
+        if (value < 0 || static_cast<uint64_t>(value) > std::numeric_limits<T>::max())
+            throw py::value_error("Value out of range");
+        out[k] = static_cast<T>(value);
+    }
+    return out;
+}
+
+// Потоки: каждая Vram защищена своим мьютексом (Vram::mutex), им же — все TestRunner на ней.
+// Любой вызов, трогающий память или состояние теста, берёт его. Ждать мьютекс с GIL нельзя
+// (его держатель может ждать GIL), поэтому занятый мьютекс ждём, отпустив GIL.
+// raw_view не синхронизируется: это просмотр «как есть» на момент чтения
+static std::unique_lock<std::mutex> lock_ram(Vram const &ram) {
+    std::unique_lock<std::mutex> lock(ram.mutex(), std::try_to_lock);
+    if (!lock.owns_lock()) {
+        py::gil_scoped_release release;
+        lock.lock();
+    }
+    return lock;
+}
+
 PYBIND11_MODULE(vram_backend, m) {
     // ===========================
     // Vram Binding
@@ -26,11 +104,90 @@ PYBIND11_MODULE(vram_backend, m) {
         .value("DECEPTIVE_READ_1", Vram::ErrType::DECEPTIVE_READ_1)
         .export_values();
 
-    vram.def(py::init<size_t>())
-        .def("read", &Vram::read)
-        .def("write", &Vram::write)
-        .def("set_error", &Vram::set_error)
-        .def("get_error", &Vram::get_error);
+    // Ширина слова: 8, 16, 32 или 64 бита (иначе ValueError)
+    vram.def(py::init<size_t, unsigned>(), py::arg("len"), py::arg("word_bits") = Vram::default_word_bits,
+             py::call_guard<py::gil_scoped_release>())
+        .def_readonly("word_bits", &Vram::word_bits)
+        .def("__len__", [](Vram const &self) { return self.len; })
+        .def("read", [](Vram const &self, size_t const i) {
+            auto const lock = lock_ram(self);
+            return self.read(i);
+        })
+        .def("write", [](Vram &self, size_t const i, Vram::Word const word) {
+            if (word & ~self.word_mask) throw py::value_error("Value doesn't fit the word width");
+            auto const lock = lock_ram(self);
+            self.write(i, word);
+        })
+        .def("set_error", [](Vram &self, size_t const i, unsigned const bit, Vram::ErrType const err) {
+            auto const lock = lock_ram(self);
+            self.set_error(i, bit, err);
+        })
+        .def("get_error", [](Vram const &self, size_t const i, unsigned const bit) {
+            auto const lock = lock_ram(self);
+            return self.get_error(i, bit);
+        })
+        // Массовое назначение: три массива одинаковой длины (адреса, биты, значения ErrType)
+        .def("set_errors", [](Vram &self, py::handle addrs, py::handle bits, py::handle types) {
+            auto const a = to_ints<Vram::Addr>(addrs);
+            auto const b = to_ints<uint8_t>(bits);
+            auto const t = to_ints<uint8_t>(types);
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.mutex());
+            self.set_errors(a, b, t);
+        }, py::arg("addrs"), py::arg("bits"), py::arg("types"))
+        .def("clear_errors", [](Vram &self) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.mutex());
+            self.clear_errors();
+        })
+
+        // Представление данных без копирования и без применения ошибок (только чтение).
+        // base = сам объект Vram, поэтому массив держит память живой
+        .def("raw_view", [](py::object self) {
+            Vram const &ram = self.cast<Vram const &>();
+            // Тип элементов — беззнаковое целое ширины слова (uint8 ... uint64)
+            py::dtype const dtype("u" + std::to_string(ram.word_bytes()));
+            py::array view(dtype, {ram.len}, {ram.word_bytes()}, ram.data(), self);
+            view.attr("setflags")(py::arg("write") = false);
+            return view;
+        })
+        // Таблица len x word_bits со значениями ErrType для каждого бита
+        .def("error_map", [](Vram const &self) {
+            py::array_t<uint8_t> map({static_cast<size_t>(self.len), size_t{self.word_bits}});
+            uint8_t *const out = map.mutable_data();
+            {
+                py::gil_scoped_release release;
+                std::lock_guard const lock(self.mutex());
+                self.error_map(out);
+            }
+            return map;
+        })
+        // Значения ErrType всех битов одного слова (массив длины word_bits)
+        .def("word_errors", [](Vram const &self, size_t const i) {
+            py::array_t<uint8_t> errs(self.word_bits);
+            auto const lock = lock_ram(self);
+            self.word_errors(i, errs.mutable_data());
+            return errs;
+        }, py::arg("i"))
+        // Адреса слов, изменившихся с прошлого вызова (запись или побочный эффект чтения)
+        .def("take_dirty", [](Vram &self) {
+            auto const lock = lock_ram(self);
+            return to_numpy(self.take_dirty());
+        })
+        // Сколько памяти занимают данные и таблицы неисправностей (байты)
+        .def("memory_stats", [](Vram const &self) {
+            auto const stats = [&] {
+                auto const lock = lock_ram(self);
+                return self.memory_stats();
+            }();
+            py::dict d;
+            d["data_bytes"] = stats.data_bytes;
+            d["fault_bytes"] = stats.fault_bytes;
+            d["index_bytes"] = stats.index_bytes;
+            d["faulty_words"] = stats.faulty_words;
+            d["dense_index"] = stats.dense_index;
+            return d;
+        });
 
     // ===========================
     // TestRunner (VramTest) Binding
@@ -54,14 +211,185 @@ PYBIND11_MODULE(vram_backend, m) {
     step_result.def_readonly("type", &VramTest::StepResult::type)
                .def_readonly("i", &VramTest::StepResult::i);
 
-    // Методы самого TestRunner
+    // Скомпилированная программа: создаётся один раз, используется многими TestRunner
+    py::class_<Program, std::shared_ptr<Program>>(m, "Program")
+        .def("__len__", &Program::size)
+        // Предсказание числа операций прогона на памяти из ram_len слов без выполнения:
+        // словарь reads/writes/asserts/steps/exact или None, если циклы не удалось разобрать
+        .def("estimate", [](Program const &self, size_t const ram_len) -> py::object {
+            auto const estimate = self.estimate(ram_len);
+            if (!estimate) return py::none();
+            py::dict d;
+            d["reads"] = estimate->reads;
+            d["writes"] = estimate->writes;
+            d["asserts"] = estimate->asserts;
+            d["steps"] = estimate->steps;
+            d["exact"] = estimate->exact;
+            return d;
+        }, py::arg("ram_len"));
+
+    // Методы самого TestRunner.
+    // keep_alive<1, 2>: TestRunner держит ссылку на Vram, поэтому Vram живёт не меньше него
+    // (иначе TestRunner(Vram(n), path) работал бы с уже удалённой памятью)
     test_runner
-        // Конструктор принимает ссылку на Vram и путь к файлу
-        // pybind11 корректно обработает ссылку на существующий объект Vram
-        .def(py::init<Vram&, std::string const>())
+        // Конструктор принимает ссылку на Vram и путь к файлу; компиляция идёт без GIL
+        .def(py::init<Vram&, std::string const>(), py::keep_alive<1, 2>(),
+             py::call_guard<py::gil_scoped_release>())
+        // ...или уже скомпилированную программу
+        .def(py::init([](Vram &ram, std::shared_ptr<Program> const &program) {
+            return new VramTest(ram, program);
+        }), py::keep_alive<1, 2>())
+        .def_static("compile", [](std::string const &path) {
+            return std::const_pointer_cast<Program>(Program::compile_file(path));
+        }, py::arg("path"), py::call_guard<py::gil_scoped_release>())
+        // Компиляция из текста программы (задания сервера приходят без файла)
+        .def_static("compile_source", [](std::string const &source) {
+            std::istringstream stream(source);
+            return std::const_pointer_cast<Program>(Program::compile(stream));
+        }, py::arg("source"), py::call_guard<py::gil_scoped_release>())
         
-        .def("step", &VramTest::step)
+        .def("step", [](VramTest &self) {
+            auto const lock = lock_ram(self.ram());
+            return self.step();
+        })
+
+        // Пакетное выполнение: все события одним массивом записей (type, i).
+        // Цикл шагов идёт без GIL, чтобы другие потоки Python (GUI, другие прогоны) не ждали его
+        .def("run", [](VramTest &self, size_t const max_steps) {
+            VramTest::StepResults results;
+            {
+                py::gil_scoped_release release;
+                std::lock_guard const lock(self.ram().mutex());
+                results = self.run(max_steps);
+            }
+            return results_to_numpy(std::move(results));
+        }, py::arg("max_steps"))
+        .def("run_to_end", [](VramTest &self) {
+            VramTest::StepResults results;
+            {
+                py::gil_scoped_release release;
+                std::lock_guard const lock(self.ram().mutex());
+                results = self.run_to_end();
+            }
+            return results_to_numpy(std::move(results));
+        })
+        .def("finish", [](VramTest &self) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.ram().mutex());
+            self.finish();
+        })
+        // Число событий с начала прогона (без ENDED) и последнее из них (или None)
+        .def("steps", [](VramTest const &self) {
+            auto const lock = lock_ram(self.ram());
+            return self.steps();
+        })
+        .def("last_result", [](VramTest const &self) {
+            auto const lock = lock_ram(self.ram());
+            return self.last_result();
+        })
+        // Контрольные точки (снимок памяти и состояния машины) каждые every событий;
+        // страницы памяти, не менявшиеся между точками, общие. 0 — выключить
+        .def("enable_checkpoints", [](VramTest &self, size_t const every, size_t const budget_bytes) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.ram().mutex());
+            self.enable_checkpoints(every, budget_bytes);
+        }, py::arg("every"), py::arg("budget_bytes") = VramTest::default_checkpoint_budget)
+        // Возврат к состоянию после step событий: от ближайшей точки до него и дальше шагами.
+        // Изменённые слова попадают в take_dirty; IndexError, если точки до step нет
+        .def("seek", [](VramTest &self, size_t const step) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.ram().mutex());
+            self.seek(step);
+        }, py::arg("step"))
+        // Сводка по точкам: число, первая, шаг между ними, байт памяти
+        .def("checkpoints", [](VramTest const &self) {
+            auto const lock = lock_ram(self.ram());
+            auto const &checkpoints = self.checkpoints();
+            py::dict d;
+            d["count"] = checkpoints.size();
+            d["first"] = checkpoints.empty() ? py::object(py::none()) : py::int_(checkpoints.front().step);
+            d["every"] = self.checkpoint_every();
+            d["bytes"] = self.checkpoint_bytes();
+            return d;
+        })
+        // Запись всех следующих событий в бинарный файл трассы (см. trace.hpp)
+        .def("start_trace", [](VramTest &self, std::string const &path) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.ram().mutex());
+            self.start_trace(path);
+        }, py::arg("path"))
+        .def("stop_trace", [](VramTest &self) {
+            py::gil_scoped_release release;
+            std::lock_guard const lock(self.ram().mutex());
+            self.stop_trace();
+        })
+        // Счётчики по опкодам, переходы, обращения к неисправным словам (сбрасываются при включении)
+        .def("enable_stats", [](VramTest &self, bool const enable) {
+            auto const lock = lock_ram(self.ram());
+            self.enable_stats(enable);
+        }, py::arg("enable") = true)
+        // Сводка для профилирования: счётчики (если включены) и время фаз
+        .def("stats", [](VramTest const &self) {
+            auto const lock = lock_ram(self.ram());
+            auto const &program = self.vmach().program();
+            auto const &counts = self.event_counts();
+            py::dict events;
+            events["WRITE"] = counts[VramTest::StepResult::WRITE];
+            events["TEST_SUCCEEDED"] = counts[VramTest::StepResult::TEST_SUCCEEDED];
+            events["TEST_FAILED"] = counts[VramTest::StepResult::TEST_FAILED];
+
+            py::dict d;
+            d["program_size"] = program.size();
+            d["events"] = events;
+            d["compile_s"] = program.compile_seconds;
+            d["run_s"] = self.run_seconds();
+
+            auto const *const stats = self.vmach().stats();
+            d["enabled"] = stats != nullptr;
+            if (!stats) return d;
+            py::dict ops;
+            uint64_t instructions = 0;
+            for (size_t op = 0; op < Program::OP_COUNT; op++) {
+                if (!stats->ops[op]) continue;
+                ops[py::str(Program::name_of(static_cast<Program::Op>(op)))] = stats->ops[op];
+                instructions += stats->ops[op];
+            }
+            d["instructions"] = instructions;
+            d["ops"] = ops;
+            d["reads"] = stats->ops[Program::READ];
+            d["writes"] = stats->ops[Program::WRITE];
+            d["jumps"] = stats->jumps;
+            d["fault_reads"] = stats->fault_reads;
+            d["fault_writes"] = stats->fault_writes;
+            return d;
+        })
+        // Количество событий каждого типа (индекс = значение StepResult.Type)
+        .def("event_counts", [](VramTest const &self) {
+            auto const lock = lock_ram(self.ram());
+            return self.event_counts();
+        })
         
         // stl.h автоматически сконвертирует std::vector в Python list
-        .def("detected_errors", &VramTest::detected_errors);
+        .def("detected_errors", [](VramTest &self) {
+            auto const lock = lock_ram(self.ram());
+            return self.detected_errors();
+        });
+
+    // Бит-параллельная симуляция: один прогон программы проверяет до 64 одиночных неисправностей
+    // одного типа. Свои данные, без Vram, поэтому блокировки не нужны; run идёт без GIL
+    py::class_<FaultSim>(m, "FaultSim")
+        .def(py::init([](std::shared_ptr<Program> const &program, size_t const len, unsigned const word_bits) {
+            return new FaultSim(program, len, word_bits);
+        }), py::arg("program"), py::arg("len"), py::arg("word_bits") = Vram::default_word_bits)
+        .def_readonly_static("lanes", &FaultSim::lanes)
+        .def_readonly("len", &FaultSim::len)
+        .def_readonly("word_bits", &FaultSim::word_bits)
+        // Маска дорожек (бит l — неисправность addrs[l], bits[l]), в которых сработал assert!,
+        // или None, если ход программы зависит от неисправности
+        .def("run", [](FaultSim &self, Vram::ErrType const type, py::handle addrs, py::handle bits) {
+            auto const a = to_ints<Vram::Addr>(addrs);
+            auto const b = to_ints<uint8_t>(bits);
+            py::gil_scoped_release release;
+            return self.run(type, a, b);
+        }, py::arg("type"), py::arg("addrs"), py::arg("bits"));
 }
\ No newline at end of file
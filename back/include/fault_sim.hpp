@@ -0,0 +1,108 @@
+#ifndef FAULT_SIM_HPP
+#define FAULT_SIM_HPP
+
+#include <array>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <optional>
+#include <span>
+#include <unordered_map>
+#include <vector>
+
+#include "program.hpp"
+#include "vram.hpp"
+
+/// Bit-parallel fault simulation, the way classic parallel fault simulators do it: one run of a
+/// program stands for up to 64 runs ("lanes"), each on a fresh RAM with a single fault of the
+/// same type. A value that is the same in every lane is kept as one word; one that differs is
+/// bit-sliced: bit `l` of `slices[k]` is bit `k` of the value in lane `l`. Values may differ
+/// between lanes everywhere except in the control flow: `loop`, `then` and `i=`.
+class FaultSim {
+   public:
+    using Word = Vram::Word;
+    using Addr = Vram::Addr;
+    static constexpr unsigned lanes = 64;
+    using Slices = std::array<uint64_t, Vram::max_word_bits>;
+
+   public:
+    /// Throws `std::invalid_argument` unless `word_bits` is 8, 16, 32 or 64.
+    FaultSim(std::shared_ptr<Program const> program, size_t const len, unsigned const word_bits);
+
+    /// Runs the program once for `addrs.size() <= lanes` lanes: lane `l` has a `type` fault at
+    /// bit `bits[l]` of word `addrs[l]`. Returns the mask of lanes in which an `assert!` failed,
+    /// or nothing if the control flow depends on a faulty value (run those lanes one by one
+    /// then). Throws `std::runtime_error` on the same program errors as `VramTest`.
+    std::optional<uint64_t> run(Vram::ErrType const type, std::span<Addr const> const addrs,
+                                std::span<uint8_t const> const bits);
+
+   public:
+    size_t const len;
+    unsigned const word_bits;
+    Word const word_mask;
+
+   private:
+    /// A value of every lane: `word` if it is the same in all of them, otherwise the slices in
+    /// `_pool[slot]`, which the value owns.
+    struct Value {
+        Word word = 0;
+        uint32_t slot = uniform;
+    };
+    static constexpr uint32_t uniform = UINT32_MAX;
+    /// Thrown when the lanes would take different paths.
+    struct Diverged {};
+
+    void step(Program::Instr const &instr);
+
+    Value read(size_t const i);
+    void write(size_t const i, Value const value);
+    /// Makes `value` the stored word at `i`, without faults; takes over its slices.
+    void write_stored(size_t const i, Value const value);
+
+    Value pop();
+    /// Pops a value that must be the same in every lane.
+    Word pop_uniform();
+    inline void push(Value const value) { _stack.push_back(value); }
+    inline void push(Word const word) { _stack.push_back({word & word_mask}); }
+
+    /// A new value to fill in: `_pool[slot]`.
+    Value alloc();
+    void release(Value const value);
+    Value copy(Value const value);
+    /// Releases the slices of `value` if all its lanes turned out equal.
+    Value normalize(Value const value);
+    /// The slices of `value`; a uniform value is spread into `scratch`.
+    Slices const &slices(Value const value, Slices &scratch) const;
+    /// Lanes in which `value` isn't zero.
+    uint64_t nonzero(Value const value) const;
+    /// -1 in the lanes of `mask`, 0 in the others.
+    Value from_mask(uint64_t const mask);
+    /// Applies `op` to every pair of slices of `a` and `b` and releases them.
+    template <typename Op>
+    Value bitwise(Value const a, Value const b, Op const op);
+
+    inline bool is_special(size_t const i) const { return (_special[i / 64] >> (i % 64)) & 1; }
+
+   private:
+    std::shared_ptr<Program const> _program;
+    size_t _pc = 0;
+    Addr _i = 0;
+    std::vector<Value> _stack;
+    std::vector<Addr> _hidden_stack;
+
+    Vram::ErrType _type = Vram::NO;
+    /// The words of a RAM every lane agrees on.
+    std::vector<Word> _ram;
+    /// Words that have faults in some lanes or differ between lanes; the others are in `_ram`.
+    std::vector<uint64_t> _special;
+    /// Address -> for every bit, the lanes that have a fault there.
+    std::unordered_map<Addr, Slices> _faults;
+    /// Address -> the word in every lane, where lanes differ.
+    std::unordered_map<Addr, Value> _diverged;
+    /// Slices of the values that differ between lanes; a deque, so references stay valid.
+    std::deque<Slices> _pool;
+    std::vector<uint32_t> _free_slots;
+    uint64_t _detected = 0;
+};
+
+#endif
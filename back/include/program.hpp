@@ -0,0 +1,89 @@
+#ifndef PROGRAM_HPP
+#define PROGRAM_HPP
+
+#include <cstdint>
+#include <istream>
+#include <map>
+#include <memory>
+#include <optional>
+#include <string>
+#include <vector>
+
+#include "vram.hpp"
+
+/// A compiled kidscript: an array of instructions with every jump target resolved.
+class Program {
+   public:
+    using Word = Vram::Word;
+    enum Op : uint8_t {
+        CONST,
+        LOOP,
+        ENDLOOP,
+        ASC,
+        DESC,
+        THEN,
+        ENDTHEN,
+        ASSERT,
+        READ,
+        WRITE,
+        SWAP,
+        DROP,
+        CUR,
+        LAST,
+        EQUAL,
+        GREATER,
+        LESS,
+        NOT,
+        XOR,
+        OR,
+        AND,
+        LSHIFT,
+        ADD,
+        NEG,
+        PUSH_I,
+        POP_I,
+        DUMP,
+
+        OP_COUNT
+    };
+    struct Instr {
+        Op op;
+        /// The value for `CONST`; the index of the instruction to jump to for `ENDLOOP` (right
+        /// after the matching `LOOP`) and `THEN` (right after the matching `ENDTHEN`).
+        size_t arg = 0;
+    };
+    /// Counts of one run predicted by `estimate`.
+    struct Estimate {
+        uint64_t reads = 0, writes = 0, asserts = 0;
+        /// Every executed instruction.
+        uint64_t steps = 0;
+        /// `false` when the program has `then` blocks: they are counted as always taken, so the
+        /// counts are an upper bound.
+        bool exact = true;
+    };
+
+   public:
+    /// Tokenizes and validates the source. Throws `std::runtime_error` on unknown ops and
+    /// unbalanced `loop`/`endloop` or `then`/`endthen`.
+    static std::shared_ptr<Program const> compile(std::istream &source);
+    static std::shared_ptr<Program const> compile_file(std::string const &path);
+
+    inline size_t size() const { return code.size(); }
+    /// The source name of `op` (`"const"` for constants).
+    static std::string name_of(Op const op);
+
+    /// Predicts the counts of a run on `ram_len` words without running it: every `loop` starts
+    /// from the constant right before it and repeats until the `asc`/`desc` of its body bring `i`
+    /// back to 0. Empty when that can't be worked out: the start is not a constant, the body sets
+    /// `i=` or moves `i` inside a `then`, or the loop never ends.
+    std::optional<Estimate> estimate(size_t const ram_len) const;
+
+   public:
+    std::vector<Instr> code;
+    /// How long `compile` took.
+    double compile_seconds = 0;
+
+    static std::map<std::string, Op> const opcodes;
+};
+
+#endif
@@ -0,0 +1,97 @@
+#ifndef TRACE_HPP
+#define TRACE_HPP
+
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <string>
+#include <vector>
+
+#include "vram.hpp"
+
+/// Append-only binary trace of test events, meant to be memory-mapped by the reader.
+///
+/// Layout (native byte order):
+///  - `Header`;
+///  - the initial memory contents: `words` words of `word_bits / 8` bytes, padded to 8 bytes;
+///  - one record of `record_bytes` per event until the end of the file.
+///
+/// A record holds `Addr addr` at offset 0, `uint16_t op_type` at 4 and the word at
+/// `value_offset(word_bytes)`; the rest is zero padding.
+///  - `addr`: the address of the event;
+///  - `op_type`: `op << 2 | type`, where `op` is the index of the instruction that produced the
+///    event, saturated to `max_op`, and `type` is a `VramTest::StepResult::Type` other than `ENDED`;
+///  - the word: the stored word at `addr` right after the event (read faults may change it too).
+class TraceWriter {
+   public:
+    using Word = Vram::Word;
+    using Addr = Vram::Addr;
+
+    static constexpr char magic[8] = {'K', 'I', 'D', 'S', 'T', 'R', 'C', '2'};
+
+    struct Header {
+        char magic[8];
+        uint32_t word_bits;
+        uint32_t record_bytes;
+        uint64_t words;
+        uint64_t reserved = 0;
+    };
+    static constexpr size_t max_op = (1 << 14) - 1;
+
+    /// Words of up to 2 bytes follow `op_type`; wider ones are aligned to 8.
+    static constexpr size_t value_offset(size_t const word_bytes) { return word_bytes <= 2 ? 6 : 8; }
+    static constexpr size_t record_bytes(size_t const word_bytes) {
+        return word_bytes <= 2 ? 8 : 8 + word_bytes;
+    }
+
+   public:
+    /// Creates (truncates) the file and writes the header with a snapshot of `ram`.
+    TraceWriter(std::string const &path, Vram const &ram);
+    TraceWriter(TraceWriter const &other) = delete;
+    ~TraceWriter() { flush(); }
+
+    inline void record(uint8_t const type, Addr const addr, Word const value, size_t const op) {
+        std::byte *const out = _buffer.data() + _count * _record_bytes;
+        uint16_t const op_type = static_cast<uint16_t>(std::min(op, max_op) << 2 | (type & 3));
+        std::memcpy(out, &addr, sizeof(addr));
+        std::memcpy(out + sizeof(addr), &op_type, sizeof(op_type));
+        store_word(out + _value_offset, value);
+        if (++_count == buffer_records) flush();
+    }
+    void flush();
+    /// Events recorded so far.
+    inline size_t records() const { return _flushed + _count; }
+    /// Drops every event after the first `records`.
+    void truncate(size_t const records);
+
+   private:
+    static constexpr size_t buffer_records = 1 << 16;
+
+    inline void store_word(std::byte *const out, Word const value) const {
+        switch (_word_bytes) {
+        case 1: *reinterpret_cast<uint8_t *>(out) = static_cast<uint8_t>(value); break;
+        case 2: {
+            uint16_t const v = static_cast<uint16_t>(value);
+            std::memcpy(out, &v, sizeof(v));
+        } break;
+        case 4: {
+            uint32_t const v = static_cast<uint32_t>(value);
+            std::memcpy(out, &v, sizeof(v));
+        } break;
+        default: std::memcpy(out, &value, sizeof(value));
+        }
+    }
+
+    std::string const _path;
+    std::ofstream _file;
+    /// Where the first record starts in the file.
+    size_t _records_offset = 0;
+    size_t _flushed = 0;
+    size_t const _word_bytes, _value_offset, _record_bytes;
+    /// `buffer_records` records; padding bytes are never written, so they stay zero.
+    std::vector<std::byte> _buffer;
+    size_t _count = 0;
+};
+
+#endif
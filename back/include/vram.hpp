@@ -2,15 +2,25 @@
 #define VRAM_HPP
 
 #include <array>
+#include <bit>
 #include <cstddef>
 #include <cstdint>
 #include <cstdlib>
 #include <cstring>
+#include <memory>
+#include <mutex>
+#include <new>
+#include <span>
 #include <unordered_map>
+#include <vector>
 
 class Vram {
    public:
-    using Word = uint16_t;
+    /// A word value. Words are `word_bits` wide (8, 16, 32 or 64, chosen per RAM) and stored
+    /// packed at that width; values passed around are always zero above `word_bits`.
+    using Word = uint64_t;
+    /// Word address. Kept separate from `Word` so RAM size isn't limited by the word width.
+    using Addr = uint32_t;
 
     enum ErrType {
         NO = 0,
@@ -25,38 +35,201 @@ class Vram {
         DECEPTIVE_READ_0,
         DECEPTIVE_READ_1,
     };
-    using WordErrs = std::array<ErrType, sizeof(Word) * 8>;
+    static constexpr unsigned max_word_bits = sizeof(Word) * 8;
+    static constexpr unsigned default_word_bits = 16;
 
-   public:
-    explicit Vram(size_t const len) : len(len), _data(new Word[len]) {
-        for (size_t i = 0; i < len; i++) _data[i] = Word{};
+    /// Everything a word's errors do, folded into bit masks.
+    struct WordMasks {
+        /// Applied to a written word: `(word & write_and) | write_or`.
+        Word write_and = static_cast<Word>(~Word{}), write_or = 0;
+        /// Side effects of a read on the stored word: `(stored | read_set) & ~read_clear`.
+        Word read_set = 0, read_clear = 0;
+        /// Bits a read returns as they were before its side effects.
+        Word read_keep = 0;
+        /// Applied to the returned word: `(word & read_and) | read_or`.
+        Word read_and = static_cast<Word>(~Word{}), read_or = 0;
+    };
+    /// A word with at least one error. Its masks are kept apart, in `_masks`, so reads and
+    /// writes don't pull the per-bit types into the cache.
+    struct FaultyWord {
+        Addr addr;
+        std::array<uint8_t, max_word_bits> errs;
+    };
+    /// The stored words at some moment, in pages of `page_bytes`. Snapshots taken one after
+    /// another share the pages that weren't written in between (see `snapshot`).
+    struct Snapshot {
+        using Page = std::shared_ptr<std::byte const[]>;
+        std::vector<Page> pages;
+        size_t len = 0;
+        unsigned word_bits = 0;
     };
+    static constexpr size_t page_bytes = 4096;
+    struct MemoryStats {
+        size_t data_bytes, fault_bytes, index_bytes;
+        size_t faulty_words;
+        bool dense_index;
+    };
+
+   public:
+    /// Returns `word_bits`; throws `std::invalid_argument` unless it is 8, 16, 32 or 64.
+    static unsigned checked_word_bits(unsigned const word_bits);
 
-    Vram(Vram const &vram) : len(vram.len), _data(new Word[vram.len]), _errors(vram._errors) {
-        for (size_t i = 0; i < len; i++) _data[i] = vram._data[i];
+    /// Throws `std::invalid_argument` unless `word_bits` is 8, 16, 32 or 64.
+    explicit Vram(size_t const len, unsigned const word_bits = default_word_bits)
+    : len(len),
+      word_bits(checked_word_bits(word_bits)),
+      word_mask(word_bits == max_word_bits ? ~Word{} : (Word{1} << word_bits) - 1),
+      _page_shift(std::countr_zero(page_bytes / (word_bits / 8))),
+      _data(allocate(len, word_bits / 8)),
+      _faulty((len + 63) / 64, 0),
+      _touched((page_count() + 63) / 64, 0),
+      _dirty(len, false) {};
+
+    Vram(Vram const &vram)
+    : len(vram.len),
+      word_bits(vram.word_bits),
+      word_mask(vram.word_mask),
+      _page_shift(vram._page_shift),
+      _data(allocate(vram.len, vram.word_bytes())),
+      _faulty(vram._faulty),
+      _faults(vram._faults),
+      _masks(vram._masks),
+      _sparse_slots(vram._sparse_slots),
+      _dense_slots(vram._dense_slots),
+      _touched(vram._touched),
+      _dirty(vram._dirty),
+      _dirty_addrs(vram._dirty_addrs) {
+        std::memcpy(_data, vram._data, len * word_bytes());
     };
 
-    ~Vram() { delete[] _data; }
+    ~Vram() { std::free(_data); }
 
     /// Gets a word at `i`ndex of the ram with set errors applied.
-    Word read(size_t const i) const;
-    /// Writes a word at `i`ndex to the ram with set errors applied.
-    void write(size_t const i,
-               Word const word);  // don't try converting into an operator
-
-    inline ErrType get_error(size_t const i, unsigned const bit_i) { return _errors[i][bit_i]; }
-    inline void set_error(size_t const i, unsigned const bit_i, ErrType const err) {
-        _errors[i][bit_i] = err;
+    inline Word read(size_t const i) const { return is_faulty(i) ? read_faulty(i) : load(i); }
+    /// Writes a word at `i`ndex to the ram with set errors applied. Bits above `word_bits`
+    /// are dropped.
+    inline void write(size_t const i,
+                      Word word) {  // don't try converting into an operator
+        word &= word_mask;
+        if (is_faulty(i)) {
+            WordMasks const &m = _masks[slot_of(i)];
+            word = (word & m.write_and) | m.write_or;
+        }
+        if (load(i) != word) mark_dirty(i);
+        store(i, word);
     }
 
+    ErrType get_error(size_t const i, unsigned const bit_i) const;
+    void set_error(size_t const i, unsigned const bit_i, ErrType const err);
+    /// Sets `types[k]` on bit `bits[k]` of word `addrs[k]` for every `k`; later entries win.
+    /// Everything is validated first, so on error nothing is changed.
+    void set_errors(std::span<Addr const> const addrs, std::span<uint8_t const> const bits,
+                    std::span<uint8_t const> const types);
+    /// Removes all errors.
+    void clear_errors();
+
     inline Word operator[](size_t const i) const { return read(i); }
+    /// Whether the word at `i` has any errors.
+    inline bool has_errors(size_t const i) const { return is_faulty(i); }
+
+    /// The stored word at `i`, without any errors applied. Has no side effects.
+    inline Word load(size_t const i) const {
+        switch (word_bits) {
+        case 8: return static_cast<uint8_t const *>(_data)[i];
+        case 16: return static_cast<uint16_t const *>(_data)[i];
+        case 32: return static_cast<uint32_t const *>(_data)[i];
+        default: return static_cast<uint64_t const *>(_data)[i];
+        }
+    }
+    /// Raw stored words (`len` unsigned integers of `word_bytes()` each), without any errors
+    /// applied. Reading through it has no side effects.
+    inline void const *data() const { return _data; }
+    inline size_t word_bytes() const { return word_bits / 8; }
+    /// Fills `out` (`len` x `word_bits`, row-major) with the error type of every bit.
+    void error_map(uint8_t *const out) const;
+    /// Fills `out` (`word_bits`) with the error type of every bit of the word at `i`.
+    void word_errors(size_t const i, uint8_t *const out) const;
+
+    /// Returns the addresses of words whose stored value changed since the last call (by writes
+    /// or by read side effects), in ascending order, and forgets them.
+    std::vector<Addr> take_dirty();
+
+    /// Copies the stored words. Pages not written since `base` was taken or restored are shared
+    /// with it instead of copied, so `base` must be the last snapshot taken or restored on this
+    /// RAM (or null: then every page is copied). Adds the bytes copied to `copied_bytes`.
+    Snapshot snapshot(Snapshot const *const base, size_t *const copied_bytes = nullptr);
+    /// Brings the stored words back to `snapshot` of this RAM; the words that change are marked
+    /// dirty. Errors are left as they are. Throws `std::invalid_argument` for a snapshot of a RAM
+    /// of another size or word width.
+    void restore(Snapshot const &snapshot);
+    inline size_t page_count() const { return (len * word_bytes() + page_bytes - 1) / page_bytes; }
+
+    MemoryStats memory_stats() const;
+
+    /// Guards the contents for callers that share one `Vram` (and its `VramTest`s) between
+    /// threads. `Vram` doesn't lock it itself; the Python bindings do.
+    inline std::mutex &mutex() const { return _mutex; }
 
    public:
     size_t const len;
+    unsigned const word_bits;
+    /// Ones in the low `word_bits` bits.
+    Word const word_mask;
 
    private:
-    Word *const _data;
-    std::unordered_map<size_t, WordErrs> _errors = {};
+    inline void mark_dirty(size_t const i) const {
+        size_t const page = i >> _page_shift;
+        _touched[page / 64] |= uint64_t{1} << (page % 64);
+        if (!_dirty[i]) _dirty[i] = true, _dirty_addrs.push_back(i);
+    }
+
+    /// Zeroed storage for `len` words of `word_bytes` each.
+    static void *allocate(size_t const len, size_t const word_bytes) {
+        void *const data = std::calloc(len ? len : 1, word_bytes);
+        if (!data) throw std::bad_alloc();
+        return data;
+    }
+    // const: reads may store their side effects
+    inline void store(size_t const i, Word const word) const {
+        switch (word_bits) {
+        case 8: static_cast<uint8_t *>(_data)[i] = static_cast<uint8_t>(word); break;
+        case 16: static_cast<uint16_t *>(_data)[i] = static_cast<uint16_t>(word); break;
+        case 32: static_cast<uint32_t *>(_data)[i] = static_cast<uint32_t>(word); break;
+        default: static_cast<uint64_t *>(_data)[i] = word;
+        }
+    }
+
+    inline bool is_faulty(size_t const i) const { return (_faulty[i / 64] >> (i % 64)) & 1; }
+    /// Index of the word in `_faults` and `_masks`; the word must be faulty.
+    inline uint32_t slot_of(size_t const i) const {
+        return _dense_slots.empty() ? _sparse_slots.at(i) : _dense_slots[i];
+    }
+    Word read_faulty(size_t const i) const;
+    static WordMasks masks_of(std::array<uint8_t, max_word_bits> const &errs);
+    void add_slot(size_t const i);
+    void remove_slot(size_t const i);
+
+    /// log2 of the words in a page.
+    unsigned const _page_shift;
+    void *const _data;
+
+    /// One bit per word: whether the word has any errors. Fault-free words never look further.
+    std::vector<uint64_t> _faulty;
+    std::vector<FaultyWord> _faults;
+    std::vector<WordMasks> _masks;
+    /// Address -> index in `_faults`. A hash map while faults are sparse, replaced by an array
+    /// over the whole RAM once that gets cheaper (see `add_slot`).
+    std::unordered_map<Addr, uint32_t> _sparse_slots;
+    std::vector<uint32_t> _dense_slots;
+
+    // reads may change `_data` too, so the dirty set is updated from const methods
+    /// One bit per page: written since the last `snapshot` or `restore`.
+    mutable std::vector<uint64_t> _touched;
+    mutable std::vector<bool> _dirty;
+    mutable std::vector<Addr> _dirty_addrs;
+
+    // not copied: a copy is a separate RAM with its own lock
+    mutable std::mutex _mutex;
 };
 
 #endif
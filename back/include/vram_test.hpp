@@ -1,34 +1,116 @@
 #ifndef VRAM_TEST_HPP
 #define VRAM_TEST_HPP
 
-#include <fstream>
+#include <array>
+#include <cstdint>
+#include <memory>
+#include <optional>
+#include <vector>
 
+#include "program.hpp"
+#include "trace.hpp"
 #include "vmach.hpp"
 #include "vram.hpp"
 
 class VramTest {
    public:
     using Word = Vram::Word;
+    using Addr = Vram::Addr;
     struct StepResult {
-        enum Type { WRITE, TEST_SUCCEEDED, TEST_FAILED, ENDED } type;
-        Word i;
+        enum Type : uint8_t { WRITE, TEST_SUCCEEDED, TEST_FAILED, ENDED } type;
+        Addr i;
     };
+    using StepResults = std::vector<StepResult>;
+    /// The state of the runner and its RAM right after `step` results.
+    struct Checkpoint {
+        size_t step;
+        Vram::Snapshot ram;
+        Vmach::Snapshot vmach;
+        size_t detected_errors;
+        std::array<size_t, 4> event_counts;
+        std::optional<StepResult> last;
+    };
+    static constexpr size_t default_checkpoint_budget = 256 << 20;
 
    public:
     VramTest(Vram &ram, std::string const kidscript_path)
-    : _ram(ram), _kidscript(kidscript_path, std::ios::binary), _vmach(_kidscript, _ram) {};
+    : VramTest(ram, Program::compile_file(kidscript_path)) {};
+    VramTest(Vram &ram, std::shared_ptr<Program const> program)
+    : _ram(ram), _vmach(std::move(program), _ram) {};
 
-    inline std::vector<Word> const detected_errors() { return _detected_errors; }
+    inline std::vector<Addr> const detected_errors() { return _detected_errors; }
 
     StepResult step();
+    /// Steps until the program ends or `max_steps` results are collected. When the program ends,
+    /// the last result is `ENDED`.
+    StepResults run(size_t const max_steps);
+    inline StepResults run_to_end() { return run(SIZE_MAX); }
+    /// Steps until the program ends without collecting the results.
+    void finish();
+
+    /// Results produced so far, not counting `ENDED`.
+    inline size_t steps() const { return _steps; }
+    /// The last result other than `ENDED`, if there was one.
+    inline std::optional<StepResult> last_result() const { return _last; }
+
+    /// Takes a checkpoint now and then after every `every` results (0 turns them off). Their RAM
+    /// pages are shared while unchanged; when they take more than `budget_bytes`, every other one
+    /// is dropped and `every` doubles. Only one runner of a RAM may keep checkpoints.
+    void enable_checkpoints(size_t const every, size_t const budget_bytes = default_checkpoint_budget);
+    /// Goes back to the state right after `target` results: restores the nearest checkpoint
+    /// before it and steps on from there. Later checkpoints are dropped and the trace is cut at
+    /// `target`. Throws `std::out_of_range` unless `target` is between the first checkpoint and
+    /// `steps()`.
+    void seek(size_t const target);
+    inline std::vector<Checkpoint> const &checkpoints() const { return _checkpoints; }
+    inline size_t checkpoint_every() const { return _checkpoint_every; }
+    /// Bytes of RAM pages the checkpoints hold (shared pages counted once).
+    inline size_t checkpoint_bytes() const { return _checkpoint_bytes; }
+
+    /// How many results of each `StepResult::Type` were produced so far.
+    inline std::array<size_t, 4> const &event_counts() const { return _event_counts; }
+
+    /// Starts recording every following result except `ENDED` to a `TraceWriter` file.
+    inline void start_trace(std::string const &path) {
+        _trace = std::make_unique<TraceWriter>(path, _ram);
+        _trace_start = _steps;
+    }
+    /// Flushes and closes the trace file.
+    inline void stop_trace() { _trace.reset(); }
+
+    /// See `Vmach::enable_stats`.
+    inline void enable_stats(bool const enable) { _vmach.enable_stats(enable); }
+    inline Vmach const &vmach() const { return _vmach; }
+    /// The RAM under test; the runner doesn't own it.
+    inline Vram &ram() const { return _ram; }
+    /// Total time spent inside `run` and `finish`.
+    inline double run_seconds() const { return _run_seconds; }
 
    private:
+    StepResult next_result();
+    void checkpoint();
+    /// Recounts `_checkpoint_bytes` after checkpoints were dropped.
+    void count_checkpoint_bytes();
+
     Vram &_ram;
 
-    std::ifstream _kidscript;
     Vmach _vmach;
 
-    std::vector<Word> _detected_errors;
+    std::vector<Addr> _detected_errors;
+    std::array<size_t, 4> _event_counts = {};
+    std::unique_ptr<TraceWriter> _trace;
+    /// `_steps` when the trace was started.
+    size_t _trace_start = 0;
+    double _run_seconds = 0;
+
+    size_t _steps = 0;
+    std::optional<StepResult> _last;
+
+    size_t _checkpoint_every = 0, _checkpoint_budget = 0, _checkpoint_bytes = 0;
+    /// By step, ascending.
+    std::vector<Checkpoint> _checkpoints;
+    /// The RAM snapshot taken or restored last: the next one shares its unchanged pages.
+    Vram::Snapshot _ram_base;
 };
 
 #endif
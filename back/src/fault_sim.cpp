@@ -0,0 +1,366 @@
+#include "fault_sim.hpp"
+
+#include <algorithm>
+#include <stdexcept>
+
+static constexpr uint64_t all_lanes = ~uint64_t{0};
+
+FaultSim::FaultSim(std::shared_ptr<Program const> program, size_t const len,
+                   unsigned const word_bits)
+: len(len),
+  word_bits(Vram::checked_word_bits(word_bits)),
+  word_mask(word_bits == Vram::max_word_bits ? ~Word{} : (Word{1} << word_bits) - 1),
+  _program(std::move(program)),
+  _ram(len, 0),
+  _special((len + 63) / 64, 0) {}
+
+std::optional<uint64_t> FaultSim::run(Vram::ErrType const type, std::span<Addr const> const addrs,
+                                      std::span<uint8_t const> const bits) {
+    if (addrs.size() != bits.size())
+        throw std::invalid_argument("Addresses and bits differ in length!");
+    if (addrs.size() > lanes) throw std::invalid_argument("Too many lanes for one run!");
+    for (size_t l = 0; l < addrs.size(); l++)
+        if (addrs[l] >= len || bits[l] >= word_bits) throw std::out_of_range("No such bit!");
+
+    // a fresh RAM and machine
+    std::fill(_ram.begin(), _ram.end(), 0);
+    std::fill(_special.begin(), _special.end(), 0);
+    _faults.clear(), _diverged.clear();
+    _pool.clear(), _free_slots.clear();
+    _stack.clear(), _hidden_stack.clear();
+    _pc = 0, _i = 0, _detected = 0;
+
+    _type = type;
+    for (size_t l = 0; l < addrs.size(); l++) {
+        _faults[addrs[l]][bits[l]] |= uint64_t{1} << l;
+        _special[addrs[l] / 64] |= uint64_t{1} << (addrs[l] % 64);
+    }
+
+    auto const &code = _program->code;
+    try {
+        while (_pc < code.size()) step(code[_pc++]);
+    } catch (Diverged const &) { return std::nullopt; }
+
+    // lanes past `addrs` run without faults
+    uint64_t const used = addrs.size() == lanes ? all_lanes : (uint64_t{1} << addrs.size()) - 1;
+    return _detected & used;
+}
+
+/*************
+ ** private **
+ *************/
+
+// mirrors `Vmach::step_op`, one lane per bit of every slice
+void FaultSim::step(Program::Instr const &instr) {
+    switch (instr.op) {
+    case Program::CONST: push(static_cast<Word>(instr.arg)); break;
+
+    case Program::LOOP: {
+        Word const start = pop_uniform();
+        _hidden_stack.push_back(_i);
+        _i = static_cast<Addr>(start);
+    } break;
+    case Program::ENDLOOP:
+        if (_i != 0) {
+            _pc = instr.arg;
+        } else {
+            if (_hidden_stack.empty()) throw std::runtime_error("Program error!");
+            _i = _hidden_stack.back();
+            _hidden_stack.pop_back();
+        }
+        break;
+    case Program::ASC: _i = (_i + 1) % len; break;
+    case Program::DESC: _i = (_i + len - 1) % len; break;
+
+    case Program::THEN: {
+        Value const cond = pop();
+        uint64_t const taken = nonzero(cond);
+        release(cond);
+        if (taken != all_lanes && taken != 0) throw Diverged{};
+        if (!taken) _pc = instr.arg;
+    } break;
+    case Program::ENDTHEN: break;
+
+    case Program::ASSERT: {
+        Value const cond = pop();
+        _detected |= ~nonzero(cond);
+        release(cond);
+    } break;
+
+    case Program::READ: push(read(_i)); break;
+    case Program::WRITE: write(_i, pop()); break;
+
+    case Program::SWAP: {
+        Value const cur = pop(), last = pop();
+        push(cur), push(last);
+    } break;
+    case Program::DROP: release(pop()); break;
+    case Program::LAST: {
+        Value const cur = pop(), last = pop();
+        push(last), push(cur), push(copy(last));
+    } break;
+    case Program::CUR: {
+        Value const cur = pop();
+        push(cur), push(copy(cur));
+    } break;
+
+    // comparisons take the top of the stack as the left operand, as `Vmach` does
+    case Program::EQUAL:
+    case Program::GREATER:
+    case Program::LESS: {
+        Value const top = pop(), below = pop();
+        if (top.slot == uniform && below.slot == uniform) {
+            bool const result = instr.op == Program::EQUAL     ? top.word == below.word
+                                : instr.op == Program::GREATER ? top.word > below.word
+                                                               : top.word < below.word;
+            push(result ? ~Word{} : 0);
+            break;
+        }
+        Slices scratch_top, scratch_below;
+        Slices const &x = slices(top, scratch_top), &y = slices(below, scratch_below);
+        // from the highest bit down: lanes still equal, and lanes where x is already greater/less
+        uint64_t eq = all_lanes, gt = 0, lt = 0;
+        for (unsigned k = word_bits; k-- > 0;) {
+            gt |= eq & x[k] & ~y[k];
+            lt |= eq & ~x[k] & y[k];
+            eq &= ~(x[k] ^ y[k]);
+        }
+        release(top), release(below);
+        push(from_mask(instr.op == Program::EQUAL ? eq : instr.op == Program::GREATER ? gt : lt));
+    } break;
+
+    case Program::NOT: {
+        Value value = pop();
+        if (value.slot == uniform) {
+            push(~value.word);
+            break;
+        }
+        for (unsigned k = 0; k < word_bits; k++) _pool[value.slot][k] = ~_pool[value.slot][k];
+        push(value);
+    } break;
+    case Program::XOR: push(bitwise(pop(), pop(), [](uint64_t a, uint64_t b) { return a ^ b; })); break;
+    case Program::AND: push(bitwise(pop(), pop(), [](uint64_t a, uint64_t b) { return a & b; })); break;
+    case Program::OR: push(bitwise(pop(), pop(), [](uint64_t a, uint64_t b) { return a | b; })); break;
+    case Program::LSHIFT: {
+        Value const value = pop();
+        if (value.slot == uniform) {
+            push(value.word << 1);
+            break;
+        }
+        Slices &s = _pool[value.slot];
+        for (unsigned k = word_bits - 1; k > 0; k--) s[k] = s[k - 1];
+        s[0] = 0;
+        push(normalize(value));
+    } break;
+
+    case Program::ADD: {
+        Value const a = pop(), b = pop();
+        if (a.slot == uniform && b.slot == uniform) {
+            push(a.word + b.word);
+            break;
+        }
+        Value const sum = alloc();
+        Slices scratch_a, scratch_b;
+        Slices const &x = slices(a, scratch_a), &y = slices(b, scratch_b);
+        Slices &out = _pool[sum.slot];
+        uint64_t carry = 0;
+        for (unsigned k = 0; k < word_bits; k++) {
+            out[k] = x[k] ^ y[k] ^ carry;
+            carry = (x[k] & y[k]) | (carry & (x[k] ^ y[k]));
+        }
+        release(a), release(b);
+        push(normalize(sum));
+    } break;
+    case Program::NEG: {
+        Value const value = pop();
+        if (value.slot == uniform) {
+            push(-value.word);
+            break;
+        }
+        // ~x + 1
+        Slices &s = _pool[value.slot];
+        uint64_t carry = all_lanes;
+        for (unsigned k = 0; k < word_bits; k++) {
+            uint64_t const inverted = ~s[k];
+            s[k] = inverted ^ carry;
+            carry &= inverted;
+        }
+        push(normalize(value));
+    } break;
+
+    case Program::PUSH_I: push(static_cast<Word>(_i)); break;
+    case Program::POP_I: _i = static_cast<Addr>(pop_uniform()); break;
+
+    case Program::DUMP: break;
+
+    default: throw std::runtime_error("Unknown operation!");
+    }
+}
+
+// the per-bit effects of `Vram::masks_of`, applied to the lanes that have the fault at each bit
+FaultSim::Value FaultSim::read(size_t const i) {
+    if (i >= len) throw std::out_of_range("No such word!");
+    if (!is_special(i)) return {_ram[i]};
+
+    auto const diverged = _diverged.find(i);
+    auto const fault = _faults.find(i);
+    if (fault == _faults.end()) return copy(diverged->second);
+
+    Slices const &faulty = fault->second;
+    Value const result = alloc();
+    Slices scratch;
+    Slices const &stored = diverged != _diverged.end() ? _pool[diverged->second.slot]
+                                                         : slices({_ram[i]}, scratch);
+    Slices &out = _pool[result.slot];
+    std::copy_n(stored.begin(), word_bits, out.begin());
+
+    switch (_type) {
+    case Vram::STUCK_AT_0:
+    case Vram::INCORRECT_READ_1:
+        for (unsigned k = 0; k < word_bits; k++) out[k] &= ~faulty[k];
+        break;
+    case Vram::STUCK_AT_1:
+    case Vram::INCORRECT_READ_0:
+        for (unsigned k = 0; k < word_bits; k++) out[k] |= faulty[k];
+        break;
+
+    // destructive and deceptive reads flip the stored bit; destructive ones return it flipped
+    case Vram::WRITE_OR_READ_DESTRUCTIVE_0:
+    case Vram::WRITE_OR_READ_DESTRUCTIVE_1:
+    case Vram::DECEPTIVE_READ_0:
+    case Vram::DECEPTIVE_READ_1: {
+        bool const sets = _type == Vram::WRITE_OR_READ_DESTRUCTIVE_0 || _type == Vram::DECEPTIVE_READ_0;
+        Value const after = alloc();
+        Slices &flipped = _pool[after.slot];
+        for (unsigned k = 0; k < word_bits; k++)
+            flipped[k] = sets ? out[k] | faulty[k] : out[k] & ~faulty[k];
+        if (_type == Vram::WRITE_OR_READ_DESTRUCTIVE_0 || _type == Vram::WRITE_OR_READ_DESTRUCTIVE_1)
+            std::copy_n(flipped.begin(), word_bits, out.begin());
+        write_stored(i, normalize(after));
+    } break;
+
+    default:;
+    }
+    return normalize(result);
+}
+
+void FaultSim::write(size_t const i, Value const value) {
+    if (i >= len) throw std::out_of_range("No such word!");
+    auto const fault = _faults.find(i);
+    bool const sets = _type == Vram::TRANSITION_1_TO_0 || _type == Vram::WRITE_OR_READ_DESTRUCTIVE_0;
+    bool const clears = _type == Vram::TRANSITION_0_TO_1 || _type == Vram::WRITE_OR_READ_DESTRUCTIVE_1;
+    if (fault == _faults.end() || !(sets || clears)) {
+        write_stored(i, value);
+        return;
+    }
+
+    Slices const &faulty = fault->second;
+    Value const result = alloc();
+    Slices scratch;
+    Slices const &in = slices(value, scratch);
+    Slices &out = _pool[result.slot];
+    for (unsigned k = 0; k < word_bits; k++) out[k] = sets ? in[k] | faulty[k] : in[k] & ~faulty[k];
+    release(value);
+    write_stored(i, normalize(result));
+}
+
+void FaultSim::write_stored(size_t const i, Value const value) {
+    auto const diverged = _diverged.find(i);
+    if (diverged != _diverged.end()) {
+        release(diverged->second);
+        if (value.slot != uniform) {
+            diverged->second = value;
+            return;
+        }
+        _diverged.erase(diverged);
+    }
+    if (value.slot == uniform) {
+        _ram[i] = value.word;
+        if (!_faults.contains(i)) _special[i / 64] &= ~(uint64_t{1} << (i % 64));
+    } else {
+        _diverged.emplace(i, value);
+        _special[i / 64] |= uint64_t{1} << (i % 64);
+    }
+}
+
+FaultSim::Value FaultSim::pop() {
+    if (_stack.empty()) throw std::runtime_error("Program stack underflow!");
+    Value const value = _stack.back();
+    _stack.pop_back();
+    return value;
+}
+
+FaultSim::Word FaultSim::pop_uniform() {
+    Value const value = pop();
+    if (value.slot != uniform) {
+        release(value);
+        throw Diverged{};
+    }
+    return value.word;
+}
+
+FaultSim::Value FaultSim::alloc() {
+    if (_free_slots.empty()) {
+        _pool.emplace_back();
+        return {0, static_cast<uint32_t>(_pool.size() - 1)};
+    }
+    uint32_t const slot = _free_slots.back();
+    _free_slots.pop_back();
+    return {0, slot};
+}
+
+void FaultSim::release(Value const value) {
+    if (value.slot != uniform) _free_slots.push_back(value.slot);
+}
+
+FaultSim::Value FaultSim::copy(Value const value) {
+    if (value.slot == uniform) return value;
+    Value const result = alloc();
+    _pool[result.slot] = _pool[value.slot];
+    return result;
+}
+
+FaultSim::Value FaultSim::normalize(Value const value) {
+    if (value.slot == uniform) return value;
+    Slices const &s = _pool[value.slot];
+    Word word = 0;
+    for (unsigned k = 0; k < word_bits; k++) {
+        if (s[k] != 0 && s[k] != all_lanes) return value;
+        word |= (s[k] & 1) << k;
+    }
+    release(value);
+    return {word};
+}
+
+FaultSim::Slices const &FaultSim::slices(Value const value, Slices &scratch) const {
+    if (value.slot != uniform) return _pool[value.slot];
+    for (unsigned k = 0; k < word_bits; k++) scratch[k] = (value.word >> k) & 1 ? all_lanes : 0;
+    return scratch;
+}
+
+uint64_t FaultSim::nonzero(Value const value) const {
+    if (value.slot == uniform) return value.word ? all_lanes : 0;
+    Slices const &s = _pool[value.slot];
+    uint64_t lanes_set = 0;
+    for (unsigned k = 0; k < word_bits; k++) lanes_set |= s[k];
+    return lanes_set;
+}
+
+FaultSim::Value FaultSim::from_mask(uint64_t const mask) {
+    if (mask == 0 || mask == all_lanes) return {mask & word_mask};
+    Value const result = alloc();
+    std::fill_n(_pool[result.slot].begin(), word_bits, mask);
+    return result;
+}
+
+template <typename Op>
+FaultSim::Value FaultSim::bitwise(Value const a, Value const b, Op const op) {
+    if (a.slot == uniform && b.slot == uniform) return {op(a.word, b.word) & word_mask};
+    Value const result = alloc();
+    Slices scratch_a, scratch_b;
+    Slices const &x = slices(a, scratch_a), &y = slices(b, scratch_b);
+    Slices &out = _pool[result.slot];
+    for (unsigned k = 0; k < word_bits; k++) out[k] = op(x[k], y[k]);
+    release(a), release(b);
+    return normalize(result);
+}
@@ -8,7 +8,9 @@
 static void printram(Vram const &ram) {
     printf("===== RAM dump =====\n");
     for (unsigned i = 0; i < ram.len / PRINT_COLS; i++) {
-        for (unsigned j = 0; j < PRINT_COLS; j++) printf("%04X ", ram.read(i * PRINT_COLS + j));
+        for (unsigned j = 0; j < PRINT_COLS; j++)
+            printf("%0*llX ", static_cast<int>(ram.word_bits / 4),
+                   static_cast<unsigned long long>(ram.read(i * PRINT_COLS + j)));
         printf("\n");
     }
     printf("===== RAM dump end =====\n\n");
@@ -23,11 +25,11 @@ int main() {
     while (true) {
         VramTest::StepResult const r = test_manager.step();
         switch (r.type) {
-        case VramTest::StepResult::WRITE: printf("wrote into %i\n", r.i); break;
+        case VramTest::StepResult::WRITE: printf("wrote into %u\n", r.i); break;
         case VramTest::StepResult::TEST_SUCCEEDED:
-            printf("assertion succeeded on %i\n", r.i);
+            printf("assertion succeeded on %u\n", r.i);
             break;
-        case VramTest::StepResult::TEST_FAILED: printf("assertion failed on %i\n", r.i); break;
+        case VramTest::StepResult::TEST_FAILED: printf("assertion failed on %u\n", r.i); break;
         case VramTest::StepResult::ENDED: goto test_ended;
         }
     }
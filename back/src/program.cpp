@@ -0,0 +1,201 @@
+#include "program.hpp"
+
+#include <algorithm>
+#include <chrono>
+#include <fstream>
+#include <limits>
+#include <numeric>
+#include <optional>
+#include <stdexcept>
+#include <utility>
+
+template <typename T>
+static std::optional<T> sane_stoull(std::string const &str) {
+    static_assert(std::is_unsigned<T>());
+
+    // the first character must be '-', '+' or a decimal digit; letter values are only written like
+    // 0F00 or 0xF00
+    if (str[0] != '-' && str[0] != '+' && !isdigit(str[0])) return std::nullopt;
+    try {
+        return std::make_optional<T>(std::stoull(str, NULL, 16));
+    } catch (std::invalid_argument const &e) { return std::nullopt; }
+}
+
+std::map<std::string, Program::Op> const Program::opcodes = {
+    {"loop", LOOP},       {"endloop", ENDLOOP}, {"asc", ASC},
+    {"desc", DESC},       {"then", THEN},       {"endthen", ENDTHEN},
+    {"assert!", ASSERT},  {"read", READ},       {"write", WRITE},
+    {"swap", SWAP},       {"drop", DROP},       {"cur", CUR},
+    {"last", LAST},       {"equal?", EQUAL},    {"greater?", GREATER},
+    {"less?", LESS},      {"not", NOT},         {"xor", XOR},
+    {"or", OR},           {"and", AND},         {"lsh", LSHIFT},
+    {"add", ADD},         {"neg", NEG},         {"i", PUSH_I},
+    {"i=", POP_I},        {"@dump", DUMP},
+};
+
+std::shared_ptr<Program const> Program::compile(std::istream &source) {
+    auto const start = std::chrono::steady_clock::now();
+    auto program = std::make_shared<Program>();
+    auto &code = program->code;
+    // indices of the not yet closed `loop`s and `then`s
+    std::vector<size_t> open_loops, open_thens;
+
+    std::string op;
+    while (source >> op) {
+        // makes the machine case-insensitive
+        std::transform(op.begin(), op.end(), op.begin(), tolower);
+
+        auto const constant = sane_stoull<Word>(op);
+        if (constant.has_value()) {
+            code.push_back({CONST, constant.value()});
+            continue;
+        }
+
+        auto const found = opcodes.find(op);
+        if (found == opcodes.end())
+            throw std::runtime_error("Unknown operation '" + op + "' at op #" +
+                                     std::to_string(code.size()) + "!");
+        Instr instr{found->second};
+
+        switch (instr.op) {
+        case LOOP: open_loops.push_back(code.size()); break;
+        case ENDLOOP:
+            if (open_loops.empty()) throw std::runtime_error("Program error: unmatched endloop!");
+            instr.arg = open_loops.back() + 1;
+            open_loops.pop_back();
+            break;
+        case THEN: open_thens.push_back(code.size()); break;
+        case ENDTHEN:
+            if (open_thens.empty()) throw std::runtime_error("Program error: unmatched endthen!");
+            code[open_thens.back()].arg = code.size() + 1;
+            open_thens.pop_back();
+            break;
+        default:;
+        }
+        code.push_back(instr);
+    }
+
+    if (!open_loops.empty()) throw std::runtime_error("Program error: unmatched loop!");
+    if (!open_thens.empty()) throw std::runtime_error("Program error: unmatched then!");
+    program->compile_seconds =
+        std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    return program;
+}
+
+std::string Program::name_of(Op const op) {
+    for (auto const &[name, code] : opcodes)
+        if (code == op) return name;
+    return "const";
+}
+
+std::shared_ptr<Program const> Program::compile_file(std::string const &path) {
+    std::ifstream source(path, std::ios::binary);
+    if (!source) throw std::runtime_error("Can't open " + path + "!");
+    return compile(source);
+}
+
+/// `a * b % m` without overflowing 64 bits.
+static uint64_t mul_mod(uint64_t a, uint64_t b, uint64_t const m) {
+    uint64_t result = 0;
+    for (a %= m; b; b >>= 1, a = (a << 1) % m)
+        if (b & 1) result = (result + a) % m;
+    return result;
+}
+
+/// The inverse of `a` modulo `m`; `a` and `m` are coprime.
+static uint64_t inverse_mod(uint64_t const a, uint64_t const m) {
+    int64_t t = 0, new_t = 1;
+    int64_t r = static_cast<int64_t>(m), new_r = static_cast<int64_t>(a % m);
+    while (new_r) {
+        int64_t const q = r / new_r;
+        t = std::exchange(new_t, t - q * new_t);
+        r = std::exchange(new_r, r - q * new_r);
+    }
+    return static_cast<uint64_t>(t < 0 ? t + static_cast<int64_t>(m) : t);
+}
+
+/// How many times a loop body runs when `i` starts at `start` and the body moves it by `delta`
+/// (`moves` tells whether it has any `asc`/`desc`, which also wrap `i` to the RAM size); 0 if
+/// the loop never ends.
+static uint64_t loop_iterations(uint64_t const start, int64_t const delta, bool const moves,
+                                uint64_t const len) {
+    if (!moves) return start == 0 ? 1 : 0;
+    // the smallest k >= 1 with start + k * delta == 0 (mod len)
+    uint64_t const d = static_cast<uint64_t>(delta % static_cast<int64_t>(len) + len) % len;
+    uint64_t const r = (len - start % len) % len;
+    uint64_t const g = std::gcd(d, len);
+    if (r % g) return 0;
+    uint64_t const m = len / g;
+    if (m == 1) return 1;
+    uint64_t const k = mul_mod(r / g, inverse_mod(d / g, m), m);
+    return k ? k : m;
+}
+
+namespace {
+struct Estimator {
+    std::vector<Program::Instr> const &code;
+    /// The index of the matching `endloop` for every `loop`.
+    std::vector<size_t> ends;
+    uint64_t const len;
+    Program::Estimate result;
+
+    /// Adds `times` runs of `code[from, to)`; false if some loop in it can't be estimated.
+    bool count(size_t const from, size_t const to, uint64_t const times) {
+        for (size_t pc = from; pc < to; pc++) {
+            result.steps += times;
+            switch (code[pc].op) {
+            case Program::READ: result.reads += times; break;
+            case Program::WRITE: result.writes += times; break;
+            case Program::ASSERT: result.asserts += times; break;
+            case Program::THEN: result.exact = false; break;
+            case Program::LOOP: {
+                if (pc == 0 || code[pc - 1].op != Program::CONST) return false;
+                size_t const end = ends[pc];
+                auto const delta = body_delta(pc + 1, end);
+                if (!delta) return false;
+                uint64_t const k = loop_iterations(code[pc - 1].arg, delta->first, delta->second, len);
+                if (k == 0 || times > std::numeric_limits<uint64_t>::max() / k) return false;
+                // the body and `endloop` run k times, `loop` itself once
+                if (!count(pc + 1, end + 1, times * k)) return false;
+                pc = end;
+            } break;
+            default:;
+            }
+        }
+        return true;
+    }
+
+    /// The net `asc`/`desc` of one run of a loop body, nested loops excluded (they restore `i`),
+    /// and whether there are any; empty if `i` can change any other way.
+    std::optional<std::pair<int64_t, bool>> body_delta(size_t const from, size_t const to) const {
+        int64_t delta = 0;
+        bool moves = false;
+        int thens = 0;
+        for (size_t pc = from; pc < to; pc++) {
+            switch (code[pc].op) {
+            case Program::LOOP: pc = ends[pc]; break;
+            case Program::THEN: thens++; break;
+            case Program::ENDTHEN: thens--; break;
+            case Program::POP_I: return std::nullopt;
+            case Program::ASC:
+            case Program::DESC:
+                if (thens) return std::nullopt;
+                delta += code[pc].op == Program::ASC ? 1 : -1;
+                moves = true;
+                break;
+            default:;
+            }
+        }
+        return std::make_pair(delta, moves);
+    }
+};
+}  // namespace
+
+std::optional<Program::Estimate> Program::estimate(size_t const ram_len) const {
+    if (ram_len == 0) return std::nullopt;
+    Estimator estimator{code, std::vector<size_t>(code.size()), ram_len, {}};
+    for (size_t pc = 0; pc < code.size(); pc++)
+        if (code[pc].op == ENDLOOP) estimator.ends[code[pc].arg - 1] = pc;
+    if (!estimator.count(0, code.size(), 1)) return std::nullopt;
+    return estimator.result;
+}
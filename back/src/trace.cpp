@@ -0,0 +1,50 @@
+#include "trace.hpp"
+
+#include <cstring>
+#include <filesystem>
+#include <stdexcept>
+
+TraceWriter::TraceWriter(std::string const &path, Vram const &ram)
+: _path(path),
+  _file(path, std::ios::binary | std::ios::trunc),
+  _word_bytes(ram.word_bytes()),
+  _value_offset(value_offset(_word_bytes)),
+  _record_bytes(record_bytes(_word_bytes)),
+  _buffer(buffer_records * _record_bytes) {
+    if (!_file) throw std::runtime_error("Can't open " + path + "!");
+
+    Header header{};
+    std::memcpy(header.magic, magic, sizeof(magic));
+    header.word_bits = ram.word_bits;
+    header.record_bytes = _record_bytes;
+    header.words = ram.len;
+    _file.write(reinterpret_cast<char const *>(&header), sizeof(header));
+
+    size_t const snapshot_bytes = ram.len * _word_bytes;
+    _file.write(static_cast<char const *>(ram.data()), snapshot_bytes);
+    static char const padding[8] = {};
+    _file.write(padding, (8 - snapshot_bytes % 8) % 8);
+    _records_offset = sizeof(header) + snapshot_bytes + (8 - snapshot_bytes % 8) % 8;
+}
+
+void TraceWriter::flush() {
+    _file.write(reinterpret_cast<char const *>(_buffer.data()), _count * _record_bytes);
+    _file.flush();
+    _flushed += _count;
+    _count = 0;
+}
+
+void TraceWriter::truncate(size_t const records) {
+    if (records >= this->records()) return;
+    if (records >= _flushed) {
+        _count = records - _flushed;
+        return;
+    }
+    // the buffered events are all past the cut; flush what the stream holds before resizing
+    _count = 0;
+    flush();
+    size_t const size = _records_offset + records * _record_bytes;
+    _file.seekp(size);
+    std::filesystem::resize_file(_path, size);
+    _flushed = records;
+}
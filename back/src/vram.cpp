@@ -1,67 +1,236 @@
 #include "vram.hpp"
 
+#include <algorithm>
 #include <cstddef>
+#include <cstring>
 #include <stdexcept>
 
-Vram::Word Vram::read(size_t const i) const {
-    Word word = _data[i];
-    try {
-        auto const errs = _errors.at(i);
-        for (unsigned pos = 0; pos < errs.size(); pos++) switch (errs[pos]) {
-            case NO: break;
-            case STUCK_AT_0: word &= ~(1 << pos); break;
-            case STUCK_AT_1: word |= (1 << pos); break;
-            case WRITE_OR_READ_DESTRUCTIVE_0:
-                if (!(word & (1 << pos))) {
-                    _data[i] |= (1 << pos);
-                    word = _data[i];
-                }
-                break;
-            case WRITE_OR_READ_DESTRUCTIVE_1:
-                if (word & (1 << pos)) {
-                    _data[i] &= ~(1 << pos);
-                    word = _data[i];
-                }
-                break;
-            case INCORRECT_READ_0:
-                if (!(word & (1 << pos))) word |= (1 << pos);
-                break;
-            case INCORRECT_READ_1:
-                if (word & (1 << pos)) word &= ~(1 << pos);
-                break;
-            case DECEPTIVE_READ_0:
-                if (!(word & (1 << pos))) _data[i] |= (1 << pos);
-                break;
-            case DECEPTIVE_READ_1:
-                if (word & (1 << pos)) _data[i] &= ~(1 << pos);
-                break;
-
-            default:;
-            }
-    } catch (std::out_of_range const &e) {}
-    return word;
+Vram::Word Vram::read_faulty(size_t const i) const {
+    WordMasks const &m = _masks[slot_of(i)];
+
+    Word const stored = load(i);
+    Word const after = (stored | m.read_set) & ~m.read_clear;
+    if (after != stored) {
+        store(i, after);
+        mark_dirty(i);
+    }
+
+    Word const word = (after & ~m.read_keep) | (stored & m.read_keep);
+    return (word & m.read_and) | m.read_or;
+}
+
+Vram::ErrType Vram::get_error(size_t const i, unsigned const bit_i) const {
+    if (i >= len || bit_i >= word_bits) throw std::out_of_range("No such bit!");
+    if (!is_faulty(i)) return NO;
+    return static_cast<ErrType>(_faults[slot_of(i)].errs[bit_i]);
+}
+
+void Vram::set_error(size_t const i, unsigned const bit_i, ErrType const err) {
+    if (i >= len || bit_i >= word_bits) throw std::out_of_range("No such bit!");
+    if (!is_faulty(i)) {
+        if (err == NO) return;
+        add_slot(i);
+    }
+
+    uint32_t const slot = slot_of(i);
+    FaultyWord &faulty = _faults[slot];
+    faulty.errs[bit_i] = err;
+    _masks[slot] = masks_of(faulty.errs);
+
+    if (std::all_of(faulty.errs.begin(), faulty.errs.end(), [](uint8_t e) { return e == NO; }))
+        remove_slot(i);
+}
+
+void Vram::set_errors(std::span<Addr const> const addrs, std::span<uint8_t const> const bits,
+                      std::span<uint8_t const> const types) {
+    if (addrs.size() != bits.size() || addrs.size() != types.size())
+        throw std::invalid_argument("Addresses, bits and types differ in length!");
+    for (size_t k = 0; k < addrs.size(); k++) {
+        if (addrs[k] >= len || bits[k] >= word_bits) throw std::out_of_range("No such bit!");
+        if (types[k] > DECEPTIVE_READ_1) throw std::invalid_argument("No such error type!");
+    }
+
+    std::vector<Addr> touched;
+    for (size_t k = 0; k < addrs.size(); k++) {
+        Addr const i = addrs[k];
+        if (!is_faulty(i)) {
+            if (types[k] == NO) continue;
+            add_slot(i);
+        }
+        _faults[slot_of(i)].errs[bits[k]] = types[k];
+        touched.push_back(i);
+    }
+
+    // masks are rebuilt once per word, however many of its bits were set
+    std::sort(touched.begin(), touched.end());
+    touched.erase(std::unique(touched.begin(), touched.end()), touched.end());
+    for (Addr const i : touched) {
+        uint32_t const slot = slot_of(i);
+        FaultyWord &faulty = _faults[slot];
+        _masks[slot] = masks_of(faulty.errs);
+        if (std::all_of(faulty.errs.begin(), faulty.errs.end(), [](uint8_t e) { return e == NO; }))
+            remove_slot(i);
+    }
+}
+
+void Vram::clear_errors() {
+    std::fill(_faulty.begin(), _faulty.end(), 0);
+    std::vector<FaultyWord>().swap(_faults);
+    std::vector<WordMasks>().swap(_masks);
+    std::unordered_map<Addr, uint32_t>().swap(_sparse_slots);
+    std::vector<uint32_t>().swap(_dense_slots);
+}
+
+void Vram::error_map(uint8_t *const out) const {
+    std::memset(out, NO, len * word_bits);
+    for (auto const &faulty : _faults)
+        std::memcpy(out + size_t{faulty.addr} * word_bits, faulty.errs.data(), word_bits);
+}
+
+void Vram::word_errors(size_t const i, uint8_t *const out) const {
+    if (i >= len) throw std::out_of_range("No such word!");
+    if (!is_faulty(i))
+        std::memset(out, NO, word_bits);
+    else
+        std::memcpy(out, _faults[slot_of(i)].errs.data(), word_bits);
+}
+
+std::vector<Vram::Addr> Vram::take_dirty() {
+    std::vector<Addr> addrs;
+    addrs.swap(_dirty_addrs);
+    for (Addr const i : addrs) _dirty[i] = false;
+    std::sort(addrs.begin(), addrs.end());
+    return addrs;
+}
+
+Vram::Snapshot Vram::snapshot(Snapshot const *const base, size_t *const copied_bytes) {
+    bool const reuse = base && base->len == len && base->word_bits == word_bits;
+    size_t const total = len * word_bytes();
+    Snapshot snapshot{{}, len, word_bits};
+    snapshot.pages.reserve(page_count());
+    for (size_t page = 0; page < page_count(); page++) {
+        if (reuse && !((_touched[page / 64] >> (page % 64)) & 1)) {
+            snapshot.pages.push_back(base->pages[page]);
+            continue;
+        }
+        size_t const offset = page * page_bytes, bytes = std::min(page_bytes, total - offset);
+        std::shared_ptr<std::byte[]> copy(new std::byte[bytes]);
+        std::memcpy(copy.get(), static_cast<std::byte const *>(_data) + offset, bytes);
+        snapshot.pages.push_back(std::move(copy));
+        if (copied_bytes) *copied_bytes += bytes;
+    }
+    std::fill(_touched.begin(), _touched.end(), 0);
+    return snapshot;
+}
+
+void Vram::restore(Snapshot const &snapshot) {
+    if (snapshot.len != len || snapshot.word_bits != word_bits)
+        throw std::invalid_argument("Snapshot of another RAM!");
+    size_t const total = len * word_bytes(), page_words = page_bytes / word_bytes();
+    for (size_t page = 0; page < page_count(); page++) {
+        size_t const offset = page * page_bytes, bytes = std::min(page_bytes, total - offset);
+        std::byte *const current = static_cast<std::byte *>(_data) + offset;
+        std::byte const *const saved = snapshot.pages[page].get();
+        if (std::memcmp(current, saved, bytes) == 0) continue;
+        // mark only the words that differ, so the display redraws just them
+        for (size_t i = page * page_words, end = std::min(len, i + page_words); i < end; i++) {
+            size_t const at = (i - page * page_words) * word_bytes();
+            if (std::memcmp(current + at, saved + at, word_bytes()) != 0) mark_dirty(i);
+        }
+        std::memcpy(current, saved, bytes);
+    }
+    std::fill(_touched.begin(), _touched.end(), 0);
+}
+
+Vram::MemoryStats Vram::memory_stats() const {
+    // an unordered_map node holds the pair plus a next pointer and the cached hash; add a bucket
+    size_t const sparse_entry = sizeof(std::pair<Addr const, uint32_t>) + 2 * sizeof(void *) +
+                                sizeof(size_t);
+    return {
+        len * word_bytes(),
+        _faults.capacity() * sizeof(FaultyWord) + _masks.capacity() * sizeof(WordMasks),
+        _faulty.capacity() * sizeof(uint64_t) + _dense_slots.capacity() * sizeof(uint32_t) +
+            _sparse_slots.size() * sparse_entry + _sparse_slots.bucket_count() * sizeof(void *),
+        _faults.size(),
+        !_dense_slots.empty(),
+    };
+}
+
+/*************
+ ** private **
+ *************/
+
+unsigned Vram::checked_word_bits(unsigned const word_bits) {
+    if (word_bits != 8 && word_bits != 16 && word_bits != 32 && word_bits != 64)
+        throw std::invalid_argument("Word width must be 8, 16, 32 or 64 bits!");
+    return word_bits;
+}
+
+// bits past the word width are always `NO`, so they add nothing to the masks
+Vram::WordMasks Vram::masks_of(std::array<uint8_t, max_word_bits> const &errs) {
+    WordMasks m;
+    for (unsigned pos = 0; pos < max_word_bits; pos++) {
+        Word const bit = Word{1} << pos;
+        switch (errs[pos]) {
+        case NO: break;
+        // stuck-at and incorrect reads only change what a read returns
+        case STUCK_AT_0:
+        case INCORRECT_READ_1: m.read_and &= ~bit; break;
+        case STUCK_AT_1:
+        case INCORRECT_READ_0: m.read_or |= bit; break;
+
+        case TRANSITION_0_TO_1: m.write_and &= ~bit; break;
+        case TRANSITION_1_TO_0: m.write_or |= bit; break;
+
+        // destructive: the bit flips on write and on read, the read returns the flipped bit
+        case WRITE_OR_READ_DESTRUCTIVE_0: m.write_or |= bit, m.read_set |= bit; break;
+        case WRITE_OR_READ_DESTRUCTIVE_1: m.write_and &= ~bit, m.read_clear |= bit; break;
+
+        // deceptive: the bit flips on read, but the read returns the bit as it was
+        case DECEPTIVE_READ_0: m.read_set |= bit, m.read_keep |= bit; break;
+        case DECEPTIVE_READ_1: m.read_clear |= bit, m.read_keep |= bit; break;
+
+        default:;
+        }
+    }
+    return m;
+}
+
+void Vram::add_slot(size_t const i) {
+    uint32_t const slot = _faults.size();
+    _faults.push_back({static_cast<Addr>(i), {}});
+    _masks.emplace_back();
+    _faulty[i / 64] |= uint64_t{1} << (i % 64);
+
+    if (!_dense_slots.empty()) {
+        _dense_slots[i] = slot;
+        return;
+    }
+    _sparse_slots[i] = slot;
+
+    // an array entry costs 4 bytes for every word, a hash map entry roughly 40 for every faulty
+    // one; switch once the array gets cheaper
+    if (_sparse_slots.size() * 40 > len * sizeof(uint32_t)) {
+        _dense_slots.assign(len, 0);
+        for (auto const &[addr, s] : _sparse_slots) _dense_slots[addr] = s;
+        std::unordered_map<Addr, uint32_t>().swap(_sparse_slots);
+    }
 }
 
-void Vram::write(size_t const i, Word word) {
-    try {
-        auto const errs = _errors.at(i);
-        for (unsigned pos = 0; pos < errs.size(); pos++) switch (errs[pos]) {
-            case NO: break;
-            case TRANSITION_0_TO_1:
-                if (word & (1 << pos)) word &= ~(1 << pos);
-                break;
-            case TRANSITION_1_TO_0:
-                if (!(word & (1 << pos))) word |= (1 << pos);
-                break;
-            case WRITE_OR_READ_DESTRUCTIVE_0:
-                if (!(word & (1 << pos))) word |= (1 << pos);
-                break;
-            case WRITE_OR_READ_DESTRUCTIVE_1:
-                if (word & (1 << pos)) word &= ~(1 << pos);
-                break;
-
-            default:;
-            }
-    } catch (std::out_of_range const &e) {}
-    _data[i] = word;
+void Vram::remove_slot(size_t const i) {
+    uint32_t const slot = slot_of(i);
+    // keep `_faults` contiguous: move the last faulty word into the freed slot
+    if (slot + 1 != _faults.size()) {
+        _faults[slot] = _faults.back();
+        _masks[slot] = _masks.back();
+        Addr const moved = _faults[slot].addr;
+        if (_dense_slots.empty())
+            _sparse_slots[moved] = slot;
+        else
+            _dense_slots[moved] = slot;
+    }
+    _faults.pop_back();
+    _masks.pop_back();
+    if (_dense_slots.empty()) _sparse_slots.erase(i);
+    _faulty[i / 64] &= ~(uint64_t{1} << (i % 64));
 }
@@ -1,30 +1,133 @@
 #include "vram_test.hpp"
 
+#include <algorithm>
+#include <chrono>
+#include <stdexcept>
+
 VramTest::StepResult VramTest::step() {
-    while (true) {
-        Word const i = _vmach.i();
-        _vmach.step();
-
-        switch (_vmach.state()) {
-        case Vmach::PROGRAM_ENDED: return {StepResult::ENDED};
-
-        case Vmach::PROGRAM_ERROR: throw std::runtime_error("Program error!");
-        case Vmach::PROGRAM_UNKNOWN_OP: throw std::runtime_error("Unknown operation!");
-        case Vmach::STACK_UNDERFLOW: throw std::runtime_error("Program stack underflow!");
-
-        default:;
-        }
-
-        if (_vmach.last_op() == Vmach::opcode_write) {
-            return {StepResult::WRITE, i};
-        } else if (_vmach.last_op() == Vmach::opcode_assert) {
-            if (_vmach.state() == Vmach::ASSERTION_FAILED) {
-                _vmach.contin();
-                _detected_errors.push_back(i);
-                return {StepResult::TEST_FAILED, i};
-            } else {
-                return {StepResult::TEST_SUCCEEDED, i};
-            }
-        }
+    StepResult const result = next_result();
+    _event_counts[result.type]++;
+    if (result.type == StepResult::ENDED) return result;
+    if (_trace) {
+        Word const value = result.i < _ram.len ? _ram.load(result.i) : 0;
+        _trace->record(result.type, result.i, value, _vmach.last_pc());
+    }
+    _steps++;
+    _last = result;
+    if (_checkpoint_every && _steps - _checkpoints.back().step >= _checkpoint_every) checkpoint();
+    return result;
+}
+
+VramTest::StepResult VramTest::next_result() {
+    _vmach.step_to_event();
+    // neither `write` nor `assert!` moves `i`
+    Addr const i = _vmach.i();
+
+    switch (_vmach.state()) {
+    case Vmach::PROGRAM_ENDED: return {StepResult::ENDED, i};
+
+    case Vmach::PROGRAM_ERROR: throw std::runtime_error("Program error!");
+    case Vmach::PROGRAM_UNKNOWN_OP: throw std::runtime_error("Unknown operation!");
+    case Vmach::STACK_UNDERFLOW: throw std::runtime_error("Program stack underflow!");
+
+    case Vmach::ASSERTION_FAILED:
+        _vmach.contin();
+        _detected_errors.push_back(i);
+        return {StepResult::TEST_FAILED, i};
+
+    default:;
+    }
+
+    return {_vmach.last_op() == Program::WRITE ? StepResult::WRITE : StepResult::TEST_SUCCEEDED, i};
+}
+
+/// Adds the lifetime of the object to `total`.
+class ScopedTimer {
+   public:
+    explicit ScopedTimer(double &total) : _total(total), _start(std::chrono::steady_clock::now()) {}
+    ~ScopedTimer() {
+        _total += std::chrono::duration<double>(std::chrono::steady_clock::now() - _start).count();
+    }
+
+   private:
+    double &_total;
+    std::chrono::steady_clock::time_point const _start;
+};
+
+VramTest::StepResults VramTest::run(size_t const max_steps) {
+    ScopedTimer const timer(_run_seconds);
+    StepResults results;
+    results.reserve(std::min<size_t>(max_steps, 1 << 16));
+    while (results.size() < max_steps) {
+        results.push_back(step());
+        if (results.back().type == StepResult::ENDED) break;
+    }
+    return results;
+}
+
+void VramTest::finish() {
+    ScopedTimer const timer(_run_seconds);
+    while (step().type != StepResult::ENDED);
+}
+
+void VramTest::enable_checkpoints(size_t const every, size_t const budget_bytes) {
+    _checkpoints.clear();
+    _ram_base = {};
+    _checkpoint_bytes = 0;
+    _checkpoint_every = every;
+    _checkpoint_budget = budget_bytes;
+    if (every) checkpoint();
+}
+
+void VramTest::seek(size_t const target) {
+    if (_checkpoints.empty() || target < _checkpoints.front().step || target > _steps)
+        throw std::out_of_range("No checkpoint before this step!");
+    auto const after = std::upper_bound(_checkpoints.begin(), _checkpoints.end(), target,
+                                        [](size_t s, Checkpoint const &c) { return s < c.step; });
+    _checkpoints.erase(after, _checkpoints.end());
+    count_checkpoint_bytes();
+
+    Checkpoint const &from = _checkpoints.back();
+    _ram.restore(from.ram);
+    _ram_base = from.ram;
+    _vmach.restore(from.vmach);
+    _detected_errors.resize(from.detected_errors);
+    _event_counts = from.event_counts;
+    _last = from.last;
+    _steps = from.step;
+
+    // the events up to `target` are in the trace already: replay without recording
+    auto trace = std::move(_trace);
+    if (trace && target < _trace_start) trace.reset();
+    if (trace) trace->truncate(target - _trace_start);
+    while (_steps < target) step();
+    _trace = std::move(trace);
+}
+
+void VramTest::checkpoint() {
+    size_t copied = 0;
+    _ram_base = _ram.snapshot(_checkpoints.empty() ? nullptr : &_ram_base, &copied);
+    _checkpoints.push_back({_steps, _ram_base, _vmach.snapshot(), _detected_errors.size(),
+                            _event_counts, _last});
+    _checkpoint_bytes += copied;
+    if (_checkpoint_bytes <= _checkpoint_budget || _checkpoints.size() < 3) return;
+
+    // thin out: keep every other checkpoint, starting from the first
+    size_t kept = 1;
+    for (size_t k = 2; k < _checkpoints.size(); k += 2) _checkpoints[kept++] = std::move(_checkpoints[k]);
+    _checkpoints.resize(kept);
+    _checkpoint_every *= 2;
+    count_checkpoint_bytes();
+}
+
+void VramTest::count_checkpoint_bytes() {
+    // a page is only ever shared with the snapshot before, so its holders are consecutive
+    size_t const total = _ram.len * _ram.word_bytes();
+    _checkpoint_bytes = 0;
+    for (size_t k = 0; k < _checkpoints.size(); k++) {
+        auto const &pages = _checkpoints[k].ram.pages;
+        for (size_t page = 0; page < pages.size(); page++)
+            if (k == 0 || pages[page] != _checkpoints[k - 1].ram.pages[page])
+                _checkpoint_bytes += std::min(Vram::page_bytes, total - page * Vram::page_bytes);
     }
 }
@@ -0,0 +1,380 @@
+# app/bench.py
+"""
+Замеры производительности бэкенда и обновления интерфейса:
+
+    python -m app.bench -o bench.json
+    python -m app.bench --baseline bench.json --tolerance 0.15
+
+Каждый замер повторяется, берётся лучший результат. С --baseline печатается сравнение,
+а при ухудшении любого замера больше чем на tolerance код возврата — 1.
+Замеры интерфейса идут на платформе Qt offscreen.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from app.utils.constants import AppConstants
+from app.core.runner import test_name
+from app.core.run_pool import RunPool
+from app.core.campaign import run_chunk
+from app.core.program_cache import ProgramCache
+from back_pyd.vram_backend import Vram, TestRunner
+
+FAULT_DENSITIES = (0.0, 0.001, 0.01, 0.1, 1.0)
+RAM_SIZES = (16, 256, 4096, 65536, 1 << 20)
+QUICK_RAM_SIZES = (16, 4096, 65536)
+UI_WORDS = 1 << 20
+UI_FAULTS = 200_000
+# Память для замера прогона во вкладке тестирования
+PLAYBACK_WORDS = 65536
+SCRUB_MOVES = 300
+
+# Программы для замера чтения и записи бэкендом (обход всей памяти)
+SWEEP_PROGRAMS = {
+    "write": "0 loop 0 write asc endloop",
+    "read": "0 loop read drop asc endloop",
+}
+
+
+class Bench:
+    def __init__(self, repeats, min_time, name_filter=None):
+        self.repeats = repeats
+        self.min_time = min_time
+        self.name_filter = name_filter
+        self.results = {}
+
+    def wanted(self, name):
+        return self.name_filter is None or self.name_filter in name
+
+    def measure(self, name, func, work=1, unit="s", setup=None):
+        """
+        Лучшее из repeats время вызова func (после setup, вне замера). При unit="ops/s"
+        результат — work / время, иначе — само время в секундах.
+        Быстрые замеры повторяются внутри одного повтора, пока не наберётся min_time.
+        """
+        if not self.wanted(name):
+            return
+        best = None
+        for _ in range(self.repeats):
+            calls, elapsed = 0, 0.0
+            while elapsed < self.min_time or calls == 0:
+                state = setup() if setup else None
+                start = time.perf_counter()
+                func(state) if setup else func()
+                elapsed += time.perf_counter() - start
+                calls += 1
+            per_call = elapsed / calls
+            best = per_call if best is None else min(best, per_call)
+        self.record(name, work / best if unit == "ops/s" else best, unit)
+
+    def record(self, name, value, unit="s"):
+        self.results[name] = {"value": value, "unit": unit, "higher_is_better": unit == "ops/s"}
+        print(f"{name:<64} {format_value(value, unit)}", file=sys.stderr)
+
+
+def format_value(value, unit):
+    if unit == "ops/s":
+        return f"{value:>14,.0f} ops/s".replace(",", " ")
+    return f"{value * 1000:>14.3f} ms"
+
+
+def faulty_vram(words, density, rng):
+    """Vram, в которой у доли density слов есть по одной случайной неисправности."""
+    vram = Vram(words)
+    count = int(words * density)
+    if count:
+        addrs = rng.choice(words, size=count, replace=False).astype(np.uint32)
+        bits = rng.integers(0, AppConstants.BITS_PER_WORD, size=count, dtype=np.uint8)
+        types = rng.integers(1, len(Vram.ErrType.__members__), size=count, dtype=np.uint8)
+        vram.set_errors(addrs, bits, types)
+    return vram
+
+
+def bench_vram(bench, words, tmpdir):
+    rng = np.random.default_rng(1)
+    sweep_paths = {}
+    for kind, source in SWEEP_PROGRAMS.items():
+        sweep_paths[kind] = os.path.join(tmpdir, f"sweep_{kind}.kids")
+        with open(sweep_paths[kind], 'w') as f:
+            f.write(source)
+
+    for density in FAULT_DENSITIES:
+        vram = faulty_vram(words, density, rng)
+        tag = f"density={density:g}"
+
+        # Обращения из Python: стоимость вызова через pybind11
+        calls = min(words, 100_000)
+        bench.measure(f"vram.py_read[{tag}]", lambda: [vram.read(i) for i in range(calls)],
+                      work=calls, unit="ops/s")
+        bench.measure(f"vram.py_write[{tag}]", lambda: [vram.write(i, 0x5A5A) for i in range(calls)],
+                      work=calls, unit="ops/s")
+
+        # Обращения внутри бэкенда: программа обходит всю память
+        for kind, path in sweep_paths.items():
+            program = TestRunner.compile(path)
+            bench.measure(f"vram.sweep_{kind}[{tag}]", lambda runner: runner.finish(),
+                          setup=lambda: TestRunner(vram, program), work=words, unit="ops/s")
+
+
+def bench_runner(bench, sizes):
+    for path in sorted(glob.glob(os.path.join(AppConstants.TEST_FILES_PATH, "*.kids"))):
+        try:
+            program = TestRunner.compile(path)
+        except Exception as e:
+            print(f"{test_name(path)}: пропущен: {e}", file=sys.stderr)
+            continue
+        # Загрузка теста: разбор файла при каждом сбросе против программы из ProgramCache
+        vram = Vram(min(sizes))
+        programs = ProgramCache()
+        bench.measure(f"runner.load_file[{test_name(path)}]", lambda: TestRunner(vram, path))
+        bench.measure(f"runner.load_cached[{test_name(path)}]", lambda: TestRunner(vram, programs.get(path)))
+        # Статическая оценка числа операций (без кэша ProgramCache)
+        bench.measure(f"runner.estimate[{test_name(path)}]", lambda: program.estimate(max(sizes)))
+        for words in sizes:
+            vram = Vram(words)
+            # Число событий известно после одного прогона
+            runner = TestRunner(vram, program)
+            runner.finish()
+            events = sum(runner.event_counts())
+            bench.measure(f"runner.{test_name(path)}[words={words}]", lambda runner: runner.finish(),
+                          setup=lambda: TestRunner(vram, program), work=events, unit="ops/s")
+
+
+def bench_pool(bench, words, runs):
+    """Пропускная способность RunPool: runs прогонов march_x на отдельных Vram при разном числе потоков."""
+    path = os.path.join(AppConstants.TEST_FILES_PATH, "march_x.kids")
+    if not os.path.exists(path):
+        return
+    for workers in sorted({1, os.cpu_count() or 1}):
+        with RunPool(workers) as pool:
+            program = pool.program(path)
+            events = sum(sum(r[k] for k in ("writes", "reads_ok", "reads_failed"))
+                         for r in pool.run([(Vram(words), program)] * runs))
+            bench.measure(f"pool.march_x[words={words},runs={runs},workers={workers}]",
+                          lambda vrams: pool.run([(vram, program) for vram in vrams]),
+                          setup=lambda: [Vram(words) for _ in range(runs)], work=events, unit="ops/s")
+
+
+def bench_campaign(bench, words):
+    """Покрытие march_x одиночными неисправностями: по прогону на неисправность и бит-параллельно."""
+    path = os.path.join(AppConstants.TEST_FILES_PATH, "march_x.kids")
+    if not os.path.exists(path):
+        return
+    injections = words * AppConstants.BITS_PER_WORD
+    for bit_parallel in (False, True):
+        mode = "bit_parallel" if bit_parallel else "serial"
+        bench.measure(f"campaign.{mode}[words={words}]",
+                      lambda: run_chunk(path, words, AppConstants.BITS_PER_WORD, "STUCK_AT_0", 0, words,
+                                        bit_parallel),
+                      work=injections, unit="ops/s")
+
+
+def bench_ui(bench, words, faults, tmpdir):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from app.tabs import config_tab
+    from app.widgets.ram_grid import RamGridWidget
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    rng = np.random.default_rng(2)
+    type_names = [name for name in Vram.ErrType.__members__ if name != "NO"]
+    addrs = rng.integers(0, words, faults)
+    bits = rng.integers(0, AppConstants.BITS_PER_WORD, faults)
+    types = rng.integers(0, len(type_names), faults)
+    config_path = os.path.join(tmpdir, "faults.json")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump({"ram_size_words": words,
+                   "faults": [{"addr": int(a), "bit": int(b), "type": type_names[t]}
+                              for a, b, t in zip(addrs, bits, types)]}, f)
+
+    tab = config_tab.ConfigTab(Vram(AppConstants.DEFAULT_WORD_COUNT))
+    # load_config целиком (чтение JSON, VRAM, список, таблица), но без диалогов
+    dialogs = config_tab.QFileDialog.getOpenFileName, config_tab.QMessageBox.information
+    config_tab.QFileDialog.getOpenFileName = staticmethod(lambda *args: (config_path, ""))
+    config_tab.QMessageBox.information = staticmethod(lambda *args: None)
+    try:
+        bench.measure(f"ui.config_tab.load_config[words={words},faults={faults}]", tab.load_config)
+    finally:
+        config_tab.QFileDialog.getOpenFileName, config_tab.QMessageBox.information = dialogs
+    bench.measure(f"ui.config_tab.update_all_grid_values[words={words},faults={faults}]",
+                  tab.update_all_grid_values)
+
+    grid = RamGridWidget(read_only=True)
+    grid.update_dimensions(words)
+    values = np.arange(words, dtype=np.uint16)
+    # flush: dataChanged сетка отправляет раз в кадр, замер включает и его
+    bench.measure(f"ui.ram_grid.set_all_values[words={words}]",
+                  lambda: (grid.set_all_values(values), grid.flush()))
+    bench.measure(f"ui.ram_grid.reset_grid[words={words}]", lambda: (grid.reset_grid(), grid.flush()))
+    app.processEvents()
+
+    bench_testing_tab(bench, app, PLAYBACK_WORDS)
+
+
+def bench_testing_tab(bench, app, words):
+    """
+    Турбо-прогон march_x во вкладке тестирования целиком: поток, пачки, подписи, отрисовка
+    (сравнивается с runner.march_x: разница — цена интерфейса). Затем — перетаскивание
+    ползунка хронологии по готовой трассе.
+    """
+    play_name = f"ui.testing_tab.play_turbo[words={words}]"
+    scrub_name = f"ui.testing_tab.scrub_timeline[words={words},moves={SCRUB_MOVES}]"
+    if not (bench.wanted(play_name) or bench.wanted(scrub_name)):
+        return
+    from app.tabs.testing_tab import TestingTab
+    from app.workers.test_library import TestLibrary
+    from app.core.runner import expected_events
+
+    class NoReport:
+        def add_result(self, *args):
+            pass
+
+    library = TestLibrary()
+    if "march_x" not in library.tests:
+        library.close()
+        return
+    tab = TestingTab(Vram(words), NoReport(), library)
+    tab.resize(AppConstants.WINDOW_WIDTH, AppConstants.WINDOW_HEIGHT)
+    tab.show()
+    tab.combo_tests.setCurrentText("march_x")
+    tab.chk_turbo.setChecked(True)
+
+    def play(_):
+        tab.toggle_play()
+        while not tab.worker.isFinished():
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+
+    def scrub():
+        # Кадр приходит на каждые несколько движений мыши
+        slider = tab.slider_timeline
+        for k in range(SCRUB_MOVES):
+            slider.setValue(slider.maximum() - k * slider.maximum() // SCRUB_MOVES)
+            if k % 10 == 9:
+                app.processEvents()
+        tab.frame.flush()
+
+    try:
+        bench.measure(play_name, play, work=expected_events(library.estimate("march_x", words)),
+                      unit="ops/s", setup=lambda: tab.load_test())
+        if bench.wanted(scrub_name):
+            tab.load_test()
+            play(None)
+            while tab.trace is None:
+                app.processEvents()
+                time.sleep(0.001)
+            bench.measure(scrub_name, scrub)
+    finally:
+        tab.stop_worker()
+        tab.close_trace()
+        tab.close()
+        library.close()
+
+
+def bench_startup(bench):
+    """Запуск окна в отдельном процессе (main.py --startup-time): первая отрисовка и готовность."""
+    if not (bench.wanted("ui.startup.first_paint") or bench.wanted("ui.startup.interactive")):
+        return
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    runs = []
+    for _ in range(bench.repeats):
+        out = subprocess.run([sys.executable, "main.py", "--startup-time"], capture_output=True,
+                             text=True, env=env, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    bench.record("ui.startup.first_paint", min(r["first_paint_s"] for r in runs))
+    bench.record("ui.startup.interactive", min(r["interactive_s"] for r in runs))
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Печатает сравнение с базой; возвращает имена замеров, ухудшившихся больше чем на tolerance."""
+    regressions = []
+    print(f"\n{'замер':<64} {'база':>14} {'сейчас':>14} {'изм.':>8}", file=sys.stderr)
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # > 1 — стало лучше
+        ratio = (cur["value"] / base["value"] if cur["higher_is_better"]
+                 else base["value"] / cur["value"])
+        mark = ""
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+            mark = "  РЕГРЕССИЯ"
+        unit = cur["unit"]
+        print(f"{name:<64} {format_value(base['value'], unit).split()[0]:>14} "
+              f"{format_value(cur['value'], unit).split()[0]:>14} {(ratio - 1) * 100:>+7.1f}%{mark}", file=sys.stderr)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.bench",
+                                     description="Замеры производительности бэкенда и интерфейса.")
+    parser.add_argument("-o", "--output", help="файл результатов JSON (по умолчанию stdout)")
+    parser.add_argument("--baseline", help="JSON прошлого запуска для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="допустимое ухудшение относительно базы (по умолчанию %(default)s)")
+    parser.add_argument("--repeats", type=int, default=5, help="повторов каждого замера")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="минимальная длительность одного повтора, с")
+    parser.add_argument("--quick", action="store_true", help="меньшие размеры памяти и списков")
+    parser.add_argument("--no-ui", action="store_true", help="без замеров интерфейса (без PyQt6)")
+    parser.add_argument("-k", "--filter", help="только замеры, в имени которых есть эта строка")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    bench = Bench(args.repeats, args.min_time, args.filter)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_vram(bench, 65536 if args.quick else UI_WORDS, tmpdir)
+        bench_runner(bench, QUICK_RAM_SIZES if args.quick else RAM_SIZES)
+        bench_pool(bench, 4096 if args.quick else 65536, 32)
+        bench_campaign(bench, 64 if args.quick else 256)
+        if not args.no_ui:
+            bench_ui(bench, 65536 if args.quick else UI_WORDS, 20_000 if args.quick else UI_FAULTS, tmpdir)
+            bench_startup(bench)
+
+    report = {"meta": metadata(), "results": bench.results}
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        if compare(bench.results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
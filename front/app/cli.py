@@ -0,0 +1,126 @@
+# app/cli.py
+"""
+Пакетный прогон тестов без графического интерфейса:
+
+    python -m app.cli -c config.json res/march_x.kids res/test.kids --format json -o report.json
+
+С --server тесты выполняются на сервере заданий (python -m app.server) параллельно.
+PyQt6 здесь не импортируется.
+"""
+import argparse
+import json
+import sys
+from app.core import jobs
+from app.core.config import load_config, default_config, word_bits_of
+from app.core.report import format_report
+from app.core.result_cache import ResultCache
+from app.core.runner import run_test, test_name
+from app.utils.constants import AppConstants
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli",
+                                     description="Пакетный прогон .kids тестов на модели RAM с неисправностями.")
+    parser.add_argument("tests", nargs="+", help="файлы .kids")
+    parser.add_argument("-c", "--config", help="JSON-конфигурация из вкладки 'Конфигурация'")
+    parser.add_argument("-w", "--words", type=int, help="размер памяти в словах (переопределяет конфигурацию)")
+    parser.add_argument("-b", "--word-bits", type=int, choices=AppConstants.WORD_WIDTHS,
+                        help="ширина слова в битах (переопределяет конфигурацию)")
+    parser.add_argument("-f", "--format", choices=("text", "json"), default="text")
+    parser.add_argument("-o", "--output", help="файл отчёта (по умолчанию stdout)")
+    parser.add_argument("--cache", default=AppConstants.RESULT_CACHE_PATH,
+                        help="файл кэша результатов (по умолчанию %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="не использовать кэш результатов")
+    parser.add_argument("--server", nargs="?", metavar="HOST:PORT",
+                        const=f"{AppConstants.JOB_SERVER_HOST}:{AppConstants.JOB_SERVER_PORT}",
+                        help="выполнять на сервере заданий (по умолчанию %(const)s)")
+    return parser.parse_args(argv)
+
+
+def run_on_server(address, config, paths, cache=None):
+    """Как run_test для каждого пути, но на сервере заданий; результаты в порядке путей."""
+    results = [None] * len(paths)
+    keys = {}
+    # Номер задания -> индекс пути
+    pending = {}
+    with jobs.JobConnection(*address) as connection:
+        for index, path in enumerate(paths):
+            try:
+                if cache is not None:
+                    keys[index] = cache.key(path, config)
+                    result = cache.get(keys[index])
+                    if result is not None:
+                        result.update(path=path, cached=True)
+                        results[index] = result
+                        continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    job = connection.submit(test_name(path), f.read(), config)["job"]
+                pending[job] = index
+            except (OSError, jobs.JobError) as e:
+                # Нечитаемый файл или отклонённая программа не останавливают остальные
+                results[index] = {"test": test_name(path), "path": path, "status": "error", "error": str(e)}
+
+        for update in connection.updates() if pending else ():
+            if update["state"] not in jobs.FINISHED or update["job"] not in pending:
+                continue
+            index = pending.pop(update["job"])
+            path = paths[index]
+            if update["state"] == jobs.DONE:
+                result = update["result"]
+                if cache is not None:
+                    cache.put(keys[index], result)
+                    result["cached"] = False
+                results[index] = dict(result, path=path)
+            else:
+                results[index] = {"test": test_name(path), "path": path, "status": "error",
+                                  "error": update.get("error", update["state"])}
+            if not pending:
+                break
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    config = load_config(args.config) if args.config else default_config()
+    if args.words is not None:
+        config["ram_size_words"] = args.words
+    if args.word_bits is not None:
+        config["word_bits"] = args.word_bits
+
+    cache = None if args.no_cache else ResultCache(args.cache)
+
+    if args.server:
+        results = run_on_server(jobs.parse_address(args.server), config, args.tests, cache)
+    else:
+        results = []
+        for path in args.tests:
+            try:
+                results.append(run_test(config, path, cache))
+            except Exception as e:
+                # Ошибка программы теста не должна останавливать остальные прогоны
+                results.append({"test": test_name(path), "path": path, "status": "error", "error": str(e)})
+    exit_code = 2 if any(r["status"] == "error" for r in results) else 0
+
+    if args.format == "json":
+        text = json.dumps({"config": args.config, "ram_size_words": config.get("ram_size_words"),
+                           "word_bits": word_bits_of(config), "results": results}, indent=4, ensure_ascii=False)
+    else:
+        parts = []
+        for r in results:
+            if r["status"] == "error":
+                parts.append(f"{r['test']}: ОШИБКА ВЫПОЛНЕНИЯ: {r['error']}\n")
+            else:
+                parts.append(format_report(r["test"], r["errors"]))
+        text = "\n".join(parts)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+# app/core/campaign.py
+"""
+Кампания покрытия одиночных неисправностей: каждый тест прогоняется на свежей Vram
+для каждой тройки (тип неисправности, адрес, бит). Прогоны распределяются по пулу процессов.
+
+В бит-параллельном режиме (FaultSim) один прогон программы проверяет сразу до 64 неисправностей
+одного типа; если ход программы зависит от неисправности (then, i=, начало loop),
+эти неисправности прогоняются по одной.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from app.utils.constants import AppConstants
+from app.core.runner import test_name, estimated_steps
+from back_pyd.vram_backend import Vram, TestRunner, FaultSim
+
+FAULT_TYPES = [name for name in Vram.ErrType.__members__ if name != "NO"]
+
+
+def detects(program, words, word_bits, err_type, addr, bit):
+    """Обнаруживает ли программа одну неисправность err_type в бите bit слова addr."""
+    vram = Vram(words, word_bits)
+    vram.set_error(addr, bit, err_type)
+    runner = TestRunner(vram, program)
+    runner.finish()
+    return len(runner.detected_errors()) > 0
+
+
+def run_chunk(path, words, word_bits, type_name, start, stop, bit_parallel=True):
+    """
+    Выполняется в процессе пула. Возвращает матрицу (stop - start) x word_bits:
+    True — неисправность в этом бите обнаружена тестом.
+    """
+    err_type = Vram.ErrType.__members__[type_name]
+    program = TestRunner.compile(path)
+    detected = np.zeros((stop - start, word_bits), dtype=bool)
+    if not bit_parallel:
+        for addr in range(start, stop):
+            for bit in range(word_bits):
+                detected[addr - start, bit] = detects(program, words, word_bits, err_type, addr, bit)
+        return detected
+
+    # Неисправности по порядку (адрес, бит), по FaultSim.lanes на прогон
+    addrs = np.repeat(np.arange(start, stop, dtype=np.uint32), word_bits)
+    bits = np.tile(np.arange(word_bits, dtype=np.uint8), stop - start)
+    flat = detected.reshape(-1)
+    sim = FaultSim(program, words, word_bits)
+    for first in range(0, flat.size, FaultSim.lanes):
+        last = min(first + FaultSim.lanes, flat.size)
+        mask = sim.run(err_type, addrs[first:last], bits[first:last])
+        if mask is None:
+            flat[first:last] = [detects(program, words, word_bits, err_type, int(a), int(b))
+                                for a, b in zip(addrs[first:last], bits[first:last])]
+        else:
+            lanes = np.unpackbits(np.array([mask], dtype="<u8").view(np.uint8), bitorder="little")
+            flat[first:last] = lanes[:last - first]
+    return detected
+
+
+def check_program(path, words, word_bits=AppConstants.BITS_PER_WORD):
+    """Прогон без неисправностей: None, если программа корректна, иначе текст ошибки."""
+    vram = Vram(words, word_bits)
+    try:
+        runner = TestRunner(vram, path)
+        runner.finish()
+    except Exception as e:
+        return str(e)
+    if runner.detected_errors():
+        return "Тест находит ошибки в исправной памяти"
+    return None
+
+
+class Campaign:
+    def __init__(self, tests, words, fault_types=None, word_bits=AppConstants.BITS_PER_WORD,
+                 bit_parallel=True, programs=None):
+        self.tests = list(tests)
+        # ProgramCache для оценки длительности тестов; без него файлы компилируются заново
+        self.programs = programs
+        self.names = [test_name(path) for path in self.tests]
+        self.words = words
+        self.word_bits = word_bits
+        self.bit_parallel = bit_parallel
+        self.fault_types = list(fault_types or FAULT_TYPES)
+
+        # detected[имя теста]: тип x адрес x бит
+        shape = (len(self.fault_types), words, word_bits)
+        self.detected = {name: np.zeros(shape, dtype=bool) for name in self.names}
+        # Тесты, которые не удалось выполнить даже без неисправностей
+        self.errors = {}
+
+        self.total_injections = 0
+        self.done_injections = 0
+        self.elapsed_s = 0.0
+        self._started = None
+        # future -> имя теста (проверка без неисправностей) или часть работы
+        self._checks = {}
+        self._chunks = {}
+
+    def chunks(self, chunk_words):
+        """Части работы: (путь, тип, начальный адрес, конечный адрес)."""
+        for path, name in zip(self.tests, self.names):
+            if name in self.errors:
+                continue
+            for type_name in self.fault_types:
+                for start in range(0, self.words, chunk_words):
+                    yield path, type_name, start, min(start + chunk_words, self.words)
+
+    def estimated_steps(self, path):
+        try:
+            program = self.programs.get(path) if self.programs is not None else TestRunner.compile(path)
+        except Exception:
+            # Ошибку компиляции сообщит проверка в пуле
+            return 0
+        return estimated_steps(program, self.words)
+
+    def submit(self, executor, workers):
+        """
+        Ставит всю кампанию в пул; возвращает future: сначала проверки тестов без неисправностей,
+        затем части работы. Части теста, не прошедшего проверку, отменяются в collect.
+        """
+        self._started = time.perf_counter()
+        futures = []
+        for path, name in zip(self.tests, self.names):
+            future = executor.submit(check_program, path, self.words, self.word_bits)
+            self._checks[future] = name
+            futures.append(future)
+        # Оценка инструкций одного прогона каждого теста (Program.estimate)
+        steps = {path: self.estimated_steps(path) for path in self.tests}
+
+        # Около 8 частей на процесс, чтобы выровнять нагрузку; в бит-параллельном режиме
+        # в части не меньше одного прогона FaultSim
+        parts = max(1, len(self.tests) * len(self.fault_types))
+        chunk_words = max(1, min(self.words, -(-self.words * parts // (workers * 8))))
+        if self.bit_parallel:
+            chunk_words = min(self.words, max(chunk_words, -(-FaultSim.lanes // self.word_bits)))
+
+        # Сначала самые долгие части: короткие в конце выравнивают загрузку процессов
+        chunks = sorted(self.chunks(chunk_words), key=lambda c: -steps[c[0]] * (c[3] - c[2]))
+        self.total_injections = 0
+        for path, type_name, start, stop in chunks:
+            future = executor.submit(run_chunk, path, self.words, self.word_bits, type_name, start, stop,
+                                     self.bit_parallel)
+            self._chunks[future] = (test_name(path), type_name, start, stop)
+            futures.append(future)
+            self.total_injections += (stop - start) * self.word_bits
+        return futures
+
+    def collect(self, future):
+        if future in self._checks:
+            self.collect_check(future)
+            return
+        chunk = self._chunks.pop(future, None)
+        if chunk is None:
+            # Проверка, уже учтённая из-за ошибки в части
+            return
+        name, type_name, start, stop = chunk
+        if name in self.errors:
+            return
+        try:
+            detected = future.result()
+        except Exception:
+            # Неверная программа падает и в частях; причину сообщает её проверка
+            check = next((f for f, n in self._checks.items() if n == name), None)
+            if check is not None:
+                self.collect_check(check)
+            if name not in self.errors:
+                raise
+            return
+        self.detected[name][self.fault_types.index(type_name), start:stop] = detected
+        self.done_injections += (stop - start) * self.word_bits
+        self.elapsed_s = time.perf_counter() - self._started
+
+    def collect_check(self, future):
+        name = self._checks.pop(future)
+        error = future.result()
+        if not error:
+            return
+        self.errors[name] = error
+        # Оставшиеся части теста не нужны; уже учтённые вычитаются из прогресса
+        remaining = 0
+        for chunk, (chunk_name, _, start, stop) in self._chunks.items():
+            if chunk_name == name:
+                chunk.cancel()
+                remaining += (stop - start) * self.word_bits
+        per_test = len(self.fault_types) * self.words * self.word_bits
+        self.total_injections -= per_test
+        self.done_injections -= per_test - remaining
+        self.detected[name][:] = False
+
+    def run(self, workers=None, progress=None):
+        """Блокирующий прогон всей кампании; progress(done, total) вызывается по мере готовности."""
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = self.submit(executor, workers)
+            for future in futures:
+                self.collect(future)
+                if progress:
+                    progress(self.done_injections, self.total_injections)
+        return self
+
+    def coverage(self):
+        """Матрица покрытия: {тест: {тип: (обнаружено, всего)}}."""
+        per_type = self.words * self.word_bits
+        return {
+            name: {type_name: (int(self.detected[name][t].sum()), per_type)
+                   for t, type_name in enumerate(self.fault_types)}
+            for name in self.names if name not in self.errors
+        }
+
+    def throughput(self):
+        return self.done_injections / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self):
+        return {
+            "ram_size_words": self.words,
+            "word_bits": self.word_bits,
+            "bit_parallel": self.bit_parallel,
+            "fault_types": self.fault_types,
+            "coverage": {name: {t: {"detected": d, "total": n} for t, (d, n) in types.items()}
+                         for name, types in self.coverage().items()},
+            # Адреса с хотя бы одной пропущенной неисправностью данного типа
+            "missed_addresses": {
+                name: {type_name: np.flatnonzero(~self.detected[name][t].all(axis=1)).tolist()
+                       for t, type_name in enumerate(self.fault_types)}
+                for name in self.names if name not in self.errors
+            },
+            "errors": self.errors,
+            "injections": self.done_injections,
+            "elapsed_s": self.elapsed_s,
+            "injections_per_s": self.throughput(),
+        }
@@ -0,0 +1,47 @@
+# app/core/config.py
+"""
+Конфигурация неисправностей в формате ConfigTab:
+{"ram_size_words": N, "word_bits": 16, "faults": [...]}; без word_bits ширина слова — 16 бит.
+"""
+import json
+from app.utils.constants import AppConstants
+from back_pyd.vram_backend import Vram
+
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def default_config(words=AppConstants.DEFAULT_WORD_COUNT, word_bits=AppConstants.BITS_PER_WORD):
+    return {"ram_size_words": words, "word_bits": word_bits, "faults": []}
+
+
+def word_bits_of(config):
+    return config.get("word_bits", AppConstants.BITS_PER_WORD)
+
+
+def iter_faults(config):
+    """Отдаёт (addr, bit, ErrType) для каждой неисправности конфигурации."""
+    members = Vram.ErrType.__members__
+    for f in config.get("faults", []):
+        if f["type"] not in members:
+            raise ValueError(f"Неизвестный тип неисправности: {f['type']}")
+        yield f["addr"], f["bit"], members[f["type"]]
+
+
+def fault_columns(config):
+    """Неисправности конфигурации тремя списками (адреса, биты, значения ErrType) для Vram.set_errors."""
+    addrs, bits, types = [], [], []
+    for addr, bit, err_type in iter_faults(config):
+        addrs.append(addr)
+        bits.append(bit)
+        types.append(int(err_type))
+    return addrs, bits, types
+
+
+def build_vram(config):
+    """Создаёт Vram нужного размера с назначенными неисправностями."""
+    vram = Vram(config.get("ram_size_words", AppConstants.DEFAULT_WORD_COUNT), word_bits_of(config))
+    vram.set_errors(*fault_columns(config))
+    return vram
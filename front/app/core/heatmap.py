@@ -0,0 +1,98 @@
+# app/core/heatmap.py
+"""
+Накопление ошибок по многим прогонам: в скольких прогонах провалилась проверка каждой пары
+(адрес, бит). Проверка (assert!) сообщает только адрес, поэтому бит берётся из конфигурации
+прогона: провал засчитывается битам этого слова с назначенными неисправностями, а если их нет —
+всем битам слова.
+"""
+import math
+import numpy as np
+from app.core.config import fault_columns, word_bits_of
+from app.utils.constants import AppConstants
+
+MAX_COUNT = np.iinfo(np.uint16).max
+# Индексы палитры: 0 — ошибок не было, 1..LEVELS — от редких к частым
+LEVELS = 255
+
+
+class ErrorHeatmap:
+    def __init__(self, bits=AppConstants.BITS_PER_WORD):
+        self.bits = bits
+        # Адрес x бит; счётчики насыщаются на MAX_COUNT
+        self.counts = np.zeros((0, bits), dtype=np.uint16)
+        self.runs = 0
+
+    @property
+    def words(self):
+        return len(self.counts)
+
+    def clear(self):
+        self.counts = np.zeros((0, self.bits), dtype=np.uint16)
+        self.runs = 0
+
+    def _grow(self, words, bits):
+        """Расширяет карту до words слов и bits битов (прогоны бывают с разной шириной слова)."""
+        if words > len(self.counts) or bits > self.bits:
+            counts = np.zeros((max(words, len(self.counts)), max(bits, self.bits)), dtype=np.uint16)
+            counts[:len(self.counts), :self.bits] = self.counts
+            self.counts = counts
+            self.bits = counts.shape[1]
+
+    def add_run(self, errors, config=None):
+        """errors — адреса проваленных проверок прогона (повторы не важны), config — как у ConfigTab."""
+        self.runs += 1
+        addrs = np.unique(np.asarray(errors, dtype=np.int64))
+        self._grow(max((config or {}).get("ram_size_words") or 0, int(addrs[-1]) + 1 if addrs.size else 0),
+                   word_bits_of(config) if config else self.bits)
+        if addrs.size == 0:
+            return
+
+        hit = np.zeros((len(addrs), self.bits), dtype=bool)
+        if config:
+            fault_addrs, fault_bits, _ = (np.asarray(c, dtype=np.int64) for c in fault_columns(config))
+            known = np.isin(fault_addrs, addrs) & (fault_bits < self.bits)
+            hit[np.searchsorted(addrs, fault_addrs[known]), fault_bits[known]] = True
+        hit[~hit.any(axis=1)] = True
+
+        rows = self.counts[addrs]
+        rows += hit & (rows < MAX_COUNT)
+        self.counts[addrs] = rows
+
+    def words_per_row(self):
+        """Слов в строке изображения: степень двойки, при которой картинка близка к квадрату."""
+        if self.words == 0:
+            return 1
+        return 1 << max(0, round(math.log2(math.sqrt(self.words / self.bits))))
+
+    def to_levels(self, words_per_row, pool=1):
+        """
+        Индексы палитры (uint8, строки x столбцы) для изображения, в строке которого words_per_row
+        слов по bits точек; в слове старший бит слева, как в RamGridWidget. pool (степень двойки) > 1 уменьшает картинку: точка — максимум
+        по блоку pool x pool, поэтому одиночные провалы не теряются.
+        """
+        width = words_per_row * self.bits
+        rows = -(-self.words // words_per_row)
+        rows_padded = -(-rows // pool) * pool
+        grid = np.zeros((rows_padded, width), dtype=np.uint16)
+        grid.reshape(-1)[:self.counts.size] = self.counts[:, ::-1].reshape(-1)
+        while pool > 1:
+            grid = np.maximum(grid[0::2], grid[1::2])
+            grid = np.maximum(grid[:, 0::2], grid[:, 1::2])
+            pool //= 2
+
+        top = int(grid.max(initial=0))
+        levels = np.zeros(grid.shape, dtype=np.uint8)
+        if top:
+            # Логарифмическая шкала: единичные провалы видны рядом с частыми
+            hot = grid > 0
+            scaled = np.log1p(grid[hot].astype(np.float32)) / math.log1p(top)
+            levels[hot] = 1 + np.minimum((scaled * (LEVELS - 1)).astype(np.uint8), LEVELS - 1)
+        return levels
+
+    def hottest(self):
+        """(адрес, бит, прогонов) самой частой ячейки или None, если провалов не было."""
+        if self.counts.size == 0:
+            return None
+        i = int(self.counts.argmax())
+        count = int(self.counts.reshape(-1)[i])
+        return (i // self.bits, i % self.bits, count) if count else None
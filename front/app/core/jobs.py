@@ -0,0 +1,133 @@
+# app/core/jobs.py
+"""
+Протокол сервера заданий (app.server) и блокирующий клиент для него.
+
+Соединение TCP с localhost; в каждую сторону идут строки JSON (JSON-RPC 2.0, одна строка —
+одно сообщение). Запросы клиента:
+
+    submit {"name", "source", "config"}         -> {"job": номер, "queued": заданий перед ним}
+    status {"job"}                               -> {"job", "name", "state", ["result" | "error"]}
+    cancel {"job"}                               -> {"cancelled": снято ли из очереди}
+    stats  {}                                    -> {"workers", "queued", "running", "done"}
+
+config — конфигурация в формате ConfigTab, source — текст .kids программы.
+О своих заданиях клиент получает уведомления без id:
+
+    {"jsonrpc": "2.0", "method": "job", "params": {"job", "name", "state", ["result" | "error"]}}
+
+со state из STATES; result — сводка как у app.core.runner.run_test.
+"""
+import json
+import socket
+from app.utils.constants import AppConstants
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = STATES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Коды ошибок JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Программа не компилируется или конфигурация неверна
+JOB_REJECTED = 1
+# Самое длинное сообщение (программа + конфигурация с неисправностями)
+MAX_MESSAGE_BYTES = 1 << 28
+
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def request(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def reply(request_id, result):
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def error_reply(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def notification(method, params):
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+
+def parse_address(text):
+    """'host:port' или 'port' -> (host, port); хост по умолчанию — JOB_SERVER_HOST."""
+    host, _, port = text.rpartition(":")
+    return host or AppConstants.JOB_SERVER_HOST, int(port)
+
+
+class JobError(Exception):
+    """Ответ сервера с ошибкой JSON-RPC."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class JobConnection:
+    """
+    Блокирующий клиент (для app.cli и скриптов):
+
+        with JobConnection() as jobs:
+            job = jobs.submit("march_x", source, config)["job"]
+            for update in jobs.updates():
+                ...
+
+    Уведомления, пришедшие во время ожидания ответа, не теряются: их отдаёт updates().
+    """
+
+    def __init__(self, host=AppConstants.JOB_SERVER_HOST, port=AppConstants.JOB_SERVER_PORT, timeout=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("r", encoding="utf-8")
+        self.next_id = 1
+        self.pending_updates = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Сервер заданий закрыл соединение")
+        return json.loads(line)
+
+    def call(self, method, **params):
+        request_id = self.next_id
+        self.next_id += 1
+        self.sock.sendall(encode(request(request_id, method, params)))
+        while True:
+            message = self._read()
+            if "id" not in message:
+                self.pending_updates.append(message["params"])
+                continue
+            # Ошибка с id null — сервер не разобрал запрос; запросы здесь по одному, так что это ответ на него
+            if message["id"] not in (request_id, None):
+                continue
+            if "error" in message:
+                raise JobError(message["error"]["code"], message["error"]["message"])
+            return message["result"]
+
+    def submit(self, name, source, config):
+        return self.call("submit", name=name, source=source, config=config)
+
+    def updates(self):
+        """Уведомления о своих заданиях по мере поступления (бесконечно)."""
+        while True:
+            while self.pending_updates:
+                yield self.pending_updates.pop(0)
+            message = self._read()
+            if "id" not in message:
+                yield message["params"]
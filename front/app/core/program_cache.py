@@ -0,0 +1,87 @@
+# app/core/program_cache.py
+"""
+Кэш скомпилированных .kids программ. Запись действительна, пока у файла те же mtime и размер:
+повторный запуск теста не читает и не разбирает файл заново. Ошибка компиляции тоже
+запоминается и выбрасывается снова, пока файл не изменится. Вместе с программой хранятся
+её оценки Program.estimate по размерам памяти.
+"""
+import os
+import glob
+import threading
+from app.core.runner import test_name
+from back_pyd.vram_backend import TestRunner
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def scan_tests(directory):
+    """Имя теста -> путь для всех .kids файлов каталога (по имени)."""
+    return {test_name(path): path for path in sorted(glob.glob(os.path.join(directory, "*.kids")))}
+
+
+class ProgramCache:
+    def __init__(self):
+        # Путь -> (mtime_ns, размер, Program или исключение, {слов: Program.estimate})
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cached(self, path):
+        """Есть ли для файла актуальная запись (без компиляции)."""
+        path = os.path.abspath(path)
+        try:
+            stamp = file_stamp(path)
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._entries.get(path)
+        return entry is not None and entry[:2] == stamp
+
+    def get(self, path):
+        """Скомпилированная программа; файл компилируется заново, только если изменился."""
+        return self._entry(path)[2]
+
+    def estimate(self, path, words):
+        """Program.estimate(words): словарь reads/writes/asserts/steps/exact или None."""
+        _, _, program, estimates = self._entry(path)
+        with self._lock:
+            if words in estimates:
+                return estimates[words]
+        # Оценка считается без блокировки: одновременный повторный расчёт безвреден
+        estimate = program.estimate(words)
+        with self._lock:
+            return estimates.setdefault(words, estimate)
+
+    def _entry(self, path):
+        path = os.path.abspath(path)
+        stamp = file_stamp(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None or entry[:2] != stamp:
+            # Компиляция идёт без блокировки (и без GIL): другие файлы доступны параллельно
+            try:
+                program = TestRunner.compile(path)
+            except Exception as e:
+                program = e
+            entry = (*stamp, program, {})
+            with self._lock:
+                self._entries[path] = entry
+        if isinstance(entry[2], Exception):
+            raise entry[2]
+        return entry
+
+    def retain(self, paths):
+        """Забывает программы файлов, которых нет среди paths (удалённые или переименованные)."""
+        keep = {os.path.abspath(p) for p in paths}
+        with self._lock:
+            for path in self._entries.keys() - keep:
+                del self._entries[path]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
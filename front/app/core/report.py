@@ -0,0 +1,49 @@
+# app/core/report.py
+from datetime import datetime
+from collections import Counter
+
+
+def format_report(test_name, errors, timestamp=None, max_lines=100):
+    """
+    Текстовый отчёт о прогоне теста в формате вкладки результатов.
+    errors — адреса всех событий ошибок или уже готовый словарь {адрес: число событий}.
+    """
+    if timestamp is None:
+        timestamp = datetime.now()
+    timestamp = timestamp.strftime("%d.%m.%Y %H:%M:%S")
+    
+    error_counts = Counter(errors)
+    total_err_count = sum(error_counts.values())
+    unique_addresses = sorted(error_counts.keys())
+    unique_count = len(unique_addresses)
+    
+    status_str = "УСПЕШНО" if total_err_count == 0 else "ПРОВАЛЕН"
+    
+    lines = []
+    lines.append("==================================================")
+    lines.append(f"ОТЧЕТ ОТ {timestamp}")
+    lines.append("==================================================")
+    lines.append(f"Тест       : {test_name}")
+    lines.append(f"Статус     : {status_str}")
+    lines.append(f"Событий    : {total_err_count}")
+    lines.append(f"Битых ячеек: {unique_count}")
+    lines.append("--------------------------------------------------")
+    
+    if unique_count > 0:
+        lines.append("Детализация (Адрес [Кол-во раз]):")
+        
+        for i, addr in enumerate(unique_addresses):
+            if i >= max_lines:
+                lines.append(f"... и еще {unique_count - max_lines} адресов.")
+                break
+            
+            count = error_counts[addr]
+
+            suffix = f" ({count})" if count > 1 else ""
+            lines.append(f"{i+1}. 0x{addr:04X}{suffix}")
+    else:
+        lines.append("Ошибок не обнаружено.")
+
+    lines.append("\n") 
+        
+    return "\n".join(lines)
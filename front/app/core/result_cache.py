@@ -0,0 +1,95 @@
+# app/core/result_cache.py
+"""
+Кэш результатов прогонов на диске. Ключ — версия движка, хэш содержимого .kids файла, размер памяти,
+ширина слова и нормализованный список неисправностей, поэтому изменённый файл просто даёт новый ключ,
+а старые записи вытесняются по LRU при превышении лимита размера.
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+from app.utils.constants import AppConstants
+from app.core.config import word_bits_of
+
+# Увеличивается при каждом изменении результатов прогона: семантики неисправностей Vram,
+# выполнения программ (Vmach) или состава сводки. Записи прежних версий больше не находятся
+# и вытесняются по LRU
+ENGINE_VERSION = 2
+
+
+def normalize_faults(config):
+    """Отсортированный список (addr, bit, type) без NO; повторное назначение бита заменяет прежнее."""
+    faults = {}
+    for f in config.get("faults", []):
+        faults[(f["addr"], f["bit"])] = f["type"]
+    return sorted((addr, bit, t) for (addr, bit), t in faults.items() if t != "NO")
+
+
+class ResultCache:
+    def __init__(self, path=AppConstants.RESULT_CACHE_PATH, max_bytes=AppConstants.RESULT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # (путь, mtime, размер) -> хэш содержимого, чтобы не перечитывать неизменённые файлы
+        self._digests = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS results "
+                        "(key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def file_digest(self, program_path):
+        st = os.stat(program_path)
+        stamp = (os.path.abspath(program_path), st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            with open(program_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._digests[stamp] = digest
+        return digest
+
+    def key(self, program_path, config):
+        payload = json.dumps([ENGINE_VERSION, self.file_digest(program_path),
+                              config.get("ram_size_words", AppConstants.DEFAULT_WORD_COUNT),
+                              word_bits_of(config), normalize_faults(config)], separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        row = self.db.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, result):
+        data = zlib.compress(json.dumps(result, separators=(",", ":")).encode())
+        self.db.execute("INSERT OR REPLACE INTO results (key, data, size, used) VALUES (?, ?, ?, ?)",
+                        (key, data, len(data), time.time()))
+        self.evict()
+        self.db.commit()
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока кэш не уложится в лимит."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+            self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        self.db.execute("DELETE FROM results")
+        self.db.commit()
+
+    def stats(self):
+        count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
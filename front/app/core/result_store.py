@@ -0,0 +1,134 @@
+# app/core/result_store.py
+"""
+Журнал прогонов в SQLite: сводка по каждому прогону и число ошибок по адресам.
+Индексы по имени теста и по адресу позволяют фильтровать журнал, не читая его целиком.
+"""
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+from datetime import datetime
+from collections import Counter
+from app.core.report import format_report
+from app.core.result_cache import normalize_faults
+from app.core.config import word_bits_of
+
+RUN_COLUMNS = ("id", "timestamp", "test", "ram_size_words", "config_hash", "events", "cells")
+
+
+def config_hash(config):
+    """Короткий хэш конфигурации неисправностей (порядок и повторы не влияют)."""
+    if config is None:
+        return ""
+    payload = json.dumps([config.get("ram_size_words"), word_bits_of(config), normalize_faults(config)],
+                         separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class ResultStore:
+    def __init__(self, path=":memory:"):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY, timestamp REAL NOT NULL, test TEXT NOT NULL,
+                ram_size_words INTEGER, config_hash TEXT NOT NULL,
+                events INTEGER NOT NULL, cells INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS runs_test ON runs (test, id);
+            CREATE TABLE IF NOT EXISTS run_errors (
+                run_id INTEGER NOT NULL, addr INTEGER NOT NULL, count INTEGER NOT NULL,
+                PRIMARY KEY (run_id, addr)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS run_errors_addr ON run_errors (addr, run_id);
+        """)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def add_run(self, test_name, errors, config=None, timestamp=None):
+        """Сохраняет прогон; errors — адреса всех событий ошибок (с повторами). Возвращает id."""
+        counts = Counter(errors)
+        ram_size = config.get("ram_size_words") if config is not None else None
+        cur = self.db.execute(
+            "INSERT INTO runs (timestamp, test, ram_size_words, config_hash, events, cells) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (time.time() if timestamp is None else timestamp, test_name, ram_size,
+             config_hash(config), sum(counts.values()), len(counts)))
+        run_id = cur.lastrowid
+        self.db.executemany("INSERT INTO run_errors (run_id, addr, count) VALUES (?, ?, ?)",
+                            ((run_id, int(addr), count) for addr, count in counts.items()))
+        self.db.commit()
+        return run_id
+
+    def _where(self, test=None, addr=None):
+        clauses, params = [], []
+        if test is not None:
+            clauses.append("test = ?")
+            params.append(test)
+        if addr is not None:
+            clauses.append("id IN (SELECT run_id FROM run_errors WHERE addr = ?)")
+            params.append(addr)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def runs(self, test=None, addr=None, before_id=None, limit=None):
+        """Сводки прогонов от новых к старым; before_id/limit — постраничное чтение."""
+        where, params = self._where(test, addr)
+        if before_id is not None:
+            where += (" AND " if where else " WHERE ") + "id < ?"
+            params.append(before_id)
+        sql = f"SELECT {', '.join(RUN_COLUMNS)} FROM runs{where} ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params)
+
+    def count(self, test=None, addr=None):
+        where, params = self._where(test, addr)
+        return self.db.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+    def run(self, run_id):
+        row = self.db.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(zip(RUN_COLUMNS, row)) if row else None
+
+    def error_counts(self, run_id):
+        """{адрес: число событий ошибок} для прогона."""
+        return dict(self.db.execute("SELECT addr, count FROM run_errors WHERE run_id = ? ORDER BY addr",
+                                    (run_id,)))
+
+    def tests(self):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT test FROM runs ORDER BY test")]
+
+    def clear(self):
+        self.db.execute("DELETE FROM run_errors")
+        self.db.execute("DELETE FROM runs")
+        self.db.commit()
+
+    def export_csv(self, f, test=None, addr=None):
+        """Пишет по строке на (прогон, адрес); прогон без ошибок даёт одну строку с пустым адресом."""
+        writer = csv.writer(f)
+        writer.writerow(RUN_COLUMNS + ("addr", "count"))
+        where, params = self._where(test, addr)
+        rows = self.db.execute(
+            f"SELECT {', '.join('r.' + c for c in RUN_COLUMNS)}, e.addr, e.count "
+            f"FROM (SELECT * FROM runs{where}) r LEFT JOIN run_errors e ON e.run_id = r.id "
+            f"ORDER BY r.id DESC, e.addr", params)
+        for row in rows:
+            writer.writerow(row)
+
+    def export_json(self, f, test=None, addr=None):
+        """JSON-массив прогонов; записывается по одному прогону, без сборки всей строки в памяти."""
+        f.write("[")
+        for i, row in enumerate(self.runs(test, addr)):
+            record = dict(zip(RUN_COLUMNS, row))
+            record["errors"] = {f"0x{a:04X}": c for a, c in self.error_counts(record["id"]).items()}
+            f.write(",\n" if i else "\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n]\n")
+
+    def export_text(self, f, test=None, addr=None):
+        """Отчёты format_report по каждому прогону, как в прежнем текстовом журнале."""
+        for row in self.runs(test, addr):
+            record = dict(zip(RUN_COLUMNS, row))
+            f.write(format_report(record["test"], self.error_counts(record["id"]),
+                                  datetime.fromtimestamp(record["timestamp"])))
+            f.write("\n")
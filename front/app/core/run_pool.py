@@ -0,0 +1,78 @@
+# app/core/run_pool.py
+"""
+Параллельный прогон многих пар (Vram, программа) в одном процессе.
+
+Бэкенд выполняет тест без GIL, поэтому прогоны на пуле потоков идут действительно
+параллельно. Каждая Vram защищена своим мьютексом: пары с разными Vram не мешают друг другу,
+пары с общей Vram выполняются по очереди.
+
+    with RunPool(workers=8) as pool:
+        results = pool.run([(vram_a, "res/march_x.kids"), (vram_b, program)])
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.core.runner import summarize_events, estimated_steps
+from app.core.program_cache import ProgramCache
+from back_pyd.vram_backend import TestRunner
+
+
+class RunPool:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="kidsvt-run")
+        # Скомпилированные программы, общие для всех прогонов
+        self.programs = ProgramCache()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self, cancel=False):
+        self.executor.shutdown(wait=True, cancel_futures=cancel)
+
+    def program(self, program):
+        """Скомпилированная программа: путь компилируется заново, только если файл изменился; Program — как есть."""
+        if not isinstance(program, (str, os.PathLike)):
+            return program
+        return self.programs.get(os.fspath(program))
+
+    def submit(self, vram, program):
+        """
+        Ставит прогон в пул; возвращает future со сводкой (см. run_one).
+        Ошибка компиляции выбрасывается сразу, ошибка выполнения — из future.result().
+        """
+        return self.executor.submit(run_one, vram, self.program(program))
+
+    def run(self, pairs, progress=None):
+        """
+        Прогоняет все пары (Vram, путь или Program) и возвращает сводки в том же порядке.
+        progress(done, total) вызывается в вызывающем потоке по мере готовности.
+
+        Прогоны ставятся в очередь от самых долгих по Program.estimate к коротким: длинный прогон
+        не остаётся последним на одном потоке, пока остальные простаивают.
+        """
+        pairs = [(vram, self.program(program)) for vram, program in pairs]
+        order = sorted(range(len(pairs)), key=lambda i: -estimated_steps(pairs[i][1], len(pairs[i][0])))
+        futures = {self.submit(*pairs[i]): i for i in order}
+        results = [None] * len(pairs)
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(done, len(pairs))
+        return results
+
+
+def run_one(vram, program):
+    """Прогоняет программу до конца на vram; сводка как у run_test, без полей конфигурации."""
+    start = time.perf_counter()
+    runner = TestRunner(vram, program)
+    runner.finish()
+    result = summarize_events(runner.event_counts())
+    errors = runner.detected_errors()
+    result["elapsed_s"] = time.perf_counter() - start
+    result["status"] = "passed" if not errors else "failed"
+    result["errors"] = errors
+    return result
@@ -0,0 +1,71 @@
+# app/core/runner.py
+"""Прогон .kids тестов до конца без графического интерфейса."""
+import os
+import math
+import time
+from app.core.config import build_vram
+from back_pyd.vram_backend import TestRunner
+
+WRITE = int(TestRunner.StepResult.Type.WRITE)
+TEST_SUCCEEDED = int(TestRunner.StepResult.Type.TEST_SUCCEEDED)
+TEST_FAILED = int(TestRunner.StepResult.Type.TEST_FAILED)
+
+
+def test_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def summarize_events(counts):
+    """Сводка по количеству событий каждого типа (TestRunner.event_counts)."""
+    return {
+        "writes": int(counts[WRITE]),
+        "reads_ok": int(counts[TEST_SUCCEEDED]),
+        "reads_failed": int(counts[TEST_FAILED]),
+    }
+
+
+def expected_events(estimate):
+    """Число событий прогона (записи и проверки) по Program.estimate; None, если оценки нет."""
+    return estimate["writes"] + estimate["asserts"] if estimate else None
+
+
+def estimated_steps(program, words):
+    """Оценка числа инструкций прогона для планирования; программы без оценки — самые долгие."""
+    estimate = program.estimate(words)
+    return estimate["steps"] if estimate else math.inf
+
+
+def run_test(config, path, cache=None, programs=None):
+    """
+    Прогоняет тест на свежей Vram по конфигурации и возвращает сводку в виде словаря.
+    С `cache` (ResultCache) повторный прогон того же теста с той же конфигурацией не выполняется,
+    с `programs` (ProgramCache) неизменённый файл не компилируется заново.
+    """
+    if cache is not None:
+        key = cache.key(path, config)
+        result = cache.get(key)
+        if result is not None:
+            result.update(path=path, cached=True)
+            return result
+
+    vram = build_vram(config)
+    result = {
+        "test": test_name(path),
+        "path": path,
+        "ram_size_words": config.get("ram_size_words"),
+    }
+
+    start = time.perf_counter()
+    runner = TestRunner(vram, programs.get(path) if programs is not None else path)
+    runner.finish()
+    result.update(summarize_events(runner.event_counts()))
+    result["elapsed_s"] = time.perf_counter() - start
+
+    errors = runner.detected_errors()
+    result["status"] = "passed" if not errors else "failed"
+    result["errors"] = errors
+
+    if cache is not None:
+        cache.put(key, result)
+        result["cached"] = False
+    return result
@@ -0,0 +1,107 @@
+# app/core/trace.py
+"""
+Чтение трассы выполнения, записанной TestRunner.start_trace (формат — back/include/trace.hpp).
+Записи отображаются в память (np.memmap); состояние памяти после n-го события
+восстанавливается от ближайшего снимка, поэтому переход к любому шагу стоит O(шаг снимков + слов).
+"""
+import os
+import numpy as np
+
+MAGIC = b"KIDSTRC2"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("word_bits", "<u4"), ("record_bytes", "<u4"),
+                         ("words", "<u8"), ("reserved", "<u8")])
+
+TEST_FAILED = 2
+# Тип «событий по адресу не было» (совпадает со значением StepResult.Type.ENDED)
+NO_EVENT = 3
+
+
+def record_bytes(word_bits):
+    """Размер записи одного события для слов word_bits (TraceWriter::record_bytes)."""
+    return 8 if word_bits <= 16 else 8 + word_bits // 8
+
+
+class Trace:
+    # Снимков не больше этого числа и не больше этого объёма
+    MAX_SNAPSHOTS = 64
+    SNAPSHOT_BUDGET_BYTES = 256 * 1024 * 1024
+    MIN_SNAPSHOT_STEP = 1 << 16
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path}: не файл трассы")
+        header = header[0]
+        self.words = int(header["words"])
+        self.word_bits = int(header["word_bits"])
+        word_dtype = np.dtype(f"<u{self.word_bits // 8}")
+        # Слова до 2 байт идут сразу за op_type, более широкие выровнены на 8 (TraceWriter::value_offset)
+        self.record_dtype = np.dtype({"names": ["addr", "op_type", "value"],
+                                      "formats": ["<u4", "<u2", word_dtype],
+                                      "offsets": [0, 4, 6 if word_dtype.itemsize <= 2 else 8],
+                                      "itemsize": int(header["record_bytes"])})
+
+        offset = HEADER_DTYPE.itemsize
+        self.initial = np.fromfile(path, dtype=word_dtype, count=self.words, offset=offset)
+        offset += -(-self.words * word_dtype.itemsize // 8) * 8
+
+        count = (os.path.getsize(path) - offset) // self.record_dtype.itemsize
+        self.records = (np.memmap(path, dtype=self.record_dtype, mode='r', offset=offset, shape=(count,))
+                        if count else np.zeros(0, dtype=self.record_dtype))
+
+        per_snapshot = self.words * (word_dtype.itemsize + 1)
+        snapshots = max(1, min(self.MAX_SNAPSHOTS, self.SNAPSHOT_BUDGET_BYTES // max(per_snapshot, 1)))
+        self.snapshot_step = max(self.MIN_SNAPSHOT_STEP, -(-count // snapshots))
+        # Снимки после 0, K, 2K... событий: (слова, тип последнего события по адресу, ошибок)
+        self.snapshots = [(self.initial, np.full(self.words, NO_EVENT, dtype=np.uint8), 0)]
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        # memmap закрывается вместе с последней ссылкой на него
+        self.records = np.zeros(0, dtype=self.record_dtype)
+        self.snapshots = self.snapshots[:1]
+
+    def event(self, n):
+        """(тип, адрес, индекс инструкции) события номер n (с нуля)."""
+        record = self.records[n]
+        op_type = int(record["op_type"])
+        return op_type & 3, int(record["addr"]), op_type >> 2
+
+    def _apply(self, words, types, failed, start, stop):
+        """Применяет события [start, stop) к копиям массивов состояния."""
+        words, types = words.copy(), types.copy()
+        segment = self.records[start:stop]
+        addrs = segment["addr"].astype(np.intp)
+        in_range = addrs < self.words
+        # Номер последнего события по каждому адресу (ufunc.at выполняется строго по порядку)
+        last = np.full(self.words, -1, dtype=np.intp)
+        np.maximum.at(last, addrs[in_range], np.flatnonzero(in_range))
+        touched = np.flatnonzero(last >= 0)
+        picked = segment[last[touched]]
+        words[touched] = picked["value"]
+        types[touched] = picked["op_type"] & 3
+        failed += int(np.count_nonzero((segment["op_type"] & 3) == TEST_FAILED))
+        return words, types, failed
+
+    def build_index(self, cancelled=lambda: False):
+        """Заранее строит все снимки (например, в фоновом потоке); cancelled() прерывает построение."""
+        while len(self.snapshots) <= len(self) // self.snapshot_step and not cancelled():
+            self._extend_snapshots()
+
+    def _extend_snapshots(self):
+        i = len(self.snapshots)
+        self.snapshots.append(self._apply(*self.snapshots[-1], (i - 1) * self.snapshot_step,
+                                          i * self.snapshot_step))
+
+    def state_at(self, n):
+        """
+        Состояние после первых n событий: (слова памяти, тип последнего события по каждому
+        адресу или NO_EVENT, число проваленных проверок).
+        """
+        n = max(0, min(n, len(self)))
+        k = n // self.snapshot_step
+        while len(self.snapshots) <= k:
+            self._extend_snapshots()
+        return self._apply(*self.snapshots[k], k * self.snapshot_step, n)
@@ -0,0 +1,281 @@
+# app/server.py
+"""
+Сервер заданий: очередь прогонов .kids тестов и пул процессов, которые их выполняют.
+Клиенты — вкладка тестирования GUI, app.cli --server, скрипты (app.core.jobs.JobConnection) —
+подключаются по TCP к localhost, ставят задания (программа + конфигурация ConfigTab)
+и получают результаты уведомлениями по мере готовности. Протокол — в app.core.jobs.
+
+    python -m app.server --workers 8
+    python -m app.server --port 0      (свободный порт; выбранный печатается при запуске)
+
+Задания выполняются по очереди поступления. Пока клиент подключён, его задания ждут в очереди;
+при отключении ещё не начатые снимаются. Завершённые хранятся (для status) до JOB_HISTORY последних.
+PyQt6 здесь не импортируется.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from app.core import jobs
+from app.core.config import build_vram, fault_columns, word_bits_of
+from app.core.run_pool import run_one
+from app.utils.constants import AppConstants
+from back_pyd.vram_backend import TestRunner
+
+
+def run_job(name, source, config):
+    """Выполняется в процессе пула; сводка как у run_test."""
+    result = {"test": name, "ram_size_words": config.get("ram_size_words")}
+    result.update(run_one(build_vram(config), TestRunner.compile_source(source)))
+    return result
+
+
+def check_config(config):
+    """Ошибки конфигурации, которые иначе всплыли бы только в процессе пула."""
+    if not isinstance(config, dict):
+        raise ValueError("config: ожидается объект")
+    words = config.get("ram_size_words", AppConstants.DEFAULT_WORD_COUNT)
+    if not isinstance(words, int) or not 0 < words <= AppConstants.MAX_WORD_COUNT:
+        raise ValueError(f"ram_size_words: ожидается от 1 до {AppConstants.MAX_WORD_COUNT}")
+    if word_bits_of(config) not in AppConstants.WORD_WIDTHS:
+        raise ValueError(f"word_bits: ожидается одно из {AppConstants.WORD_WIDTHS}")
+    fault_columns(config)
+
+
+class Job:
+    def __init__(self, job_id, name, source, config, client):
+        self.id = job_id
+        self.name = name
+        self.source = source
+        self.config = config
+        # Соединение, которому идут уведомления; None — клиент отключился
+        self.client = client
+        self.state = jobs.QUEUED
+        self.result = None
+        self.error = None
+
+    def info(self):
+        info = {"job": self.id, "name": self.name, "state": self.state}
+        if self.result is not None:
+            info["result"] = self.result
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.closed = False
+
+    def send(self, message):
+        if not self.closed:
+            self.writer.write(jobs.encode(message))
+
+
+class JobServer:
+    def __init__(self, workers, history=AppConstants.JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.ids = itertools.count(1)
+        self.queue = deque()
+        self.running = 0
+        self.done = 0
+        # Номер -> Job в порядке поступления
+        self.jobs = OrderedDict()
+        self.methods = {
+            "submit": self.rpc_submit,
+            "status": self.rpc_status,
+            "cancel": self.rpc_cancel,
+            "stats": self.rpc_stats,
+        }
+
+    async def start(self, host, port):
+        """Запускает приём соединений; возвращает asyncio.Server (порт — в его sockets)."""
+        return await asyncio.start_server(self.handle_client, host, port, limit=jobs.MAX_MESSAGE_BYTES)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        client = Client(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                client.send(self.handle_message(line, client))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError — строка длиннее MAX_MESSAGE_BYTES: дальше поток не разобрать
+            pass
+        finally:
+            client.closed = True
+            self.client_gone(client)
+            writer.close()
+
+    def client_gone(self, client):
+        for job in self.jobs.values():
+            if job.client is client:
+                job.client = None
+        # Результаты не начатых заданий уже некому отправить
+        for job in [job for job in self.queue if job.client is None]:
+            self.queue.remove(job)
+            self.finish(job, jobs.CANCELLED)
+
+    def handle_message(self, line, client):
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return jobs.error_reply(None, jobs.PARSE_ERROR, str(e))
+        if not isinstance(message, dict):
+            return jobs.error_reply(None, jobs.INVALID_REQUEST, "Ожидается объект JSON-RPC")
+        request_id = message.get("id")
+        method = self.methods.get(message.get("method"))
+        if method is None:
+            return jobs.error_reply(request_id, jobs.METHOD_NOT_FOUND, f"Нет метода {message.get('method')!r}")
+        params = message.get("params") or {}
+        if not isinstance(params, dict):
+            return jobs.error_reply(request_id, jobs.INVALID_PARAMS, "params: ожидается объект")
+        try:
+            return jobs.reply(request_id, method(client, params))
+        except jobs.JobError as e:
+            return jobs.error_reply(request_id, e.code, str(e))
+        except Exception as e:
+            # Ошибка сервера не должна обрывать соединение без ответа
+            return jobs.error_reply(request_id, jobs.INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+
+    # --- Методы ---
+
+    def rpc_submit(self, client, params):
+        # Программа передаётся текстом: файлы машины сервера клиентам недоступны
+        source = params.get("source")
+        if not isinstance(source, str):
+            raise jobs.JobError(jobs.INVALID_PARAMS, "source: ожидается текст программы")
+        name = params.get("name", "job")
+        config = params.get("config", {})
+        try:
+            # Ошибки программы и конфигурации — сразу в ответе, а не из очереди
+            TestRunner.compile_source(source)
+            check_config(config)
+        except (RuntimeError, ValueError, KeyError, TypeError) as e:
+            raise jobs.JobError(jobs.JOB_REJECTED, str(e))
+
+        job = Job(next(self.ids), str(name), source, config, client)
+        self.jobs[job.id] = job
+        self.queue.append(job)
+        # Запуск — после ответа, чтобы номер задания пришёл раньше уведомлений о нём
+        asyncio.get_running_loop().call_soon(self.start_jobs)
+        return {"job": job.id, "queued": len(self.queue) - 1}
+
+    def rpc_status(self, client, params):
+        return self.job(params).info()
+
+    def rpc_cancel(self, client, params):
+        job = self.job(params)
+        if job.client is not client:
+            raise jobs.JobError(jobs.INVALID_PARAMS, f"Задание {job.id} поставлено другим клиентом")
+        if job.state != jobs.QUEUED:
+            return {"cancelled": False}
+        self.queue.remove(job)
+        self.finish(job, jobs.CANCELLED)
+        return {"cancelled": True}
+
+    def rpc_stats(self, client, params):
+        return {"workers": self.workers, "queued": len(self.queue), "running": self.running, "done": self.done}
+
+    def job(self, params):
+        job_id = params.get("job")
+        # bool — подкласс int, но номером задания не является
+        if not isinstance(job_id, int) or isinstance(job_id, bool):
+            raise jobs.JobError(jobs.INVALID_PARAMS, "job: ожидается номер задания")
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise jobs.JobError(jobs.INVALID_PARAMS, f"Нет задания {params.get('job')!r}")
+        return job
+
+    # --- Очередь ---
+
+    def start_jobs(self):
+        loop = asyncio.get_running_loop()
+        while self.queue and self.running < self.workers:
+            job = self.queue.popleft()
+            job.state = jobs.RUNNING
+            self.running += 1
+            self.notify(job)
+            future = loop.run_in_executor(self.executor, run_job, job.name, job.source, job.config)
+            future.add_done_callback(partial(self.job_finished, job, self.executor))
+
+    def job_finished(self, job, executor, future):
+        self.running -= 1
+        try:
+            job.result = future.result()
+            self.finish(job, jobs.DONE)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and executor is self.executor:
+                # Процесс пула упал: остальные задания продолжат на новом пуле
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            job.error = str(e) or type(e).__name__
+            self.finish(job, jobs.FAILED)
+        self.start_jobs()
+
+    def finish(self, job, state):
+        job.state = state
+        # Программа и конфигурация больше не нужны, а конфигурация может быть большой
+        job.source = job.config = None
+        self.done += state != jobs.CANCELLED
+        self.notify(job)
+        finished = [j for j in self.jobs.values() if j.state in jobs.FINISHED]
+        for old in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[old.id]
+
+    def notify(self, job):
+        if job.client is not None:
+            job.client.send(jobs.notification("job", job.info()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.server",
+                                     description="Сервер заданий: очередь прогонов .kids тестов и пул процессов.")
+    parser.add_argument("--host", default=AppConstants.JOB_SERVER_HOST,
+                        help="адрес (по умолчанию %(default)s — только локальные клиенты)")
+    parser.add_argument("--port", type=int, default=AppConstants.JOB_SERVER_PORT,
+                        help="порт (по умолчанию %(default)s, 0 — любой свободный)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="процессов пула (по умолчанию — число ядер, %(default)s)")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    server = JobServer(args.workers)
+    try:
+        listener = await server.start(args.host, args.port)
+        host, port = listener.sockets[0].getsockname()[:2]
+        print(f"Сервер заданий: {host}:{port}, процессов: {args.workers}", file=sys.stderr, flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # SIGTERM — как Ctrl+C: иначе процессы пула переживают сервер
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
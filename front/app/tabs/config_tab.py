@@ -1,11 +1,14 @@
 # app/tabs/config_tab.py
 import json
+import numpy as np
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, 
                              QPushButton, QRadioButton, QButtonGroup, QComboBox, 
-                             QListWidget, QFileDialog, QFormLayout, QSpinBox, 
-                             QMessageBox, QListWidgetItem)
-from PyQt6.QtCore import Qt, pyqtSignal
-from app.widgets.ram_grid import RamGridWidget
+                             QListView, QFileDialog, QFormLayout, QSpinBox, 
+                             QMessageBox, QAbstractItemView, QLabel)
+from PyQt6.QtCore import pyqtSignal
+from app.widgets.ram_grid import RamGridWidget, pack_bits
+from app.widgets.fault_list import FaultListModel
+from app.core.config import fault_columns, word_bits_of
 from app.utils.constants import AppConstants
 from back_pyd.vram_backend import Vram
 
@@ -29,6 +32,8 @@ class ConfigTab(QWidget):
     def __init__(self, vram_instance: Vram):
         super().__init__()
         self.vram = vram_instance
+        # Адреса слов, изменённых тестами, пока вкладка не была видна
+        self.stale_rows = []
         
         self.ru_to_type = {}
         for name, member in Vram.ErrType.__members__.items():
@@ -36,6 +41,11 @@ class ConfigTab(QWidget):
                 ru_name = self.FAULT_TRANSLATIONS[name]
                 self.ru_to_type[ru_name] = member
 
+        type_names = [""] * len(Vram.ErrType.__members__)
+        for name, member in Vram.ErrType.__members__.items():
+            type_names[int(member)] = self.FAULT_TRANSLATIONS.get(name, name)
+        self.fault_model = FaultListModel(type_names)
+
         self.init_ui()
         self.apply_grid_settings()
 
@@ -49,12 +59,17 @@ class ConfigTab(QWidget):
         mem_group = QGroupBox("Размер памяти")
         mem_layout = QHBoxLayout()
         self.spin_words = QSpinBox()
-        self.spin_words.setRange(1, 1024)
-        self.spin_words.setValue(AppConstants.DEFAULT_WORD_COUNT)
-        self.spin_words.setPrefix("Слов (16bit): ")
+        self.spin_words.setRange(1, AppConstants.MAX_WORD_COUNT)
+        self.spin_words.setValue(len(self.vram))
+        self.spin_words.setPrefix("Слов: ")
+        self.combo_word_bits = QComboBox()
+        for bits in AppConstants.WORD_WIDTHS:
+            self.combo_word_bits.addItem(f"{bits} бит", bits)
+        self.combo_word_bits.setCurrentIndex(AppConstants.WORD_WIDTHS.index(self.vram.word_bits))
         btn_apply = QPushButton("Применить")
         btn_apply.clicked.connect(self.on_recreate_vram)
         mem_layout.addWidget(self.spin_words)
+        mem_layout.addWidget(self.combo_word_bits)
         mem_layout.addWidget(btn_apply)
         mem_group.setLayout(mem_layout)
         
@@ -108,7 +123,7 @@ class ConfigTab(QWidget):
         left_panel.addLayout(tools_layout)
         
         self.ram_grid = RamGridWidget(read_only=False)
-        self.ram_grid.table.cellClicked.connect(self.on_cell_clicked)
+        self.ram_grid.cell_clicked.connect(self.on_cell_clicked)
         left_panel.addWidget(self.ram_grid)
 
         # --- RIGHT PANEL ---
@@ -132,7 +147,7 @@ class ConfigTab(QWidget):
         self.spin_fault_addr.setDisplayIntegerBase(16)
         
         self.spin_fault_bit = QSpinBox()
-        self.spin_fault_bit.setRange(0, 15)
+        self.spin_fault_bit.setRange(0, self.vram.word_bits - 1)
         self.spin_fault_bit.setPrefix("Bit: ")
         
         self.combo_fault_type = QComboBox()
@@ -140,7 +155,8 @@ class ConfigTab(QWidget):
         self.combo_fault_type.addItems(ru_names)
         
         grp_cons_layout.addRow("Адрес слова:", self.spin_fault_addr)
-        grp_cons_layout.addRow("Бит (0-15):", self.spin_fault_bit)
+        self.lbl_fault_bit = QLabel()
+        grp_cons_layout.addRow(self.lbl_fault_bit, self.spin_fault_bit)
         grp_cons_layout.addRow("Тип:", self.combo_fault_type)
         
         btn_add_fault = QPushButton("Добавить")
@@ -150,7 +166,11 @@ class ConfigTab(QWidget):
 
         grp_list = QGroupBox("Список ошибок")
         grp_list_layout = QVBoxLayout()
-        self.list_faults = QListWidget()
+        self.list_faults = QListView()
+        self.list_faults.setModel(self.fault_model)
+        self.list_faults.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        # Все строки одной высоты: вид не измеряет каждую строку после сброса модели
+        self.list_faults.setUniformItemSizes(True)
         grp_list_layout.addWidget(self.list_faults)
         
         btns_list_layout = QHBoxLayout()
@@ -173,62 +193,69 @@ class ConfigTab(QWidget):
 
     def showEvent(self, event):
         super().showEvent(event)
-        self.update_all_grid_values()
+        self.refresh_stale_rows()
+
+    def mark_rows_stale(self, addrs):
+        self.stale_rows.append(addrs)
+        if self.isVisible():
+            self.refresh_stale_rows()
+
+    def refresh_stale_rows(self):
+        """Перерисовывает только слова, изменённые тестами (неисправности при этом не меняются)."""
+        if not self.stale_rows:
+            return
+        rows = np.unique(np.concatenate(self.stale_rows))
+        self.stale_rows.clear()
+        rows = rows[rows < self.ram_grid.rows]
+        self.ram_grid.set_row_values(rows, self.vram.raw_view()[rows])
 
     def _vram_to_grid(self, addr, bit):
         grid_row = addr
-        grid_col = 15 - bit
+        grid_col = self.vram.word_bits - 1 - bit
         return grid_row, grid_col
 
     def _grid_to_vram(self, row, col):
         addr = row
-        bit = 15 - col
+        bit = self.vram.word_bits - 1 - col
         return addr, bit
 
     def update_row_values(self, addr):
         """
-        Читает слово по адресу из VRAM, разбивает на биты и обновляет 
-        состояние ячеек в строке (текст 0/1 и цвет).
+        Берёт слово по адресу из VRAM (без применения ошибок чтения) и обновляет
+        состояние строки: значения битов и маску неисправностей.
         """
         try:
-            val = self.vram.read(addr)
-            for bit_pos in range(16):
-                bit_val = (val >> bit_pos) & 1
-                col = 15 - bit_pos
-                
-                err = self.vram.get_error(addr, bit_pos)
-                if err.name != "NO":
-                    bg_color = AppConstants.COLOR_BG_ERROR
-                else:
-                    bg_color = AppConstants.COLOR_BG_DEFAULT
-                
-                self.ram_grid.set_cell_state(addr, col, text=str(bit_val), color=bg_color)
+            fault_mask = pack_bits(self.vram.word_errors(addr)[np.newaxis] != 0)[0]
+            self.ram_grid.set_row_value(addr, self.vram.raw_view()[addr], fault_mask)
         except Exception as e:
             print(f"Error updating row {addr}: {e}")
 
     def update_all_grid_values(self):
-        rows = self.ram_grid.table.rowCount()
-        for i in range(rows):
-            self.update_row_values(i)
+        # Маска неисправностей слова: биты, у которых ErrType != NO
+        fault_masks = pack_bits(self.vram.error_map() != 0)
+        
+        self.ram_grid.set_all_values(self.vram.raw_view(), fault_masks)
 
     def on_recreate_vram(self):
         """Full backend RAM recreation."""
         word_count = self.spin_words.value()
+        word_bits = self.combo_word_bits.currentData()
         
-        new_vram = Vram(word_count)
+        new_vram = Vram(word_count, word_bits)
         self.vram = new_vram
         
         self.spin_fault_addr.setRange(0, word_count - 1)
-        self.list_faults.clear()
+        self.spin_fault_bit.setRange(0, word_bits - 1)
+        self.fault_model.clear()
+        self.stale_rows.clear()
         self.apply_grid_settings()
         
         self.vram_changed.emit(self.vram, word_count)
 
     def apply_grid_settings(self):
         words = self.spin_words.value()
-        self.ram_grid.update_dimensions(words)
-        self.ram_grid.table.setHorizontalHeaderLabels([str(15 - i) for i in range(16)])
-        self.ram_grid.table.setVerticalHeaderLabels([f"0x{i:04X}" for i in range(words)])
+        self.ram_grid.update_dimensions(words, self.vram.word_bits)
+        self.lbl_fault_bit.setText(f"Бит (0-{self.vram.word_bits - 1}):")
         
         self.update_all_grid_values()
 
@@ -239,7 +266,7 @@ class ConfigTab(QWidget):
             self.spin_fault_bit.setValue(bit)
         else:
             try:
-                val = self.vram.read(addr)
+                val = int(self.vram.raw_view()[addr])
                 bit_val = (val >> bit) & 1
                 err = self.vram.get_error(addr, bit)
                 err_ru = self.FAULT_TRANSLATIONS.get(err.name, err.name)
@@ -252,67 +279,50 @@ class ConfigTab(QWidget):
             except Exception as e:
                 print(e)
 
-    def add_fault(self, load_data=None):
-        if load_data:
-            addr, bit, err_name_key = load_data
-            if err_name_key in self.FAULT_TRANSLATIONS:
-                ru_name = self.FAULT_TRANSLATIONS[err_name_key]
-                err_type = getattr(Vram.ErrType, err_name_key)
-            else:
-                return 
-        else:
-            addr = self.spin_fault_addr.value()
-            bit = self.spin_fault_bit.value()
-            ru_name = self.combo_fault_type.currentText()
-            if ru_name not in self.ru_to_type: return
-            err_type = self.ru_to_type[ru_name]
+    def add_fault(self):
+        addr = self.spin_fault_addr.value()
+        bit = self.spin_fault_bit.value()
+        ru_name = self.combo_fault_type.currentText()
+        if ru_name not in self.ru_to_type: return
+        err_type = self.ru_to_type[ru_name]
 
         try:
             self.vram.set_error(addr, bit, err_type)
         except Exception as e:
-            if not load_data: QMessageBox.critical(self, "Ошибка", str(e))
+            QMessageBox.critical(self, "Ошибка", str(e))
             return
 
-        item_text = f"Addr 0x{addr:04X} | Bit {bit:02d} | {ru_name}"
-        item = QListWidgetItem(item_text)
-        key_name = err_type.name
-        item.setData(Qt.ItemDataRole.UserRole, (addr, bit, key_name))
-        self.list_faults.addItem(item)
-        
+        self.fault_model.add_fault(addr, bit, int(err_type))
         self.update_row_values(addr)
 
     def remove_fault(self):
-        items = self.list_faults.selectedItems()
-        for item in items:
-            data = item.data(Qt.ItemDataRole.UserRole)
-            if data:
-                addr, bit, _ = data
-                self.vram.set_error(addr, bit, Vram.ErrType.NO)
-                self.update_row_values(addr)
-            self.list_faults.takeItem(self.list_faults.row(item))
+        rows = [index.row() for index in self.list_faults.selectionModel().selectedRows()]
+        if not rows: return
+        model = self.fault_model
+        addrs, bits = model.addrs[rows], model.bits[rows]
+
+        self.vram.set_errors(addrs, bits, np.zeros(len(rows), dtype=np.uint8))
+        model.remove_rows(rows)
+        self.update_all_grid_values()
 
     def clear_all_faults(self):
-        while self.list_faults.count() > 0:
-            item = self.list_faults.item(0)
-            data = item.data(Qt.ItemDataRole.UserRole)
-            if data:
-                addr, bit, _ = data
-                self.vram.set_error(addr, bit, Vram.ErrType.NO)
-                self.update_row_values(addr)
-            self.list_faults.takeItem(0)
+        self.vram.clear_errors()
+        self.fault_model.clear()
+        self.update_all_grid_values()
 
     def save_config(self):
         file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить", "", "JSON (*.json)")
         if not file_path: return
         
-        faults_data = []
-        for i in range(self.list_faults.count()):
-            item = self.list_faults.item(i)
-            data = item.data(Qt.ItemDataRole.UserRole)
-            faults_data.append({"addr": data[0], "bit": data[1], "type": data[2]})
+        type_keys = list(Vram.ErrType.__members__)
+        model = self.fault_model
+        faults_data = [{"addr": addr, "bit": bit, "type": type_keys[t]}
+                       for addr, bit, t in zip(model.addrs.tolist(), model.bits.tolist(),
+                                               model.types.tolist())]
             
         config = {
             "ram_size_words": self.spin_words.value(),
+            "word_bits": self.vram.word_bits,
             "faults": faults_data
         }
         try:
@@ -328,15 +338,23 @@ class ConfigTab(QWidget):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 config = json.load(f)
-            
-            words = config.get("ram_size_words", 16)
-            self.spin_words.setValue(words)
-            
-            self.on_recreate_vram()
-            
-            for f in config.get("faults", []):
-                self.add_fault((f["addr"], f["bit"], f["type"]))
-                
+            self.apply_config(config)
             QMessageBox.information(self, "Успех", "Загружено.")
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", str(e))
\ No newline at end of file
+            QMessageBox.critical(self, "Ошибка", str(e))
+
+    def apply_config(self, config):
+        """Пересоздаёт VRAM и назначает все неисправности конфигурации одним вызовом."""
+        addrs, bits, types = fault_columns(config)
+
+        words = config.get("ram_size_words", AppConstants.DEFAULT_WORD_COUNT)
+        word_bits = word_bits_of(config)
+        if word_bits not in AppConstants.WORD_WIDTHS:
+            raise ValueError(f"Неподдерживаемая ширина слова: {word_bits}")
+        self.spin_words.setValue(words)
+        self.combo_word_bits.setCurrentIndex(AppConstants.WORD_WIDTHS.index(word_bits))
+        self.on_recreate_vram()
+
+        self.vram.set_errors(addrs, bits, types)
+        self.fault_model.set_faults(addrs, bits, types)
+        self.update_all_grid_values()
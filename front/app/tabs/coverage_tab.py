@@ -0,0 +1,249 @@
+# app/tabs/coverage_tab.py
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel,
+                             QPushButton, QSpinBox, QComboBox, QCheckBox, QFormLayout, QListWidget, QListWidgetItem,
+                             QTableWidget, QTableWidgetItem, QProgressBar, QFileDialog,
+                             QMessageBox, QAbstractItemView)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QColor
+from app.widgets.ram_grid import RamGridWidget, pack_bits
+from app.utils.constants import AppConstants
+from app.tabs.config_tab import ConfigTab
+from app.core.campaign import Campaign
+
+
+class CoverageTab(QWidget):
+    """Кампания покрытия: какие одиночные неисправности обнаруживает каждый алгоритм."""
+
+    def __init__(self, library):
+        super().__init__()
+        # Список тестов (TestLibrary); программы кампания компилирует в процессах пула
+        self.library = library
+        self.campaign = None
+        self.executor = None
+        self.futures = []
+
+        self.poll_timer = QTimer()
+        self.poll_timer.setInterval(100)
+        self.poll_timer.timeout.connect(self.poll_campaign)
+
+        self.init_ui()
+        self.library.tests_changed.connect(self.update_test_list)
+        self.update_test_list(self.library.tests)
+
+    def init_ui(self):
+        main_layout = QHBoxLayout(self)
+
+        # --- LEFT PANEL ---
+        left_panel = QVBoxLayout()
+        left_panel.addWidget(QLabel("Покрытие (алгоритм × тип неисправности)"))
+
+        self.table_matrix = QTableWidget(0, 0)
+        self.table_matrix.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_matrix.cellClicked.connect(self.show_detail)
+        left_panel.addWidget(self.table_matrix, 1)
+
+        self.lbl_detail = QLabel("Детализация: выберите ячейку матрицы "
+                                 "(1 — обнаружено, красный — пропущено)")
+        left_panel.addWidget(self.lbl_detail)
+        self.detail_grid = RamGridWidget(read_only=True)
+        left_panel.addWidget(self.detail_grid, 2)
+
+        # --- RIGHT PANEL ---
+        right_panel = QVBoxLayout()
+
+        grp_params = QGroupBox("Параметры кампании")
+        grp_params_layout = QFormLayout()
+
+        self.spin_words = QSpinBox()
+        self.spin_words.setRange(1, AppConstants.MAX_WORD_COUNT)
+        self.spin_words.setValue(AppConstants.DEFAULT_WORD_COUNT)
+
+        self.combo_word_bits = QComboBox()
+        for bits in AppConstants.WORD_WIDTHS:
+            self.combo_word_bits.addItem(f"{bits} бит", bits)
+        self.combo_word_bits.setCurrentIndex(AppConstants.WORD_WIDTHS.index(AppConstants.BITS_PER_WORD))
+
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, 256)
+        self.spin_workers.setValue(os.cpu_count() or 1)
+
+        self.chk_bit_parallel = QCheckBox("Бит-параллельно (до 64 неисправностей за прогон)")
+        self.chk_bit_parallel.setChecked(True)
+
+        self.list_tests = QListWidget()
+
+        btn_refresh = QPushButton("Обновить")
+        btn_refresh.clicked.connect(self.library.rescan)
+
+        grp_params_layout.addRow("Слов:", self.spin_words)
+        grp_params_layout.addRow("Ширина слова:", self.combo_word_bits)
+        grp_params_layout.addRow("Процессов:", self.spin_workers)
+        grp_params_layout.addRow(self.chk_bit_parallel)
+        grp_params_layout.addRow("Тесты:", self.list_tests)
+        grp_params_layout.addRow(btn_refresh)
+        grp_params.setLayout(grp_params_layout)
+
+        grp_run = QGroupBox("Выполнение")
+        grp_run_layout = QVBoxLayout()
+        btns_layout = QHBoxLayout()
+        self.btn_start = QPushButton("Запустить")
+        self.btn_start.clicked.connect(self.start_campaign)
+        self.btn_stop = QPushButton("Остановить")
+        self.btn_stop.clicked.connect(self.stop_campaign)
+        self.btn_stop.setEnabled(False)
+        self.btn_save = QPushButton("Сохранить (.json)")
+        self.btn_save.clicked.connect(self.save_results)
+        self.btn_save.setEnabled(False)
+        btns_layout.addWidget(self.btn_start)
+        btns_layout.addWidget(self.btn_stop)
+        btns_layout.addWidget(self.btn_save)
+
+        self.progress = QProgressBar()
+        self.lbl_stats = QLabel("-")
+
+        grp_run_layout.addLayout(btns_layout)
+        grp_run_layout.addWidget(self.progress)
+        grp_run_layout.addWidget(self.lbl_stats)
+        grp_run.setLayout(grp_run_layout)
+
+        right_panel.addWidget(grp_params)
+        right_panel.addWidget(grp_run)
+        right_panel.addStretch()
+
+        main_layout.addLayout(left_panel, 7)
+        main_layout.addLayout(right_panel, 3)
+
+    def update_test_list(self, tests):
+        """Новый список тестов из TestLibrary; снятые отметки у оставшихся тестов сохраняются."""
+        unchecked = {self.list_tests.item(i).text() for i in range(self.list_tests.count())
+                     if self.list_tests.item(i).checkState() != Qt.CheckState.Checked}
+        self.list_tests.clear()
+        for name, path in tests.items():
+            item = QListWidgetItem(name)
+            item.setData(Qt.ItemDataRole.UserRole, path)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked if name in unchecked else Qt.CheckState.Checked)
+            self.list_tests.addItem(item)
+
+    def selected_tests(self):
+        tests = []
+        for i in range(self.list_tests.count()):
+            item = self.list_tests.item(i)
+            if item.checkState() == Qt.CheckState.Checked:
+                tests.append(item.data(Qt.ItemDataRole.UserRole))
+        return tests
+
+    def start_campaign(self):
+        tests = self.selected_tests()
+        if not tests:
+            QMessageBox.warning(self, "Покрытие", "Не выбрано ни одного теста.")
+            return
+
+        workers = self.spin_workers.value()
+        self.campaign = Campaign(tests, self.spin_words.value(),
+                                 word_bits=self.combo_word_bits.currentData(),
+                                 bit_parallel=self.chk_bit_parallel.isChecked(),
+                                 programs=self.library.programs)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.futures = self.campaign.submit(self.executor, workers)
+
+        self.progress.setRange(0, max(1, self.campaign.total_injections))
+        self.progress.setValue(0)
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.btn_save.setEnabled(False)
+        self.fill_matrix()
+        self.poll_timer.start()
+
+    def poll_campaign(self):
+        done = [f for f in self.futures if f.done()]
+        if not done:
+            return
+        self.futures = [f for f in self.futures if not f.done()]
+        try:
+            for future in done:
+                self.campaign.collect(future)
+        except Exception as e:
+            self.stop_campaign()
+            QMessageBox.critical(self, "Ошибка кампании", str(e))
+            return
+
+        # Тест, не прошедший проверку без неисправностей, уменьшает общий объём работы
+        self.progress.setRange(0, max(1, self.campaign.total_injections))
+        self.progress.setValue(self.campaign.done_injections)
+        self.update_stats()
+        if not self.futures:
+            self.finish_campaign()
+
+    def stop_campaign(self):
+        self.poll_timer.stop()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.futures = []
+        self.btn_start.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+
+    def finish_campaign(self):
+        self.stop_campaign()
+        self.btn_save.setEnabled(True)
+        self.fill_matrix()
+
+    def update_stats(self):
+        c = self.campaign
+        self.lbl_stats.setText(f"Внесено неисправностей: {c.done_injections} / {c.total_injections}\n"
+                               f"Время: {c.elapsed_s:.2f} с, {c.throughput():.0f} прогонов/с")
+
+    def fill_matrix(self):
+        c = self.campaign
+        types = c.fault_types
+        self.table_matrix.setRowCount(len(c.names))
+        self.table_matrix.setColumnCount(len(types))
+        self.table_matrix.setHorizontalHeaderLabels([ConfigTab.FAULT_TRANSLATIONS.get(t, t) for t in types])
+        self.table_matrix.setVerticalHeaderLabels(c.names)
+
+        coverage = c.coverage()
+        for row, name in enumerate(c.names):
+            for col, type_name in enumerate(types):
+                if name in c.errors:
+                    item = QTableWidgetItem(c.errors[name])
+                    item.setBackground(QColor(AppConstants.COLOR_BG_ERROR))
+                else:
+                    detected, total = coverage[name][type_name]
+                    item = QTableWidgetItem(f"{100 * detected / total:.0f}% ({detected}/{total})")
+                    if detected == total:
+                        color = AppConstants.COLOR_BG_SUCCESS
+                    elif detected == 0:
+                        color = AppConstants.COLOR_BG_ERROR
+                    else:
+                        color = AppConstants.COLOR_BG_ACTIVE
+                    item.setBackground(QColor(color))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table_matrix.setItem(row, col, item)
+        self.table_matrix.resizeColumnsToContents()
+
+    def show_detail(self, row, col):
+        """Показывает по адресам и битам, какие неисправности выбранного типа обнаружены."""
+        c = self.campaign
+        if c is None or self.futures or c.names[row] in c.errors:
+            return
+        detected = c.detected[c.names[row]][col]
+
+        self.detail_grid.update_dimensions(c.words, c.word_bits)
+        self.detail_grid.set_all_values(pack_bits(detected), pack_bits(~detected))
+        type_name = c.fault_types[col]
+        self.lbl_detail.setText(f"Детализация: {c.names[row]} / "
+                                f"{ConfigTab.FAULT_TRANSLATIONS.get(type_name, type_name)} "
+                                f"(1 — обнаружено, красный — пропущено)")
+
+    def save_results(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить", "", "JSON (*.json)")
+        if not file_path: return
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.campaign.to_dict(), f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", str(e))
@@ -1,18 +1,137 @@
 # app/tabs/report_tab.py
+import os
 from datetime import datetime
-from collections import Counter
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QPlainTextEdit, 
-                             QHBoxLayout, QPushButton, QFileDialog)
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QPlainTextEdit, QTableView, QSplitter,
+                             QHBoxLayout, QPushButton, QFileDialog, QComboBox, QLineEdit,
+                             QLabel, QAbstractItemView, QHeaderView, QMessageBox, QTabWidget)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QFont
+from app.core.report import format_report
+from app.core.result_store import ResultStore
+from app.core.heatmap import ErrorHeatmap
+from app.widgets.heatmap import HeatmapWidget
+
+
+class RunListModel(QAbstractTableModel):
+    """
+    Сводки прогонов из ResultStore, от новых к старым. Строки подгружаются страницами,
+    по мере прокрутки (canFetchMore/fetchMore), поэтому размер журнала не влияет на вид.
+    """
+    HEADERS = ["№", "Время", "Тест", "Слов", "Конфигурация", "Статус", "Событий", "Битых ячеек"]
+    PAGE_SIZE = 256
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.test = None
+        self.addr = None
+        self.rows = []
+        self.total = 0
+
+    def set_filter(self, test=None, addr=None):
+        self.beginResetModel()
+        self.test, self.addr = test, addr
+        self.rows = []
+        self.total = self.store.count(test, addr)
+        self.endResetModel()
+
+    def run_added(self, run_id):
+        """Новый прогон всегда самый свежий: вставляется первой строкой, если проходит фильтр."""
+        if self.store.count(self.test, self.addr) == self.total:
+            return
+        self.total += 1
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, self.store.runs(self.test, self.addr, limit=1).fetchone())
+        self.endInsertRows()
+
+    def run_id(self, row):
+        return self.rows[row][0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        before_id = self.rows[-1][0] if self.rows else None
+        page = self.store.runs(self.test, self.addr, before_id, self.PAGE_SIZE).fetchall()
+        if not page:
+            self.total = len(self.rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        run_id, timestamp, test, ram_size, cfg_hash, events, cells = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (run_id,
+                    datetime.fromtimestamp(timestamp).strftime("%d.%m.%Y %H:%M:%S"),
+                    test,
+                    "" if ram_size is None else ram_size,
+                    cfg_hash[:8],
+                    "УСПЕШНО" if events == 0 else "ПРОВАЛЕН",
+                    events,
+                    cells)[col]
+        if role == Qt.ItemDataRole.ForegroundRole and col == 5:
+            return Qt.GlobalColor.darkGreen if events == 0 else Qt.GlobalColor.red
+        if role == Qt.ItemDataRole.ToolTipRole and col == 4:
+            return cfg_hash
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
 
 class ReportTab(QWidget):
+    ALL_TESTS = "Все тесты"
+
     def __init__(self):
         super().__init__()
+        self.store = ResultStore()
+        self.model = RunListModel(self.store)
+        # Провалы по (адрес, бит) за все прогоны сеанса
+        self.heatmap = ErrorHeatmap()
         self.init_ui()
+        self.apply_filter()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
 
+        filter_layout = QHBoxLayout()
+        self.combo_test = QComboBox()
+        self.combo_test.addItem(self.ALL_TESTS)
+        self.combo_test.setMinimumWidth(160)
+        self.combo_test.currentIndexChanged.connect(self.apply_filter)
+        self.edit_addr = QLineEdit()
+        self.edit_addr.setPlaceholderText("Адрес (hex), например 0x1F")
+        self.edit_addr.editingFinished.connect(self.apply_filter)
+        self.lbl_count = QLabel()
+        filter_layout.addWidget(QLabel("Тест:"))
+        filter_layout.addWidget(self.combo_test)
+        filter_layout.addWidget(QLabel("Адрес с ошибкой:"))
+        filter_layout.addWidget(self.edit_addr)
+        filter_layout.addStretch()
+        filter_layout.addWidget(self.lbl_count)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.selectionModel().currentRowChanged.connect(self.show_run_details)
+
         self.report_area = QPlainTextEdit()
         self.report_area.setReadOnly(True)
 
@@ -20,67 +139,100 @@ class ReportTab(QWidget):
         self.report_area.setFont(font)
         self.report_area.setPlaceholderText("Ожидание результатов тестирования...")
 
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.report_area)
+        splitter.setSizes([400, 250])
+
+        self.heatmap_view = HeatmapWidget(self.heatmap)
+        self.heatmap_view.address_clicked.connect(self.filter_by_address)
+
+        self.views = QTabWidget()
+        self.views.addTab(splitter, "Журнал")
+        self.views.addTab(self.heatmap_view, "Тепловая карта")
+
         controls_layout = QHBoxLayout()
-        btn_save = QPushButton("Сохранить в .txt")
+        btn_save = QPushButton("Экспорт (.csv/.json/.txt)")
         btn_clear = QPushButton("Очистить журнал")
-        
+
         btn_save.clicked.connect(self.save_report)
-        btn_clear.clicked.connect(self.report_area.clear)
-        
+        btn_clear.clicked.connect(self.clear_results)
+
         controls_layout.addWidget(btn_save)
         controls_layout.addWidget(btn_clear)
         controls_layout.addStretch()
 
-        layout.addWidget(self.report_area)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.views)
         layout.addLayout(controls_layout)
 
-    def append_formatted_result(self, test_name, errors):
-        timestamp = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-        
-        total_err_count = len(errors)
-        
-        error_counts = Counter(errors)
-        unique_addresses = sorted(error_counts.keys())
-        unique_count = len(unique_addresses)
-        
-        status_str = "УСПЕШНО" if total_err_count == 0 else "ПРОВАЛЕН"
-        
-        lines = []
-        lines.append("==================================================")
-        lines.append(f"ОТЧЕТ ОТ {timestamp}")
-        lines.append("==================================================")
-        lines.append(f"Тест       : {test_name}")
-        lines.append(f"Статус     : {status_str}")
-        lines.append(f"Событий    : {total_err_count}")
-        lines.append(f"Битых ячеек: {unique_count}")
-        lines.append("--------------------------------------------------")
-        
-        if unique_count > 0:
-            lines.append("Детализация (Адрес [Кол-во раз]):")
-            
-            max_lines = 100
-            for i, addr in enumerate(unique_addresses):
-                if i >= max_lines:
-                    lines.append(f"... и еще {unique_count - max_lines} адресов.")
-                    break
-                
-                count = error_counts[addr]
-
-                suffix = f" ({count})" if count > 1 else ""
-                lines.append(f"{i+1}. 0x{addr:04X}{suffix}")
-        else:
-            lines.append("Ошибок не обнаружено.")
-
-        lines.append("\n") 
-            
-        final_text = "\n".join(lines)
-        self.report_area.appendPlainText(final_text)
+    def add_result(self, test_name, errors, config=None):
+        """Сохраняет прогон в журнал; config — конфигурация неисправностей в формате ConfigTab."""
+        run_id = self.store.add_run(test_name, errors, config)
+        self.heatmap.add_run(errors, config)
+        self.heatmap_view.mark_stale()
+        if self.combo_test.findText(test_name) < 0:
+            self.combo_test.addItem(test_name)
+        self.model.run_added(run_id)
+        self.update_count_label()
+        if self.model.rowCount() and self.model.run_id(0) == run_id:
+            self.table.selectRow(0)
+
+    def current_filter(self):
+        """(тест, адрес) из полей фильтра; None — без ограничения."""
+        test = self.combo_test.currentText()
+        test = None if test == self.ALL_TESTS else test
+        text = self.edit_addr.text().strip()
+        try:
+            addr = int(text, 16) if text else None
+            self.edit_addr.setStyleSheet("")
+        except ValueError:
+            addr = None
+            self.edit_addr.setStyleSheet("color: red;")
+        return test, addr
+
+    def apply_filter(self):
+        self.model.set_filter(*self.current_filter())
+        self.report_area.clear()
+        self.update_count_label()
+
+    def filter_by_address(self, addr):
+        self.edit_addr.setText(f"0x{addr:X}")
+        self.apply_filter()
+        self.views.setCurrentIndex(0)
+
+    def update_count_label(self):
+        self.lbl_count.setText(f"Прогонов: {self.model.total}")
+
+    def show_run_details(self, current, previous=None):
+        if not current.isValid():
+            self.report_area.clear()
+            return
+        run = self.store.run(self.model.run_id(current.row()))
+        self.report_area.setPlainText(format_report(
+            run["test"], self.store.error_counts(run["id"]), datetime.fromtimestamp(run["timestamp"])))
+
+    def clear_results(self):
+        self.store.clear()
+        self.heatmap.clear()
+        self.heatmap_view.mark_stale()
+        self.combo_test.blockSignals(True)
+        self.combo_test.clear()
+        self.combo_test.addItem(self.ALL_TESTS)
+        self.combo_test.blockSignals(False)
+        self.apply_filter()
 
     def save_report(self):
-        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить отчет", "", "Text Files (*.txt)")
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.report_area.toPlainText())
-            except Exception as e:
-                print(e)
\ No newline at end of file
+        filename, selected = QFileDialog.getSaveFileName(
+            self, "Экспорт журнала", "", "CSV (*.csv);;JSON (*.json);;Text Files (*.txt)")
+        if not filename:
+            return
+        # Формат по расширению файла, а без расширения — по выбранному фильтру диалога
+        ext = os.path.splitext(filename)[1].lower() or "." + selected.split("*.")[-1].rstrip(")")
+        export = {".csv": self.store.export_csv,
+                  ".json": self.store.export_json}.get(ext, self.store.export_text)
+        try:
+            with open(filename, 'w', encoding='utf-8', newline='') as f:
+                export(f, *self.current_filter())
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", str(e))
@@ -1,29 +1,82 @@
 # app/tabs/testing_tab.py
 import os
-import glob
+import json
+import time
+import tempfile
+import numpy as np
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, 
                              QLabel, QComboBox, QPushButton, QSlider, 
-                             QFormLayout, QMessageBox, QFrame)
-from PyQt6.QtCore import Qt, QTimer
-from app.widgets.ram_grid import RamGridWidget
+                             QFormLayout, QMessageBox, QFrame, QCheckBox, QFileDialog, QProgressBar,
+                             QSpinBox)
+from PyQt6.QtCore import Qt, pyqtSignal
+from app.widgets.ram_grid import RamGridWidget, RowState
 from app.utils.constants import AppConstants
+from app.utils.frame_scheduler import FrameScheduler
+from app.core.result_cache import ResultCache
+from app.core import jobs
+from app.core.runner import run_test, expected_events
+from app.core.trace import record_bytes
+from app.workers.test_worker import TestWorker
 from back_pyd.vram_backend import Vram, TestRunner
 
+# QSpinBox и QSlider хранят int32
+INT32_MAX = 2**31 - 1
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600} ч {seconds % 3600 // 60:02d} мин"
+    if seconds >= 60:
+        return f"{seconds // 60} мин {seconds % 60:02d} с"
+    return f"{seconds} с"
+
+
 class TestingTab(QWidget):
-    def __init__(self, vram: Vram, report_tab):
+    # Адреса слов, изменённых выполнением теста (массив)
+    memory_changed = pyqtSignal(object)
+
+    # Тип события TestRunner -> состояние строки (индекс = значение StepResult.Type)
+    EVENT_ROW_STATES = np.array([RowState.ACTIVE, RowState.SUCCESS, RowState.ERROR, RowState.DEFAULT],
+                                dtype=np.uint8)
+    EVENT_NAMES = ["Запись", "Чтение OK", "Чтение ОШИБКА"]
+
+    def __init__(self, vram: Vram, report_tab, library, job_client=None):
         super().__init__()
         self.vram = vram
+        # Представление памяти без побочных эффектов (read применяет ошибки чтения)
+        self.vram_words = vram.raw_view()
         self.report_tab = report_tab
         self.runner = None
-        self.test_files_map = {}
+        # Поток, выполняющий self.runner
+        self.worker = None
+        # Трасса последнего завершённого прогона (app.core.trace.Trace)
+        self.trace = None
+        self.trace_path = os.path.join(tempfile.gettempdir(), f"kidsvt-{os.getpid()}.trace")
+        # Список тестов и их скомпилированные программы (TestLibrary)
+        self.library = library
+        self.result_cache = ResultCache()
+        # Сервер заданий (JobClient); без него и пока он недоступен тесты прогоняются здесь
+        self.job_client = job_client
+        # Заданий на сервере, ещё не завершённых
+        self.jobs_pending = 0
         
         self.current_error_count = 0
-        
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.do_step)
+        # Прогресс прогона: событий выполнено и ожидается по Program.estimate (None — оценки нет)
+        self.events_done = 0
+        self.events_expected = None
+        self.estimate_exact = True
+        # (время, выполнено событий) на момент запуска или смены скорости — для оценки в турбо
+        self.rate_origin = None
+        self.result_dialog = None
+        # Подписи и прогресс обновляются не чаще раза в кадр (см. render_batch)
+        self.frame = FrameScheduler(self)
+        self.reset_perf()
         
         self.init_ui()
-        self.refresh_test_list()
+        self.update_progress()
+        self.library.tests_changed.connect(self.update_test_list)
+        self.update_test_list(self.library.tests)
         # Инициализация нулей при старте
         self.update_all_grid_values()
 
@@ -35,8 +88,7 @@ class TestingTab(QWidget):
         left_panel.addWidget(QLabel("Монитор памяти (Read-Only визуализация)"))
         
         self.ram_grid = RamGridWidget(read_only=True)
-        self.ram_grid.update_dimensions(AppConstants.DEFAULT_WORD_COUNT)
-        self.setup_grid_labels()
+        self.ram_grid.update_dimensions(len(self.vram_words), self.vram.word_bits)
         left_panel.addWidget(self.ram_grid)
 
         # Legend
@@ -61,7 +113,7 @@ class TestingTab(QWidget):
         
         btn_layout = QHBoxLayout()
         btn_refresh = QPushButton("Обновить")
-        btn_refresh.clicked.connect(self.refresh_test_list)
+        btn_refresh.clicked.connect(self.library.rescan)
         
         self.btn_load_test = QPushButton("Загрузить / Сброс")
         self.btn_load_test.clicked.connect(self.load_test)
@@ -69,9 +121,28 @@ class TestingTab(QWidget):
         btn_layout.addWidget(btn_refresh)
         btn_layout.addWidget(self.btn_load_test)
         
+        self.btn_quick_result = QPushButton("Мгновенный результат")
+        self.btn_quick_result.setToolTip("Прогон на чистой памяти с текущими неисправностями "
+                                         "без визуализации; повторные прогоны берутся из кэша")
+        self.btn_quick_result.clicked.connect(self.quick_result)
+        
         grp_setup_layout.addRow("Тест:", self.combo_tests)
         grp_setup_layout.addRow(btn_layout)
+        grp_setup_layout.addRow(self.btn_quick_result)
+
+        self.btn_run_all = QPushButton("Все тесты на сервер")
+        self.btn_run_all.setToolTip("Прогон всех тестов с текущими неисправностями на сервере заданий "
+                                    "(python -m app.server); результаты приходят в отчёт")
+        self.btn_run_all.clicked.connect(self.run_all_on_server)
+        self.lbl_server = QLabel()
+        grp_setup_layout.addRow(self.btn_run_all)
+        grp_setup_layout.addRow("Сервер:", self.lbl_server)
         grp_setup.setLayout(grp_setup_layout)
+        if self.job_client is not None:
+            self.job_client.connection_changed.connect(self.update_server_label)
+            self.job_client.job_updated.connect(self.on_job_updated)
+            self.job_client.rejected.connect(self.on_job_rejected)
+        self.update_server_label()
 
         # Group 2: Control
         grp_control = QGroupBox("Управление")
@@ -86,9 +157,26 @@ class TestingTab(QWidget):
         self.btn_step.clicked.connect(self.do_step)
         self.btn_step.setEnabled(False)
         
+        self.btn_step_back = QPushButton("Шаг назад")
+        self.btn_step_back.setToolTip("Во время прогона — от ближайшей контрольной точки, "
+                                      "после завершения — по трассе")
+        self.btn_step_back.clicked.connect(self.step_back)
+        self.btn_step_back.setEnabled(False)
+        
         btns_control.addWidget(self.btn_play_pause)
+        btns_control.addWidget(self.btn_step_back)
         btns_control.addWidget(self.btn_step)
         
+        seek_layout = QHBoxLayout()
+        seek_layout.addWidget(QLabel("К шагу:"))
+        self.spin_seek = QSpinBox()
+        self.spin_seek.setRange(0, 0)
+        self.btn_seek = QPushButton("Перейти")
+        self.btn_seek.clicked.connect(lambda: self.seek(self.spin_seek.value()))
+        self.btn_seek.setEnabled(False)
+        seek_layout.addWidget(self.spin_seek, 1)
+        seek_layout.addWidget(self.btn_seek)
+        
         slider_layout = QHBoxLayout()
         slider_layout.addWidget(QLabel("Скорость:"))
         self.slider_speed = QSlider(Qt.Orientation.Horizontal)
@@ -99,10 +187,15 @@ class TestingTab(QWidget):
         self.lbl_speed = QLabel("300 оп/мин")
         self.lbl_speed.setFixedWidth(80)
         
+        self.chk_turbo = QCheckBox("Турбо")
+        self.chk_turbo.toggled.connect(self.update_speed_label)
+        
         slider_layout.addWidget(self.slider_speed)
         slider_layout.addWidget(self.lbl_speed)
+        slider_layout.addWidget(self.chk_turbo)
         
         grp_control_layout.addLayout(btns_control)
+        grp_control_layout.addLayout(seek_layout)
         grp_control_layout.addLayout(slider_layout)
         grp_control.setLayout(grp_control_layout)
 
@@ -112,6 +205,8 @@ class TestingTab(QWidget):
         self.lbl_status = QLabel("Нет активного теста")
         self.lbl_last_action = QLabel("-")
         self.lbl_errors = QLabel("0")
+        self.progress_run = QProgressBar()
+        self.lbl_eta = QLabel("-")
         
         font_bold = self.lbl_status.font()
         font_bold.setBold(True)
@@ -121,11 +216,49 @@ class TestingTab(QWidget):
         grp_status_layout.addRow("Состояние:", self.lbl_status)
         grp_status_layout.addRow("Действие:", self.lbl_last_action)
         grp_status_layout.addRow("Найдено ошибок:", self.lbl_errors)
+        grp_status_layout.addRow("Прогресс:", self.progress_run)
+        grp_status_layout.addRow("Осталось:", self.lbl_eta)
         grp_status.setLayout(grp_status_layout)
 
         right_panel.addWidget(grp_setup)
         right_panel.addWidget(grp_control)
+        # Group 4: Timeline
+        grp_timeline = QGroupBox("Хронология")
+        grp_timeline_layout = QVBoxLayout()
+        self.slider_timeline = QSlider(Qt.Orientation.Horizontal)
+        self.slider_timeline.setEnabled(False)
+        # При перетаскивании состояние восстанавливается не чаще раза в кадр
+        self.slider_timeline.valueChanged.connect(lambda n: self.frame.schedule(self.show_trace_step, n))
+        self.lbl_timeline = QLabel("Доступна после завершения теста")
+        self.chk_trace = QCheckBox("Записывать трассу")
+        self.chk_trace.setChecked(True)
+        self.chk_trace.setToolTip(f"Все события прогона пишутся во временный файл (не больше "
+                                  f"{AppConstants.TRACE_MAX_BYTES >> 20} МБ); применяется при загрузке теста")
+        grp_timeline_layout.addWidget(self.chk_trace)
+        grp_timeline_layout.addWidget(self.slider_timeline)
+        grp_timeline_layout.addWidget(self.lbl_timeline)
+        grp_timeline.setLayout(grp_timeline_layout)
+
+        # Group 5: Performance
+        grp_perf = QGroupBox("Производительность")
+        grp_perf_layout = QFormLayout()
+        self.chk_profile = QCheckBox("Счётчики по опкодам")
+        self.chk_profile.setToolTip("TestRunner.enable_stats: число инструкций каждого типа, "
+                                    "переходы, обращения к неисправным словам")
+        self.chk_profile.toggled.connect(self.on_profile_toggled)
+        self.lbl_perf_ops = QLabel("-")
+        self.lbl_perf_ui = QLabel("-")
+        btn_perf_dump = QPushButton("Сохранить JSON")
+        btn_perf_dump.clicked.connect(self.save_perf_json)
+        grp_perf_layout.addRow(self.chk_profile)
+        grp_perf_layout.addRow("Выполнение:", self.lbl_perf_ops)
+        grp_perf_layout.addRow("Интерфейс:", self.lbl_perf_ui)
+        grp_perf_layout.addRow(btn_perf_dump)
+        grp_perf.setLayout(grp_perf_layout)
+
         right_panel.addWidget(grp_status)
+        right_panel.addWidget(grp_timeline)
+        right_panel.addWidget(grp_perf)
         right_panel.addStretch()
 
         main_layout.addLayout(left_panel, 6)
@@ -134,25 +267,29 @@ class TestingTab(QWidget):
         self.update_speed_label()
 
     def set_new_vram(self, vram_obj, size):
+        self.stop_worker()
+        self.close_trace()
         self.vram = vram_obj
+        self.vram_words = vram_obj.raw_view()
         self.runner = None
         
-        self.ram_grid.update_dimensions(size)
-        self.setup_grid_labels()
-        self.ram_grid.reset_grid()
+        self.ram_grid.update_dimensions(size, vram_obj.word_bits)
         
         # Обновляем значения (скорее всего все нули)
         self.update_all_grid_values()
         
-        self.timer.stop()
         self.btn_play_pause.setText("Старт (Авто)")
         self.btn_play_pause.setEnabled(False)
         self.btn_step.setEnabled(False)
+        self.set_seek_enabled(False)
         
         self.lbl_status.setText("ПАМЯТЬ ОБНОВЛЕНА")
         self.lbl_last_action.setText("Нажмите 'Загрузить' для старта")
         self.lbl_errors.setText("0")
         self.current_error_count = 0
+        self.events_expected = None
+        self.events_done = 0
+        self.update_progress()
 
     def create_legend_item(self, color, text):
         widget = QWidget()
@@ -166,65 +303,50 @@ class TestingTab(QWidget):
         layout.addWidget(label)
         return widget
 
-    def setup_grid_labels(self):
-        rows = self.ram_grid.rows
-        self.ram_grid.table.setHorizontalHeaderLabels([str(15 - i) for i in range(16)])
-        self.ram_grid.table.setVerticalHeaderLabels([f"0x{i:04X}" for i in range(rows)])
-
-    def update_row_values(self, addr):
-        """Читает слово по адресу и обновляет текст (0/1) в ячейках строки."""
-        if addr >= self.ram_grid.rows:
-            return
-            
-        try:
-            val = self.vram.read(addr)
-            for bit_pos in range(16):
-                # Извлекаем значение бита
-                bit_val = (val >> bit_pos) & 1
-                # Визуально: колонка 0 = 15-й бит (MSB), колонка 15 = 0-й бит (LSB)
-                col = 15 - bit_pos
-                
-                # Обновляем только текст, цвет не трогаем (передаем color=None неявно)
-                self.ram_grid.set_cell_state(addr, col, text=str(bit_val))
-        except Exception as e:
-            print(f"Error reading row {addr}: {e}")
-
     def update_all_grid_values(self):
-        """Обновляет текст во всех ячейках таблицы."""
-        for addr in range(self.ram_grid.rows):
-            self.update_row_values(addr)
+        """Обновляет значения всех слов таблицы."""
+        self.ram_grid.set_all_values(self.vram_words)
 
-    def refresh_test_list(self):
-        path = AppConstants.TEST_FILES_PATH
+    def update_test_list(self, tests):
+        """Новый список тестов из TestLibrary; выбранный тест остаётся выбранным, если он есть."""
+        current = self.combo_tests.currentText()
         self.combo_tests.clear()
-        self.test_files_map.clear()
-        if not os.path.exists(path):
+        if not os.path.isdir(self.library.directory):
             self.combo_tests.addItem("Ресурсы не найдены")
             return
-        files = glob.glob(os.path.join(path, "*.kids"))
-        if not files:
+        if not tests:
             self.combo_tests.addItem("Нет тестов (.kids)")
             return
-        for f in files:
-            base_name = os.path.basename(f)
-            clean_name = os.path.splitext(base_name)[0]
-            self.test_files_map[clean_name] = f
-            self.combo_tests.addItem(clean_name)
+        self.combo_tests.addItems(list(tests))
+        if current in tests:
+            self.combo_tests.setCurrentText(current)
 
     def load_test(self):
         name = self.combo_tests.currentText()
-        if name not in self.test_files_map: return
-        full_path = self.test_files_map[name]
+        if name not in self.library.tests: return
         
-        self.timer.stop()
+        self.stop_worker()
+        self.close_trace()
         self.btn_play_pause.setText("Старт (Авто)")
         
         try:
-            self.runner = TestRunner(self.vram, full_path)
+            self.runner = TestRunner(self.vram, self.library.program(name))
+            self.runner.enable_checkpoints(AppConstants.CHECKPOINT_EVERY_EVENTS,
+                                           AppConstants.CHECKPOINT_BUDGET_BYTES)
             self.current_error_count = 0
+            estimate = self.library.estimate(name, len(self.vram_words))
+            self.events_expected = expected_events(estimate)
+            self.estimate_exact = bool(estimate and estimate["exact"])
+            self.events_done = 0
+            self.rate_origin = None
+            self.spin_seek.setMaximum(0)
+            self.update_progress()
+            # Память отрисовывается целиком ниже; прежние грязные адреса потоку не нужны
+            self.vram.take_dirty()
             
             self.btn_step.setEnabled(True)
             self.btn_play_pause.setEnabled(True)
+            self.set_seek_enabled(True)
             
             self.lbl_status.setText("ГОТОВ")
             self.lbl_last_action.setText("Ожидание запуска...")
@@ -234,83 +356,430 @@ class TestingTab(QWidget):
             # После сброса цвета обновляем цифры, так как память могла измениться
             self.update_all_grid_values()
             
+            self.reset_perf()
+            trace_max_events = AppConstants.TRACE_MAX_BYTES // record_bytes(self.vram.word_bits)
+            if not self.chk_trace.isChecked():
+                trace_path = None
+                self.lbl_timeline.setText("Недоступна: запись трассы выключена")
+            elif self.estimate_exact and self.events_expected is not None \
+                    and self.events_expected > trace_max_events:
+                # Заранее известно, что трасса не поместится: не пишем её вовсе
+                trace_path = None
+                self.show_trace_dropped()
+            else:
+                trace_path = self.trace_path
+            self.worker = TestWorker(self.runner, self.vram, trace_path, trace_max_events)
+            self.worker.set_profiling(self.chk_profile.isChecked())
+            self.worker.batch_ready.connect(self.on_batch)
+            self.worker.trace_ready.connect(self.on_trace_ready)
+            self.worker.trace_dropped.connect(self.on_trace_dropped)
+            self.worker.failed.connect(self.on_worker_failed)
+            self.worker.start()
+            
         except Exception as e:
             QMessageBox.critical(self, "Ошибка загрузки", str(e))
 
+    def stop_worker(self):
+        """Останавливает поток выполнения (быстро: пачка шагов занимает доли миллисекунды)."""
+        if self.worker is None:
+            return
+        # Отложенные подписи прогона выводятся до того, как их заменят
+        self.frame.flush()
+        self.worker.batch_ready.disconnect(self.on_batch)
+        self.worker.trace_ready.disconnect(self.on_trace_ready)
+        self.worker.trace_dropped.disconnect(self.on_trace_dropped)
+        self.worker.failed.disconnect(self.on_worker_failed)
+        self.worker.stop()
+        self.worker = None
+
+    def current_config(self):
+        """Конфигурация текущей памяти в формате ConfigTab.save_config."""
+        error_map = self.vram.error_map()
+        type_names = {int(v): k for k, v in Vram.ErrType.__members__.items()}
+        addrs, bits = np.nonzero(error_map)
+        faults = [{"addr": int(a), "bit": int(b), "type": type_names[int(error_map[a, b])]}
+                  for a, b in zip(addrs, bits)]
+        return {"ram_size_words": error_map.shape[0], "word_bits": self.vram.word_bits, "faults": faults}
+
+    def quick_result(self):
+        """
+        Итог теста без пошагового выполнения: из кэша, заданием на сервере (результат придёт
+        в отчёт позже) или прогоном на отдельной памяти.
+        """
+        name = self.combo_tests.currentText()
+        if name not in self.library.tests: return
+        config = self.current_config()
+        if self.result_cache.get(self.result_cache.key(self.library.tests[name], config)) is None \
+                and self.submit_job(name, config):
+            self.lbl_last_action.setText(f"Мгновенный результат: {name} отправлен на сервер")
+            return
+        try:
+            result = run_test(config, self.library.tests[name], self.result_cache, self.library.programs)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка выполнения", str(e))
+            return
+        
+        source = "кэш" if result["cached"] else f"{result['elapsed_s'] * 1000:.1f} мс"
+        self.lbl_last_action.setText(f"Мгновенный результат {name} ({source}): ошибок {len(result['errors'])}")
+        # Имя теста — ключ фильтра отчёта: источник и время только в подписи
+        self.report_tab.add_result(name, result["errors"], config)
+
+    def submit_job(self, name, config):
+        """Ставит тест в очередь сервера заданий; False — сервер недоступен."""
+        if self.job_client is None or not self.job_client.is_connected():
+            return False
+        path = self.library.tests[name]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка чтения", str(e))
+            return True
+        # Ключ кэша — по файлу на момент отправки
+        context = {"name": name, "config": config, "key": self.result_cache.key(path, config)}
+        if self.job_client.submit(name, source, config, context):
+            self.jobs_pending += 1
+            self.update_server_label()
+            return True
+        return False
+
+    def run_all_on_server(self):
+        config = self.current_config()
+        sent = sum(self.submit_job(name, config) for name in self.library.tests)
+        self.lbl_last_action.setText(f"На сервер отправлено тестов: {sent}")
+
+    def update_server_label(self, *_):
+        connected = self.job_client is not None and self.job_client.is_connected()
+        self.btn_run_all.setEnabled(connected)
+        if not connected:
+            self.lbl_server.setText("не подключён (прогоны здесь)")
+        elif self.jobs_pending:
+            self.lbl_server.setText(f"подключён, заданий: {self.jobs_pending}")
+        else:
+            self.lbl_server.setText("подключён")
+
+    def on_job_updated(self, update, context):
+        if context is None or update["state"] not in jobs.FINISHED: return
+        self.jobs_pending -= 1
+        self.update_server_label()
+        name = context["name"]
+        if update["state"] != jobs.DONE:
+            self.lbl_last_action.setText(f"Сервер: {name} — {update.get('error', update['state'])}")
+            return
+        result = update["result"]
+        self.result_cache.put(context["key"], result)
+        self.lbl_last_action.setText(f"Сервер: {name} ({result['elapsed_s'] * 1000:.1f} мс), "
+                                     f"ошибок {len(result['errors'])}")
+        self.report_tab.add_result(name, result["errors"], context["config"])
+
+    def on_job_rejected(self, message, context):
+        if context is None: return
+        self.jobs_pending -= 1
+        self.update_server_label()
+        self.lbl_last_action.setText(f"Сервер отклонил {context['name']}: {message}")
+
     def toggle_play(self):
-        if self.timer.isActive():
-            self.timer.stop()
+        if not self.worker: return
+        if self.worker.is_playing():
+            self.worker.pause()
             self.btn_play_pause.setText("Старт (Авто)")
             self.lbl_status.setText("ПАУЗА")
         else:
-            self.update_speed_label()
-            self.timer.start()
+            self.worker.play(self.step_interval_ms())
             self.btn_play_pause.setText("Пауза")
             self.lbl_status.setText("ВЫПОЛНЕНИЕ...")
+        self.rate_origin = (time.perf_counter(), self.events_done)
+        self.update_progress()
+
+    def step_interval_ms(self):
+        """Пауза между событиями для потока; 0 — турбо, без пауз."""
+        if self.chk_turbo.isChecked():
+            return 0
+        return int(60000 / max(self.slider_speed.value(), 1))
 
     def update_speed_label(self):
-        ops_per_min = self.slider_speed.value()
-        self.lbl_speed.setText(f"{ops_per_min} оп/мин")
+        turbo = self.chk_turbo.isChecked()
+        self.slider_speed.setEnabled(not turbo)
+        if turbo:
+            self.lbl_speed.setText("макс.")
+        else:
+            self.lbl_speed.setText(f"{self.slider_speed.value()} оп/мин")
         
-        if ops_per_min > 0:
-            interval_ms = int(60000 / ops_per_min)
-            self.timer.setInterval(interval_ms)
+        if self.worker:
+            self.worker.set_interval(self.step_interval_ms())
+            self.rate_origin = (time.perf_counter(), self.events_done)
+            self.update_progress()
+
+    def update_progress(self):
+        """Полоса прогресса и оставшееся время по оценке числа событий прогона."""
+        expected = self.events_expected
+        if expected is None:
+            self.progress_run.setRange(0, 1)
+            self.progress_run.setValue(0)
+            self.progress_run.setFormat("нет оценки" if self.runner else "")
+            self.lbl_eta.setText("-")
+            return
+        # Прогресс-бар хранит int32: большие прогоны показываются в долях
+        scale = max(1, -(-expected // 2**30))
+        done = min(self.events_done, expected)
+        self.progress_run.setRange(0, max(1, expected // scale))
+        self.progress_run.setValue(done // scale)
+        # С ветвлениями (then) оценка — верхняя граница
+        prefix = "" if self.estimate_exact else "до "
+        self.progress_run.setFormat(f"{done} / {prefix}{expected} событий")
+
+        remaining = expected - done
+        if remaining == 0:
+            text = "-"
+        elif not self.chk_turbo.isChecked():
+            # Темп задаёт ползунок "Скорость", поэтому оценка есть и до запуска, и на паузе
+            text = prefix + format_duration(remaining * self.step_interval_ms() / 1000)
+        elif self.worker is not None and self.worker.is_playing() and self.rate_origin:
+            # В турбо скорость измеряется с момента запуска или смены скорости
+            t0, done0 = self.rate_origin
+            elapsed = time.perf_counter() - t0
+            text = prefix + format_duration(remaining * elapsed / (done - done0)) if done > done0 else "..."
+        else:
+            text = "-"
+        self.lbl_eta.setText(text)
 
     def do_step(self):
-        if not self.runner: return
-        try:
-            res = self.runner.step()
-            addr = res.i
-            
-            if res.type == TestRunner.StepResult.Type.WRITE:
-                self.lbl_last_action.setText(f"Запись по адресу 0x{addr:04X}")
-                # Сначала обновляем значения, так как произошла запись
-                self.update_row_values(addr)
-                self.ram_grid.highlight_row(addr, AppConstants.COLOR_BG_ACTIVE)
-                
-            elif res.type == TestRunner.StepResult.Type.TEST_SUCCEEDED:
-                self.lbl_last_action.setText(f"Чтение 0x{addr:04X} -> OK")
-                # При чтении значения тоже полезно обновить (вдруг внешняя ошибка изменила их)
-                self.update_row_values(addr)
-                self.ram_grid.highlight_row(addr, AppConstants.COLOR_BG_SUCCESS)
-                
-            elif res.type == TestRunner.StepResult.Type.TEST_FAILED:
-                self.current_error_count += 1
-                self.lbl_errors.setText(str(self.current_error_count))
-                self.lbl_last_action.setText(f"Чтение 0x{addr:04X} -> ОШИБКА")
-                self.update_row_values(addr)
-                self.ram_grid.highlight_row(addr, AppConstants.COLOR_BG_ERROR)
-                
-            elif res.type == TestRunner.StepResult.Type.ENDED:
-                self.finish_test()
+        if self.worker:
+            self.worker.step()
+
+    def set_seek_enabled(self, enabled):
+        self.btn_step_back.setEnabled(enabled)
+        self.btn_seek.setEnabled(enabled)
+        self.spin_seek.setEnabled(enabled)
+
+    def step_back(self):
+        position = self.slider_timeline.value() if self.trace is not None else self.events_done
+        if position > 0:
+            self.seek(position - 1)
+
+    def seek(self, step):
+        """Переход к состоянию после step событий: после завершения — по трассе, иначе —
+        возвратом выполнения (TestRunner.seek), после которого прогон можно продолжить."""
+        if self.trace is not None:
+            self.slider_timeline.setValue(min(step, len(self.trace)))
+            return
+        if self.worker is None:
+            return
+        self.worker.seek(min(step, self.events_done))
+        self.btn_play_pause.setText("Старт (Авто)")
+        self.lbl_status.setText("ПАУЗА")
+
+    def on_batch(self, batch):
+        """Отрисовывает пачку событий из потока выполнения."""
+        if self.sender() is not self.worker:
+            # Пачка, отправленная уже остановленным потоком
+            return
+        started = time.perf_counter()
+        self.render_batch(batch)
+        self.update_perf(batch, time.perf_counter() - started)
+
+        if batch["ended"]:
+            self.finish_test(batch["errors"])
+        else:
+            self.worker.ack()
+
+    def render_batch(self, batch):
+        """
+        Данные пачки применяются сразу, а подписи, прогресс и перерисовка сетки — не чаще раза
+        в кадр (FrameScheduler): при многих пачках за кадр выводится только последнее состояние.
+        """
+        action = None
+        if batch["seek"]:
+            # Возврат назад: счётчики с начала прогона, подсветка — только последнее событие
+            self.events_done = batch["position"]
+            self.current_error_count = batch["stats"]["events"]["TEST_FAILED"]
+            self.ram_grid.reset_grid()
+            self.rate_origin = (time.perf_counter(), self.events_done)
+            if batch["events"] == 0 and batch["last"] is not None:
+                last_type, addr = batch["last"]
+                self.ram_grid.highlight_rows(np.array([addr]), self.EVENT_ROW_STATES[[last_type]])
+                action = f"Возврат к шагу {self.events_done}, последний адрес 0x{addr:04X}"
+            elif batch["events"] == 0:
+                action = "Возврат к началу"
+        else:
+            self.events_done += batch["events"]
+        if batch["events"] > 0:
+            self.current_error_count += batch["failed"]
+
+            # Цвет строки определяется последним событием по её адресу
+            self.ram_grid.highlight_rows(batch["addrs"], self.EVENT_ROW_STATES[batch["types"]])
+
+            last_type, addr = batch["last"]
+            if batch["events"] > 1:
+                action = f"{batch['events']} событий, последний адрес 0x{addr:04X}"
+            elif last_type == int(TestRunner.StepResult.Type.WRITE):
+                action = f"Запись по адресу 0x{addr:04X}"
+            elif last_type == int(TestRunner.StepResult.Type.TEST_SUCCEEDED):
+                action = f"Чтение 0x{addr:04X} -> OK"
+            else:
+                action = f"Чтение 0x{addr:04X} -> ОШИБКА"
+
+        self.frame.schedule(self.lbl_errors.setText, str(self.current_error_count))
+        self.frame.schedule(self.spin_seek.setMaximum, min(self.events_done, INT32_MAX))
+        self.frame.schedule(self.update_progress)
+        if action is not None:
+            self.frame.schedule(self.lbl_last_action.setText, action)
+
+        # Значения берём по грязным словам: запись и побочные эффекты чтения
+        dirty = batch["dirty"]
+        if len(dirty) > 0:
+            self.ram_grid.set_row_values(dirty, batch["words"])
+            self.memory_changed.emit(dirty)
+
+    def reset_perf(self):
+        # Накопленные замеры текущего прогона; скорости считаются по окну PERF_WINDOW_S
+        self.perf = {"frames": 0, "ui_s": 0.0, "ui_max_s": 0.0, "stats": None, "worker_s": 0.0}
+        self.perf_window = None
+
+    def on_profile_toggled(self, enabled):
+        if self.worker:
+            self.worker.set_profiling(enabled)
 
+    def update_perf(self, batch, ui_s):
+        perf = self.perf
+        perf["frames"] += 1
+        perf["ui_s"] += ui_s
+        perf["ui_max_s"] = max(perf["ui_max_s"], ui_s)
+        perf["stats"] = batch["stats"]
+        perf["worker_s"] = batch["worker_s"]
+
+        stats = batch["stats"]
+        now = time.perf_counter()
+        sample = (now, sum(stats["events"].values()), stats.get("instructions", 0), perf["frames"], perf["ui_s"])
+        if self.perf_window is None:
+            self.perf_window = sample
+            return
+        t0, events0, instr0, frames0, ui0 = self.perf_window
+        elapsed = now - t0
+        if elapsed < AppConstants.PERF_WINDOW_S and not batch["ended"]:
+            return
+        self.perf_window = sample
+
+        rate = lambda count: f"{count / elapsed:,.0f}".replace(",", " ")
+        text = f"{rate(sample[1] - events0)} соб/с"
+        if stats["enabled"]:
+            text += f", {rate(sample[2] - instr0)} инстр/с"
+        self.lbl_perf_ops.setText(text)
+        frames = sample[3] - frames0
+        self.lbl_perf_ui.setText(f"{(sample[4] - ui0) * 1000 / max(frames, 1):.2f} мс/кадр, "
+                                 f"{frames / elapsed:.0f} кадров/с")
+
+    def save_perf_json(self):
+        """Сохраняет замеры прогона для сравнения сборок."""
+        perf = self.perf
+        if perf["stats"] is None:
+            QMessageBox.information(self, "Производительность", "Нет данных: запустите тест.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить замеры", "", "JSON (*.json)")
+        if not file_path: return
+        report = {
+            "test": self.combo_tests.currentText(),
+            "ram_size_words": len(self.vram_words),
+            "runner": perf["stats"],
+            "worker_s": perf["worker_s"],
+            "ui": {
+                "frames": perf["frames"],
+                "total_s": perf["ui_s"],
+                "avg_ms_per_frame": perf["ui_s"] * 1000 / max(perf["frames"], 1),
+                "max_ms_per_frame": perf["ui_max_s"] * 1000,
+            },
+        }
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=4)
         except Exception as e:
-            self.timer.stop()
-            print(f"Error during step: {e}")
+            QMessageBox.critical(self, "Ошибка", str(e))
+
+    def on_trace_ready(self, trace):
+        """Трасса записана и проиндексирована: включаем ползунок хронологии."""
+        if self.sender() is not self.worker:
+            return
+        self.trace = trace
+        self.slider_timeline.blockSignals(True)
+        # Трасса ограничена TRACE_MAX_BYTES, но предел int32 проверяется и здесь
+        last = min(len(trace), INT32_MAX)
+        self.slider_timeline.setRange(0, last)
+        self.slider_timeline.setValue(last)
+        self.slider_timeline.blockSignals(False)
+        self.slider_timeline.setEnabled(True)
+        self.lbl_timeline.setText(f"Шаг {len(trace)} / {len(trace)}")
+        self.spin_seek.setMaximum(last)
+        self.set_seek_enabled(True)
+
+    def on_trace_dropped(self):
+        if self.sender() is self.worker:
+            self.show_trace_dropped()
+
+    def show_trace_dropped(self):
+        self.lbl_timeline.setText(f"Недоступна: трасса прогона больше {AppConstants.TRACE_MAX_BYTES >> 20} МБ")
 
-    def finish_test(self):
-        self.timer.stop()
+    def show_trace_step(self, n):
+        """Показывает память и подсветку после первых n событий трассы."""
+        if self.trace is None: return
+        words, types, failed = self.trace.state_at(n)
+        self.ram_grid.set_all_values(words)
+        self.ram_grid.highlight_rows(np.arange(len(types)), self.EVENT_ROW_STATES[types])
+        self.lbl_errors.setText(str(failed))
+
+        text = f"Шаг {n} / {len(self.trace)}"
+        if n > 0:
+            event_type, addr, op = self.trace.event(n - 1)
+            text += f": {self.EVENT_NAMES[event_type]} 0x{addr:04X} (оп. #{op})"
+        self.lbl_timeline.setText(text)
+
+    def close_trace(self):
+        self.slider_timeline.setEnabled(False)
+        self.set_seek_enabled(False)
+        self.lbl_timeline.setText("Доступна после завершения теста")
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+        try:
+            os.remove(self.trace_path)
+        except OSError:
+            pass
+
+    def on_worker_failed(self, message):
+        self.frame.flush()
+        self.btn_play_pause.setText("Старт (Авто)")
+        self.btn_play_pause.setEnabled(False)
+        self.btn_step.setEnabled(False)
+        self.set_seek_enabled(False)
+        self.lbl_status.setText("ОШИБКА")
+        self.lbl_last_action.setText(message)
+        print(f"Error during step: {message}")
+
+    def finish_test(self, errors):
+        self.frame.flush()
         self.btn_play_pause.setText("Старт (Авто)")
         self.btn_play_pause.setEnabled(False)
         self.btn_step.setEnabled(False)
+        # Назад после завершения — по трассе, когда она будет готова (on_trace_ready)
+        self.set_seek_enabled(False)
         
         self.lbl_status.setText("ЗАВЕРШЕН")
         self.lbl_last_action.setText("Тест окончен")
+        # Оценка с ветвлениями — верхняя граница: по окончании прогресс полный
+        self.events_expected = self.events_done
+        self.estimate_exact = True
+        self.update_progress()
         
-        errors = self.runner.detected_errors()
         err_count = len(errors)
         test_name = self.combo_tests.currentText()
         
         self.lbl_errors.setText(str(err_count))
         
-        # Обновляем весь грид для точности отображения финального состояния
-        self.update_all_grid_values()
-        
-        for addr in errors:
-            self.ram_grid.highlight_row(addr, AppConstants.COLOR_BG_ERROR)
+        if errors:
+            self.ram_grid.highlight_rows(np.unique(errors), RowState.ERROR)
         
-        self.report_tab.append_formatted_result(test_name, errors)
+        self.report_tab.add_result(test_name, errors, self.current_config())
         
+        # Немодальное окно: не блокирует интерфейс
         msg = QMessageBox(self)
         msg.setWindowTitle("Результат теста")
         if err_count == 0:
@@ -321,4 +790,6 @@ class TestingTab(QWidget):
             msg.setIcon(QMessageBox.Icon.Warning)
             msg.setText(f"<h3 style='color:red;'>Тест провален!</h3>")
             msg.setInformativeText(f"Алгоритм: <b>{test_name}</b><br>Событий ошибок: <b>{err_count}</b>")
-        msg.exec()
\ No newline at end of file
+        msg.setModal(False)
+        msg.show()
+        self.result_dialog = msg
\ No newline at end of file
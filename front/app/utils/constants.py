@@ -8,15 +8,39 @@ class AppConstants:
     
     # Sizes by dafault
     DEFAULT_WORD_COUNT = 16
+    MAX_WORD_COUNT = 1 << 22
+    # Default word width; Vram supports every width in WORD_WIDTHS
     BITS_PER_WORD = 16
+    WORD_WIDTHS = (8, 16, 32, 64)
     
     # Visualisation
-    GRID_COLS = 16
     DEFAULT_CELL_SIZE = 40
 
+    # Turbo mode: results processed per timer tick
+    TURBO_STEPS_PER_TICK = 4096
+    # Test results reach the UI at most once per frame
+    UI_FRAME_MS = 16
+    # Pending worker results are compacted (last event per address) beyond this size
+    WORKER_BATCH_COMPACT_EVENTS = 1 << 20
+    # Step back / rewind: runner checkpoints every N events (the interval doubles past the budget)
+    CHECKPOINT_EVERY_EVENTS = 4096
+    CHECKPOINT_BUDGET_BYTES = 256 * 1024 * 1024
+    # Timeline trace file limit; longer runs are not traced
+    TRACE_MAX_BYTES = 64 * 1024 * 1024
+    # Live performance panel refresh period, seconds
+    PERF_WINDOW_S = 0.5
+
+    # Job server (python -m app.server): address, reconnect period and finished jobs kept for status
+    JOB_SERVER_HOST = "127.0.0.1"
+    JOB_SERVER_PORT = 47391
+    JOB_SERVER_RETRY_MS = 5000
+    JOB_HISTORY = 1000
+
     # Paths
     TEST_FILES_PATH = r"./res"
     ICON_PATH = r"icon.ico" 
+    RESULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".kidsvt", "results.sqlite")
+    RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
     # Colors (HEX)
     COLOR_BG_DEFAULT = "#FFFFFF"
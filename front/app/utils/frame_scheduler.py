@@ -0,0 +1,41 @@
+# app/utils/frame_scheduler.py
+import time
+from PyQt6.QtCore import QObject, QTimer
+from app.utils.constants import AppConstants
+
+
+class FrameScheduler(QObject):
+    """
+    Откладывает обновления интерфейса до ближайшего кадра: schedule(fn, *args) запоминает вызов,
+    и не чаще раза в кадр все запомненные вызовы выполняются разом. Повторный schedule той же
+    функции заменяет аргументы, поэтому из серии обновлений одного элемента выполняется только
+    последнее. Первое обновление после простоя выполняется сразу по возвращении в цикл событий.
+    """
+
+    def __init__(self, parent=None, frame_ms=AppConstants.UI_FRAME_MS):
+        super().__init__(parent)
+        self.frame_s = frame_ms / 1000
+        # Функция -> аргументы; словарь сохраняет порядок первых вызовов
+        self.pending = {}
+        self.last_flush = 0.0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, fn, *args):
+        self.pending[fn] = args
+        if not self.timer.isActive():
+            wait_s = self.frame_s - (time.monotonic() - self.last_flush)
+            self.timer.start(max(0, round(wait_s * 1000)))
+
+    def flush(self):
+        """Выполняет запомненные вызовы сейчас (перед изменениями, которые не должны затереться)."""
+        self.timer.stop()
+        self.last_flush = time.monotonic()
+        pending, self.pending = self.pending, {}
+        for fn, args in pending.items():
+            fn(*args)
+
+    def cancel(self):
+        self.timer.stop()
+        self.pending.clear()
@@ -0,0 +1,63 @@
+# app/widgets/fault_list.py
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class FaultListModel(QAbstractListModel):
+    """
+    Список неисправностей в виде таблицы столбцов (адрес, бит, тип ErrType).
+    Каждый бит встречается не больше одного раза; строки отсортированы по (адрес, бит).
+    """
+
+    def __init__(self, type_names):
+        super().__init__()
+        # Подписи типов, индекс = значение ErrType
+        self.type_names = type_names
+        self.addrs = np.zeros(0, dtype=np.uint32)
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.types = np.zeros(0, dtype=np.uint8)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.addrs)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (f"Addr 0x{int(self.addrs[row]):04X} | Bit {int(self.bits[row]):02d} | "
+                    f"{self.type_names[self.types[row]]}")
+        if role == Qt.ItemDataRole.UserRole:
+            return int(self.addrs[row]), int(self.bits[row]), int(self.types[row])
+        return None
+
+    def set_faults(self, addrs, bits, types):
+        """Заменяет весь список; при повторах одного бита остаётся последнее назначение."""
+        addrs = np.asarray(addrs, dtype=np.uint32)
+        bits = np.asarray(bits, dtype=np.uint8)
+        types = np.asarray(types, dtype=np.uint8)
+
+        keys = addrs.astype(np.uint64) << np.uint64(8) | bits
+        # np.unique берёт первое вхождение, поэтому ищем по перевёрнутым массивам
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = len(keys) - 1 - last
+        keep = keep[types[keep] != 0]
+
+        self.beginResetModel()
+        self.addrs, self.bits, self.types = addrs[keep], bits[keep], types[keep]
+        self.endResetModel()
+
+    def add_fault(self, addr, bit, err_type):
+        self.set_faults(np.append(self.addrs, addr), np.append(self.bits, bit),
+                        np.append(self.types, err_type))
+
+    def remove_rows(self, rows):
+        keep = np.ones(len(self.addrs), dtype=bool)
+        keep[np.asarray(rows, dtype=np.intp)] = False
+
+        self.beginResetModel()
+        self.addrs, self.bits, self.types = self.addrs[keep], self.bits[keep], self.types[keep]
+        self.endResetModel()
+
+    def clear(self):
+        self.set_faults([], [], [])
@@ -0,0 +1,200 @@
+# app/widgets/heatmap.py
+import numpy as np
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QLabel, QComboBox,
+                             QSizePolicy)
+from PyQt6.QtCore import Qt, QRectF, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, QColor
+from app.core.heatmap import LEVELS
+
+
+def heat_color_table():
+    """Палитра Indexed8: 0 — белый, дальше от жёлтого через красный к тёмно-бордовому."""
+    table = [QColor("#FFFFFF").rgb()]
+    stops = [(0.0, (255, 240, 160)), (0.4, (255, 150, 40)), (0.75, (230, 30, 20)), (1.0, (90, 0, 20))]
+    for level in range(LEVELS):
+        t = level / (LEVELS - 1)
+        for (t0, c0), (t1, c1) in zip(stops, stops[1:]):
+            if t <= t1:
+                k = (t - t0) / (t1 - t0)
+                table.append(QColor(*(round(a + (b - a) * k) for a, b in zip(c0, c1))).rgb())
+                break
+    return table
+
+
+class HeatmapCanvas(QWidget):
+    """
+    Рисует карту одним QImage с палитрой: при каждой отрисовке копируется (и масштабируется)
+    только видимая часть изображения.
+    """
+    hovered = pyqtSignal(object)
+    clicked = pyqtSignal(int)
+
+    COLOR_TABLE = None
+
+    def __init__(self):
+        super().__init__()
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        if HeatmapCanvas.COLOR_TABLE is None:
+            HeatmapCanvas.COLOR_TABLE = heat_color_table()
+        self.heatmap = None
+        self.image = QImage()
+        self._levels = None
+        self.words_per_row = 1
+        # Масштаб: > 1 — точек экрана на ячейку, < 1 — ячеек в точке (1 / pool)
+        self.zoom = 1.0
+
+    def pool(self):
+        return max(1, round(1 / self.zoom))
+
+    def set_zoom(self, zoom):
+        """Увеличение только растягивает готовую картинку; уменьшение строит её заново."""
+        pool_changed = self.pool() != max(1, round(1 / zoom))
+        self.zoom = zoom
+        if pool_changed:
+            self.render()
+        else:
+            self.resize(self.sizeHint())
+            self.update()
+
+    def set_heatmap(self, heatmap):
+        self.heatmap = heatmap
+        self.render()
+
+    def render(self):
+        heatmap = self.heatmap
+        if heatmap is None or heatmap.words == 0:
+            self.image = QImage()
+            self._levels = None
+        else:
+            self.words_per_row = heatmap.words_per_row()
+            pool = self.pool()
+            # QImage не копирует буфер: массив хранится, пока жива картинка
+            self._levels = np.ascontiguousarray(heatmap.to_levels(self.words_per_row, pool))
+            height, width = self._levels.shape
+            self.image = QImage(self._levels.data, width, height, width, QImage.Format.Format_Indexed8)
+            self.image.setColorTable(self.COLOR_TABLE)
+        self.updateGeometry()
+        self.resize(self.sizeHint())
+        self.update()
+
+    def scale(self):
+        return max(1.0, self.zoom)
+
+    def sizeHint(self):
+        return QSize(round(self.image.width() * self.scale()), round(self.image.height() * self.scale()))
+
+    def paintEvent(self, event):
+        if self.image.isNull():
+            return
+        painter = QPainter(self)
+        target = QRectF(event.rect())
+        s = self.scale()
+        source = QRectF(target.x() / s, target.y() / s, target.width() / s, target.height() / s)
+        painter.drawImage(target, self.image, source)
+
+    def cell_at(self, pos):
+        """(первый адрес, последний адрес, бит или None, максимум прогонов) под точкой pos."""
+        if self.heatmap is None or self.image.isNull():
+            return None
+        x, y = int(pos.x() / self.scale()), int(pos.y() / self.scale())
+        if not (0 <= x < self.image.width() and 0 <= y < self.image.height()):
+            return None
+        bits = self.heatmap.bits
+        pool = self.pool()
+        first_row, last_row = y * pool, y * pool + pool - 1
+        first_col, last_col = x * pool, x * pool + pool - 1
+        first = first_row * self.words_per_row + first_col // bits
+        last = min(last_row * self.words_per_row + last_col // bits, self.heatmap.words - 1)
+        if first >= self.heatmap.words:
+            return None
+        if pool == 1:
+            # Старший бит слева (ErrorHeatmap.to_levels)
+            bit = bits - 1 - first_col % bits
+            return first, first, bit, int(self.heatmap.counts[first, bit])
+        return first, last, None, int(self.heatmap.counts[first:last + 1].max())
+
+    def mouseMoveEvent(self, event):
+        self.hovered.emit(self.cell_at(event.position()))
+
+    def mousePressEvent(self, event):
+        cell = self.cell_at(event.position())
+        if cell is not None and event.button() == Qt.MouseButton.LeftButton:
+            self.clicked.emit(cell[0])
+
+    def leaveEvent(self, event):
+        self.hovered.emit(None)
+
+
+class HeatmapWidget(QWidget):
+    """
+    Тепловая карта провалов по многим прогонам (app.core.heatmap.ErrorHeatmap).
+    Клик по ячейке отправляет её адрес сигналом address_clicked.
+    """
+    address_clicked = pyqtSignal(int)
+
+    ZOOMS = (("1:8", 1 / 8), ("1:4", 1 / 4), ("1:2", 1 / 2), ("1:1", 1), ("2:1", 2), ("4:1", 4), ("8:1", 8))
+    DEFAULT_ZOOM = 4
+
+    def __init__(self, heatmap):
+        super().__init__()
+        self.heatmap = heatmap
+        # Перерисовка откладывается до показа виджета
+        self.stale = True
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        self.combo_zoom = QComboBox()
+        for text, zoom in self.ZOOMS:
+            self.combo_zoom.addItem(text, zoom)
+        self.combo_zoom.setCurrentIndex(self.DEFAULT_ZOOM)
+        self.combo_zoom.currentIndexChanged.connect(
+            lambda: self.canvas.set_zoom(self.combo_zoom.currentData()))
+        self.lbl_summary = QLabel()
+        top.addWidget(QLabel("Масштаб:"))
+        top.addWidget(self.combo_zoom)
+        top.addWidget(self.lbl_summary)
+        top.addStretch()
+
+        self.canvas = HeatmapCanvas()
+        self.canvas.zoom = self.combo_zoom.currentData()
+        self.canvas.hovered.connect(self.show_cell)
+        self.canvas.clicked.connect(self.address_clicked)
+        scroll = QScrollArea()
+        scroll.setWidget(self.canvas)
+        scroll.setWidgetResizable(False)
+
+        self.lbl_cell = QLabel("Наведите на ячейку; клик — фильтр журнала по адресу")
+
+        layout.addLayout(top)
+        layout.addWidget(scroll)
+        layout.addWidget(self.lbl_cell)
+
+    def mark_stale(self):
+        self.stale = True
+        if self.isVisible():
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.stale:
+            self.refresh()
+
+    def refresh(self):
+        self.stale = False
+        self.canvas.set_heatmap(self.heatmap)
+        h = self.heatmap
+        top = h.hottest()
+        self.lbl_summary.setText(
+            f"Прогонов: {h.runs}, слов: {h.words}, в строке: {self.canvas.words_per_row} сл."
+            + (f", чаще всего: 0x{top[0]:X} бит {top[1]} ({top[2]})" if top else ""))
+
+    def show_cell(self, cell):
+        if cell is None:
+            return
+        first, last, bit, count = cell
+        where = f"0x{first:X}, бит {bit}" if bit is not None else f"0x{first:X}..0x{last:X}"
+        self.lbl_cell.setText(f"{where}: провалов в {count} прогонах из {self.heatmap.runs}")
@@ -1,37 +1,176 @@
 # app/widgets/ram_grid.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QHeaderView, QAbstractItemView)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QFont
+from enum import IntEnum
+import numpy as np
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QHeaderView,
+                             QAbstractItemView, QStyledItemDelegate, QStyle)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen
 from app.utils.constants import AppConstants
+from app.utils.frame_scheduler import FrameScheduler
+
+
+def pack_bits(bits):
+    """
+    Матрица битов (строка — слово, колонка k — бит k, ширина до 64) -> слова uint64,
+    одной векторной операцией (маски неисправностей для set_all_values).
+    """
+    bits = np.asarray(bits, dtype=bool)
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    words = np.zeros((len(bits), 8), dtype=np.uint8)
+    words[:, :packed.shape[1]] = packed
+    return words.view("<u8").reshape(-1)
+
+
+class RowState(IntEnum):
+    DEFAULT = 0
+    ACTIVE = 1
+    SUCCESS = 2
+    ERROR = 3
+
+
+class RamGridModel(QAbstractTableModel):
+    """
+    Модель сетки памяти: строка = слово, колонка = бит (колонка 0 = старший бит).
+    Данные хранятся в плоских массивах, объекты на ячейки не создаются.
+    Изменённые строки копятся и сообщаются представлению одним dataChanged за кадр.
+    """
+
+    def __init__(self, rows, cols):
+        super().__init__()
+        self.cols = cols
+        # Диапазон строк, изменённых с прошлого dataChanged, или None
+        self.pending_rows = None
+        self.scheduler = FrameScheduler(self)
+        self._allocate(rows)
+
+    def _allocate(self, rows):
+        self.rows = rows
+        self.words = np.zeros(rows, dtype=np.uint64)
+        self.row_states = np.zeros(rows, dtype=np.uint8)
+        # Биты с назначенной неисправностью подсвечиваются цветом ошибки
+        self.fault_masks = np.zeros(rows, dtype=np.uint64)
+
+    def resize(self, rows, cols):
+        self.scheduler.cancel()
+        self.pending_rows = None
+        self.beginResetModel()
+        self.cols = cols
+        self._allocate(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.cols
+
+    def bit_of(self, row, col):
+        return (int(self.words[row]) >> (self.cols - 1 - col)) & 1
+
+    def is_fault(self, row, col):
+        return (int(self.fault_masks[row]) >> (self.cols - 1 - col)) & 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.bit_of(index.row(), index.column()))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self.cols - 1 - section)
+        return f"0x{section:04X}"
+
+    def rows_changed(self, first, last):
+        if self.rows == 0:
+            return
+        if self.pending_rows is not None:
+            first, last = min(first, self.pending_rows[0]), max(last, self.pending_rows[1])
+        self.pending_rows = (first, last)
+        self.scheduler.schedule(self.emit_changes)
+
+    def emit_changes(self):
+        if self.pending_rows is None:
+            return
+        first, last = self.pending_rows
+        self.pending_rows = None
+        self.dataChanged.emit(self.index(first, 0), self.index(last, self.cols - 1))
+
+    def all_changed(self):
+        self.rows_changed(0, self.rows - 1)
+
+
+class RamCellDelegate(QStyledItemDelegate):
+    """Рисует ячейку напрямую из массивов модели."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.state_colors = {
+            RowState.DEFAULT: QColor(AppConstants.COLOR_BG_DEFAULT),
+            RowState.ACTIVE: QColor(AppConstants.COLOR_BG_ACTIVE),
+            RowState.SUCCESS: QColor(AppConstants.COLOR_BG_SUCCESS),
+            RowState.ERROR: QColor(AppConstants.COLOR_BG_ERROR),
+        }
+        self.text_pen = QPen(QColor(AppConstants.COLOR_TEXT_DEFAULT))
+        self.selected_pen = QPen(QColor(AppConstants.COLOR_TEXT_DEFAULT), 2)
+
+    def paint(self, painter, option, index):
+        row, col = index.row(), index.column()
+        model = self.model
+
+        if model.is_fault(row, col):
+            bg = self.state_colors[RowState.ERROR]
+        else:
+            bg = self.state_colors[model.row_states[row]]
+        painter.fillRect(option.rect, bg)
+
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(self.selected_pen)
+            painter.drawRect(option.rect.adjusted(1, 1, -1, -1))
+
+        painter.setPen(self.text_pen)
+        painter.drawText(option.rect, Qt.AlignmentFlag.AlignCenter, "1" if model.bit_of(row, col) else "0")
+
 
 class RamGridWidget(QWidget):
+    cell_clicked = pyqtSignal(int, int)
+
     def __init__(self, read_only=False):
         super().__init__()
         self.read_only = read_only
         self.rows = AppConstants.DEFAULT_WORD_COUNT
-        self.cols = AppConstants.GRID_COLS
+        self.cols = AppConstants.BITS_PER_WORD
         self.cell_size = AppConstants.DEFAULT_CELL_SIZE
-        
+
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.table = QTableWidget(self.rows, self.cols)
+        self.model = RamGridModel(self.rows, self.cols)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.delegate = RamCellDelegate(self.model, self.table)
+        self.table.setItemDelegate(self.delegate)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        
+        self.table.clicked.connect(lambda index: self.cell_clicked.emit(index.row(), index.column()))
+
         self.table.horizontalHeader().setVisible(True)
         self.table.verticalHeader().setVisible(True)
-        
+
         font = QFont()
         font.setPointSize(12)
         self.table.setFont(font)
-        
+
         self._resize_cells()
-        self.reset_grid()
 
         layout.addWidget(self.table)
 
@@ -39,49 +178,62 @@ class RamGridWidget(QWidget):
         header = self.table.horizontalHeader()
         header.setDefaultSectionSize(self.cell_size)
         header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
-        
+
         v_header = self.table.verticalHeader()
         v_header.setDefaultSectionSize(self.cell_size)
         v_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
 
-    def update_dimensions(self, rows):
+    def update_dimensions(self, rows, cols=None):
+        """rows — число слов, cols — ширина слова в битах (по умолчанию прежняя)."""
         self.rows = int(rows)
-        self.cols = AppConstants.GRID_COLS
-        
-        self.table.setRowCount(self.rows)
-        self.table.setColumnCount(self.cols)
+        self.cols = int(cols or self.cols)
+
+        self.model.resize(self.rows, self.cols)
         self._resize_cells()
-        self.reset_grid()
+
+    def flush(self):
+        """Сообщает представлению об отложенных изменениях сейчас, не дожидаясь кадра."""
+        self.model.scheduler.flush()
 
     def reset_grid(self):
-        self.table.setUpdatesEnabled(False)
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.set_cell_state(r, c, text="", color=AppConstants.COLOR_BG_DEFAULT)
-        self.table.setUpdatesEnabled(True)
-
-    def set_cell_state(self, row, col, text=None, color=None):
-        if row >= self.rows or col >= self.cols:
+        """Сбрасывает подсветку строк и неисправностей, значения слов не трогает."""
+        self.model.row_states.fill(RowState.DEFAULT)
+        self.model.fault_masks.fill(0)
+        self.model.all_changed()
+
+    def set_row_value(self, row, word, fault_mask=None):
+        if row >= self.rows:
             return
+        self.model.words[row] = word
+        if fault_mask is not None:
+            self.model.fault_masks[row] = fault_mask
+        self.model.rows_changed(row, row)
 
-        item = self.table.item(row, col)
-        if not item:
-            item = QTableWidgetItem()
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, col, item)
-        
-        # --- ИЗМЕНЕНИЕ: Принудительно ставим черный цвет текста ---
-        item.setForeground(QColor(AppConstants.COLOR_TEXT_DEFAULT))
-        # ----------------------------------------------------------
-        
-        if text is not None:
-            item.setText(text)
-        
-        if color is not None:
-            item.setBackground(QColor(color))
-
-    def highlight_row(self, row, color):
+    def set_row_values(self, rows, words):
+        """Обновляет значения выбранных строк: `rows` — массив адресов, `words` — их значения."""
+        rows = np.asarray(rows)
+        if rows.size == 0:
+            return
+        self.model.words[rows] = words
+        self.model.rows_changed(int(rows.min()), int(rows.max()))
+
+    def set_all_values(self, words, fault_masks=None):
+        """Заменяет значения всех слов одной операцией над массивом."""
+        self.model.words[:] = words
+        if fault_masks is not None:
+            self.model.fault_masks[:] = fault_masks
+        self.model.all_changed()
+
+    def highlight_row(self, row, state):
         if row >= self.rows:
             return
-        for c in range(self.cols):
-            self.set_cell_state(row, c, color=color)
\ No newline at end of file
+        self.model.row_states[row] = state
+        self.model.rows_changed(row, row)
+
+    def highlight_rows(self, rows, states):
+        """Векторная подсветка: `states` — массив длины `rows` или одно состояние."""
+        rows = np.asarray(rows)
+        if rows.size == 0:
+            return
+        self.model.row_states[rows] = states
+        self.model.rows_changed(int(rows.min()), int(rows.max()))
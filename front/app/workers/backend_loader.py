@@ -0,0 +1,24 @@
+# app/workers/backend_loader.py
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class BackendLoader(QThread):
+    """
+    Импортирует бэкенд, NumPy и модули вкладок и создаёт стартовую Vram в фоне,
+    пока окно уже показано. По готовности отправляет Vram сигналом loaded.
+    """
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, word_count):
+        super().__init__()
+        self.word_count = word_count
+
+    def run(self):
+        try:
+            # Обычные import, а не importlib: так их находит PyInstaller
+            from back_pyd.vram_backend import Vram
+            from app.tabs import config_tab, testing_tab, report_tab, coverage_tab  # noqa: F401
+            self.loaded.emit(Vram(self.word_count))
+        except Exception as e:
+            self.failed.emit(str(e))
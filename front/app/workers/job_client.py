@@ -0,0 +1,112 @@
+# app/workers/job_client.py
+import json
+import itertools
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QAbstractSocket, QTcpSocket
+from app.core import jobs
+from app.utils.constants import AppConstants
+
+
+class JobClient(QObject):
+    """
+    Подключение GUI к серверу заданий (app.server) в цикле событий Qt.
+
+    Пока сервер недоступен, подключение повторяется раз в JOB_SERVER_RETRY_MS, а submit возвращает
+    False — вызывающий выполняет задание сам. К каждому заданию прикладывается контекст
+    (любой объект вызывающего), он возвращается с сигналами об этом задании. Если соединение
+    рвётся, незавершённые задания завершаются состоянием FAILED.
+    """
+    connection_changed = pyqtSignal(bool)
+    # Номер задания, контекст
+    submitted = pyqtSignal(int, object)
+    # Уведомление (params сообщения "job"), контекст
+    job_updated = pyqtSignal(object, object)
+    # Сообщение сервера, контекст
+    rejected = pyqtSignal(str, object)
+
+    def __init__(self, host=AppConstants.JOB_SERVER_HOST, port=AppConstants.JOB_SERVER_PORT, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.ids = itertools.count(1)
+        # Номер запроса -> контекст, номер задания -> контекст
+        self.requests = {}
+        self.jobs = {}
+        self.buffer = b""
+
+        self.socket = QTcpSocket(self)
+        self.socket.connected.connect(self.on_connected)
+        self.socket.disconnected.connect(self.on_disconnected)
+        self.socket.errorOccurred.connect(self.on_error)
+        self.socket.readyRead.connect(self.on_ready_read)
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.setInterval(AppConstants.JOB_SERVER_RETRY_MS)
+        self.retry_timer.timeout.connect(self.connect_to_server)
+        self.connect_to_server()
+
+    def is_connected(self):
+        return self.socket.state() == QAbstractSocket.SocketState.ConnectedState
+
+    def connect_to_server(self):
+        if self.socket.state() == QAbstractSocket.SocketState.UnconnectedState:
+            self.socket.connectToHost(self.host, self.port)
+
+    def close(self):
+        self.retry_timer.stop()
+        self.socket.disconnected.disconnect(self.on_disconnected)
+        self.socket.errorOccurred.disconnect(self.on_error)
+        self.socket.abort()
+
+    def submit(self, name, source, config, context=None):
+        """Ставит задание; False — сервер недоступен."""
+        if not self.is_connected():
+            return False
+        request_id = next(self.ids)
+        self.requests[request_id] = context
+        self.socket.write(jobs.encode(jobs.request(request_id, "submit",
+                                                   {"name": name, "source": source, "config": config})))
+        return True
+
+    def on_connected(self):
+        self.connection_changed.emit(True)
+
+    def on_error(self, error):
+        # Отказ в подключении приходит без disconnected
+        if self.socket.state() == QAbstractSocket.SocketState.UnconnectedState:
+            self.retry_timer.start()
+
+    def on_disconnected(self):
+        self.buffer = b""
+        requests, self.requests = self.requests, {}
+        pending, self.jobs = self.jobs, {}
+        for context in requests.values():
+            self.rejected.emit("Соединение с сервером заданий потеряно", context)
+        for job, context in pending.items():
+            self.job_updated.emit({"job": job, "state": jobs.FAILED,
+                                   "error": "Соединение с сервером заданий потеряно"}, context)
+        self.connection_changed.emit(False)
+        self.retry_timer.start()
+
+    def on_ready_read(self):
+        *lines, self.buffer = (self.buffer + bytes(self.socket.readAll())).split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.handle_message(json.loads(line))
+
+    def handle_message(self, message):
+        if "id" not in message:
+            update = message["params"]
+            context = self.jobs.get(update["job"])
+            if update["state"] in jobs.FINISHED:
+                self.jobs.pop(update["job"], None)
+            self.job_updated.emit(update, context)
+            return
+        context = self.requests.pop(message["id"], None)
+        if "error" in message:
+            self.rejected.emit(message["error"]["message"], context)
+        else:
+            job = message["result"]["job"]
+            self.jobs[job] = context
+            self.submitted.emit(job, context)
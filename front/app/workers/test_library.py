@@ -0,0 +1,86 @@
+# app/workers/test_library.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from app.core.program_cache import ProgramCache, scan_tests
+from app.utils.constants import AppConstants
+
+
+class TestLibrary(QObject):
+    """
+    Список тестов каталога ресурсов с уже скомпилированными программами.
+
+    Каталог и его .kids файлы отслеживаются QFileSystemWatcher: после изменений (с задержкой,
+    чтобы серия сохранений дала одно обновление) список пересобирается, изменённые файлы
+    компилируются в фоне, а вкладки получают новый список сигналом tests_changed.
+    На сетевых дисках уведомления могут не приходить — тогда список обновляет rescan().
+    """
+    # Имя теста -> путь
+    tests_changed = pyqtSignal(object)
+
+    RESCAN_DELAY_MS = 200
+
+    def __init__(self, directory=AppConstants.TEST_FILES_PATH):
+        super().__init__()
+        self.directory = directory
+        self.tests = {}
+        self.programs = ProgramCache()
+        # Один поток: фоновая компиляция не отнимает ядра у прогонов
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kidsvt-compile")
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_rescan)
+        self.watcher.fileChanged.connect(self.schedule_rescan)
+
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(self.RESCAN_DELAY_MS)
+        self.rescan_timer.timeout.connect(self.rescan)
+
+        self.rescan()
+
+    def close(self):
+        self.rescan_timer.stop()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def schedule_rescan(self, *_):
+        self.rescan_timer.start()
+
+    def rescan(self):
+        tests = scan_tests(self.directory) if os.path.isdir(self.directory) else {}
+        self.watch(tests.values())
+        self.programs.retain(tests.values())
+        for path in tests.values():
+            if not self.programs.cached(path):
+                self.executor.submit(self.precompile, path)
+
+        if tests != self.tests:
+            self.tests = tests
+            self.tests_changed.emit(dict(tests))
+
+    def watch(self, paths):
+        # Файл, заменённый редактором (запись во временный + переименование), выпадает
+        # из наблюдения — поэтому список файлов сверяется при каждом обновлении
+        wanted = {os.path.abspath(p) for p in paths}
+        if os.path.isdir(self.directory):
+            wanted.add(os.path.abspath(self.directory))
+        watched = {os.path.abspath(p) for p in self.watcher.files() + self.watcher.directories()}
+        if watched - wanted:
+            self.watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self.watcher.addPaths(list(wanted - watched))
+
+    def precompile(self, path):
+        try:
+            self.programs.get(path)
+        except Exception:
+            # Ошибка запомнена в кэше и будет показана при загрузке теста
+            pass
+
+    def program(self, name):
+        """Скомпилированная программа теста по имени (из кэша, если файл не менялся)."""
+        return self.programs.get(self.tests[name])
+
+    def estimate(self, name, words):
+        """Оценка прогона теста на words словах (см. ProgramCache.estimate)."""
+        return self.programs.estimate(self.tests[name], words)
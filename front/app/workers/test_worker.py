@@ -0,0 +1,302 @@
+# app/workers/test_worker.py
+import os
+import time
+import numpy as np
+from PyQt6.QtCore import QThread, QMutex, QWaitCondition, QMutexLocker, pyqtSignal
+from app.utils.constants import AppConstants
+from app.core.trace import Trace
+from back_pyd.vram_backend import TestRunner
+
+TEST_FAILED = int(TestRunner.StepResult.Type.TEST_FAILED)
+ENDED = int(TestRunner.StepResult.Type.ENDED)
+
+
+class TestWorker(QThread):
+    """
+    Выполняет TestRunner в отдельном потоке. Бэкенд отпускает GIL на время пачки шагов,
+    поэтому GUI не ждёт выполнения. Результаты копятся и отправляются пачками сигналом
+    batch_ready не чаще раза в кадр и только после того, как GUI обработал прошлую (ack).
+
+    Пачка — словарь:
+        events      — число событий в пачке
+        failed      — число событий TEST_FAILED в пачке
+        addrs/types — последнее событие по каждому затронутому адресу
+        last        — (type, addr) самого последнего события или None
+        seek        — пачка начинается с возврата назад (seek): события до него отброшены,
+                      last — последнее событие перед точкой возврата
+        position    — событий с начала прогона (TestRunner.steps())
+        dirty/words — адреса изменившихся слов и их новые значения
+        ended       — тест завершён; тогда errors — detected_errors()
+        stats       — TestRunner.stats() на момент отправки
+        worker_s    — сколько всего поток потратил на обработку событий в Python
+
+    Если задан trace_path, все события пишутся в трассу; после завершения теста поток
+    строит по ней индекс снимков и отправляет готовую Trace сигналом trace_ready.
+    Если событий больше trace_max_events, запись прекращается, файл удаляется
+    и отправляется trace_dropped.
+    """
+    batch_ready = pyqtSignal(object)
+    trace_ready = pyqtSignal(object)
+    trace_dropped = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    EVENT_DTYPE = np.dtype([("type", np.uint8), ("i", np.uint32)])
+
+    def __init__(self, runner, vram, trace_path=None, trace_max_events=None):
+        super().__init__()
+        # Держим Vram живой, пока поток работает с ней
+        self.runner = runner
+        self.vram = vram
+        self.vram_words = vram.raw_view()
+        self.trace_path = trace_path
+        self.trace_max_events = trace_max_events
+        if trace_path:
+            runner.start_trace(trace_path)
+
+        self._mutex = QMutex()
+        self._wake = QWaitCondition()
+        self._paused = True
+        self._stopped = False
+        self._steps = 0
+        # Шаг, к которому нужно вернуться (TestRunner.seek), или None
+        self._seek_to = None
+        # 0 — турбо (без пауз), иначе пауза между событиями, мс
+        self._interval_ms = 0
+        self._awaiting_ack = False
+        # Включены ли счётчики TestRunner.enable_stats (желаемое и применённое состояние)
+        self._profiling = False
+        self._profiling_applied = False
+        self._worker_seconds = 0.0
+
+        self._reset_batch()
+
+    # --- Команды из GUI (мгновенные: только меняют флаги и будят поток) ---
+
+    def play(self, interval_ms):
+        with QMutexLocker(self._mutex):
+            self._paused = False
+            self._steps = 0
+            self._interval_ms = interval_ms
+            self._wake.wakeAll()
+
+    def set_interval(self, interval_ms):
+        with QMutexLocker(self._mutex):
+            self._interval_ms = interval_ms
+            self._wake.wakeAll()
+
+    def pause(self):
+        with QMutexLocker(self._mutex):
+            self._paused = True
+            self._wake.wakeAll()
+
+    def step(self):
+        """Один шаг; во время автовыполнения ничего не делает."""
+        with QMutexLocker(self._mutex):
+            if not self._paused:
+                return
+            self._steps += 1
+            self._wake.wakeAll()
+
+    def seek(self, step):
+        """Ставит на паузу и возвращает прогон к состоянию после step событий."""
+        with QMutexLocker(self._mutex):
+            self._paused = True
+            self._steps = 0
+            self._seek_to = step
+            self._wake.wakeAll()
+
+    def stop(self):
+        with QMutexLocker(self._mutex):
+            self._stopped = True
+            self._wake.wakeAll()
+        self.wait()
+
+    def ack(self):
+        """GUI обработал пачку: можно отправлять следующую."""
+        with QMutexLocker(self._mutex):
+            self._awaiting_ack = False
+            self._wake.wakeAll()
+
+    def set_profiling(self, enabled):
+        """Счётчики включаются самим потоком перед следующей пачкой шагов."""
+        with QMutexLocker(self._mutex):
+            self._profiling = enabled
+            self._wake.wakeAll()
+
+    def is_playing(self):
+        with QMutexLocker(self._mutex):
+            return not self._paused
+
+    # --- Поток ---
+
+    def run(self):
+        frame_s = AppConstants.UI_FRAME_MS / 1000
+        last_emit = 0.0
+        try:
+            while True:
+                self._mutex.lock()
+                while (not self._stopped and self._paused and self._steps == 0
+                       and self._seek_to is None and not self._flush_due()):
+                    self._wake.wait(self._mutex)
+                if self._stopped:
+                    self._mutex.unlock()
+                    return
+                seek_to, self._seek_to = self._seek_to, None
+                single = self._steps > 0
+                if single:
+                    self._steps -= 1
+                paused = self._paused
+                turbo = not paused and self._interval_ms == 0
+                interval_ms = self._interval_ms
+                profiling = self._profiling
+                self._mutex.unlock()
+
+                if profiling != self._profiling_applied:
+                    self.runner.enable_stats(profiling)
+                    self._profiling_applied = profiling
+
+                if seek_to is not None:
+                    self._seek(seek_to)
+                    last_emit = self._emit_if_ready(last_emit, force=True)
+                    continue
+
+                if paused and not single:
+                    # Пауза, но осталась неотправленная пачка
+                    last_emit = self._emit_if_ready(last_emit, force=True)
+                    continue
+
+                events = self.runner.run(AppConstants.TURBO_STEPS_PER_TICK if turbo else 1)
+                started = time.perf_counter()
+                self._accumulate(events)
+                self._worker_seconds += time.perf_counter() - started
+                if (self.trace_path and self.trace_max_events is not None
+                        and self.runner.steps() > self.trace_max_events):
+                    self._drop_trace()
+
+                if self._batch_ended:
+                    self._batch_errors = self.runner.detected_errors()
+                    with QMutexLocker(self._mutex):
+                        self._paused = True
+                    self._emit()
+                    if self.trace_path:
+                        self.runner.stop_trace()
+                        trace = Trace(self.trace_path)
+                        trace.build_index(lambda: self._stopped)
+                        if not self._stopped:
+                            self.trace_ready.emit(trace)
+                    return
+
+                last_emit = self._emit_if_ready(last_emit, force=not turbo, frame_s=frame_s)
+
+                if not turbo and not single:
+                    # Темп «оп/мин»: ждём, но просыпаемся сразу по любой команде
+                    deadline = time.monotonic() + interval_ms / 1000
+                    with QMutexLocker(self._mutex):
+                        while (not self._paused and not self._stopped
+                               and self._interval_ms == interval_ms):
+                            remaining_ms = int((deadline - time.monotonic()) * 1000)
+                            if remaining_ms <= 0:
+                                break
+                            self._wake.wait(self._mutex, remaining_ms)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def _drop_trace(self):
+        self.runner.stop_trace()
+        try:
+            os.remove(self.trace_path)
+        except OSError:
+            pass
+        self.trace_path = None
+        self.trace_dropped.emit()
+
+    def _flush_due(self):
+        return (self._batch_events > 0 or self._batch_seek) and not self._awaiting_ack
+
+    def _seek(self, step):
+        # Неотправленные события относятся к отменённой части прогона; грязные адреса остаются:
+        # их значения GUI ещё не получил
+        self.runner.seek(step)
+        self._batch_events = 0
+        self._batch_failed = 0
+        self._batch_chunks = []
+        self._batch_seek = True
+        last = self.runner.last_result()
+        self._batch_last = (int(last.type), int(last.i)) if last is not None else None
+        dirty = self.vram.take_dirty()
+        if len(dirty) > 0:
+            self._batch_dirty.append(dirty)
+
+    def _reset_batch(self):
+        self._batch_events = 0
+        self._batch_failed = 0
+        self._batch_last = None
+        # Сырые пачки событий и грязных адресов; сжимаются при отправке или при переполнении
+        self._batch_chunks = []
+        self._batch_dirty = []
+        self._batch_pending = 0
+        self._batch_ended = False
+        self._batch_errors = None
+        self._batch_seek = False
+
+    def _accumulate(self, events):
+        types = events["type"]
+        if len(types) > 0 and types[-1] == ENDED:
+            self._batch_ended = True
+            events, types = events[:-1], types[:-1]
+        if len(events) > 0:
+            self._batch_events += len(events)
+            self._batch_failed += int(np.count_nonzero(types == TEST_FAILED))
+            self._batch_last = (int(types[-1]), int(events["i"][-1]))
+            self._batch_chunks.append(events)
+        dirty = self.vram.take_dirty()
+        if len(dirty) > 0:
+            self._batch_dirty.append(dirty)
+        self._batch_pending += len(events) + len(dirty)
+        if self._batch_pending > AppConstants.WORKER_BATCH_COMPACT_EVENTS:
+            self._compact()
+
+    def _compact(self):
+        """Оставляет последнее событие по каждому адресу и уникальные грязные адреса."""
+        if self._batch_chunks:
+            events = np.concatenate(self._batch_chunks)
+            addrs, last_idx = np.unique(events["i"][::-1], return_index=True)
+            self._batch_chunks = [events[::-1][last_idx]]
+        if self._batch_dirty:
+            self._batch_dirty = [np.unique(np.concatenate(self._batch_dirty))]
+        self._batch_pending = sum(map(len, self._batch_chunks)) + sum(map(len, self._batch_dirty))
+
+    def _emit_if_ready(self, last_emit, force=False, frame_s=0.0):
+        now = time.monotonic()
+        if not force and now - last_emit < frame_s:
+            return last_emit
+        with QMutexLocker(self._mutex):
+            if self._awaiting_ack or (self._batch_events == 0 and not self._batch_seek):
+                return last_emit
+        self._emit()
+        return now
+
+    def _emit(self):
+        self._compact()
+        last_events = self._batch_chunks[0] if self._batch_chunks else np.zeros(0, dtype=self.EVENT_DTYPE)
+        dirty = self._batch_dirty[0] if self._batch_dirty else np.zeros(0, dtype=np.uint32)
+        batch = {
+            "events": self._batch_events,
+            "failed": self._batch_failed,
+            "addrs": last_events["i"],
+            "types": last_events["type"],
+            "last": self._batch_last,
+            "seek": self._batch_seek,
+            "position": self.runner.steps(),
+            "dirty": dirty,
+            # Копия: GUI читает значения, пока поток уже пишет дальше
+            "words": self.vram_words[dirty],
+            "ended": self._batch_ended,
+            "errors": self._batch_errors,
+            "stats": self.runner.stats(),
+            "worker_s": self._worker_seconds,
+        }
+        with QMutexLocker(self._mutex):
+            self._awaiting_ack = True
+        self._reset_batch()
+        self.batch_ready.emit(batch)
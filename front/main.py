@@ -1,20 +1,45 @@
+import time
+# Отсчёт времени запуска — до тяжёлых импортов
+STARTED = time.perf_counter()
+
 import sys
 import os
+import json
 import ctypes 
-from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget
+import multiprocessing
+from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, QMessageBox
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QEvent, QTimer
 from app.utils.constants import AppConstants
-from app.tabs.config_tab import ConfigTab
-from app.tabs.testing_tab import TestingTab
-from app.tabs.report_tab import ReportTab
+from app.workers.backend_loader import BackendLoader
 
-from back_pyd.vram_backend import Vram
+# Вкладки (ключ, заголовок) — создаются при первом открытии
+TABS = (
+    ("config", "Конфигурация"),
+    ("testing", "Тестирование"),
+    ("report", "Результаты"),
+    ("coverage", "Покрытие"),
+)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, exit_when_ready=False):
         super().__init__()
         
-        self.vram = Vram(AppConstants.DEFAULT_WORD_COUNT)
+        # Создаётся в фоне BackendLoader; до этого вкладки не строятся
+        self.vram = None
+        # Общий для вкладок список тестов (TestLibrary)
+        self.library = None
+        # Подключение к серверу заданий (JobClient); работа идёт и без сервера
+        self.job_client = None
+        self.config_tab = None
+        self.testing_tab = None
+        self.report_tab = None
+        self.coverage_tab = None
+        # Время от старта процесса до первой отрисовки окна и до готовности к работе, с
+        self.first_paint_s = None
+        self.interactive_s = None
+        # Для замеров: напечатать времена запуска и выйти
+        self.exit_when_ready = exit_when_ready
 
         self.setWindowTitle(AppConstants.WINDOW_TITLE)
         self.resize(AppConstants.WINDOW_WIDTH, AppConstants.WINDOW_HEIGHT)
@@ -23,6 +48,7 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.tabs)
         
         self.setup_tabs()
+        self.tabs.installEventFilter(self)
         
         self.setStyleSheet("""
             QGroupBox {
@@ -38,18 +64,118 @@ class MainWindow(QMainWindow):
             }
         """)
 
+        self.loader = BackendLoader(AppConstants.DEFAULT_WORD_COUNT)
+        self.loader.loaded.connect(self.on_backend_loaded)
+        self.loader.failed.connect(self.on_backend_failed)
+        self.loader.start()
+
     def setup_tabs(self):
-        self.report_tab = ReportTab()
-        self.config_tab = ConfigTab(self.vram)
-        self.testing_tab = TestingTab(self.vram, self.report_tab)
-        
-        self.config_tab.vram_changed.connect(self.testing_tab.set_new_vram)
-        
-        self.tabs.addTab(self.config_tab, "Конфигурация")
-        self.tabs.addTab(self.testing_tab, "Тестирование")
-        self.tabs.addTab(self.report_tab, "Результаты")
+        """Пустые страницы-заглушки; содержимое создаёт ensure_tab при первом открытии."""
+        self.pages = {}
+        for key, title in TABS:
+            page = QWidget()
+            layout = QVBoxLayout(page)
+            layout.setContentsMargins(0, 0, 0, 0)
+            label = QLabel("Загрузка...")
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            layout.addWidget(label)
+            self.pages[key] = page
+            self.tabs.addTab(page, title)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+    def ensure_tab(self, key):
+        """Создаёт вкладку (и вкладки, от которых она зависит), если её ещё нет."""
+        tab = getattr(self, f"{key}_tab")
+        if tab is not None:
+            return tab
+
+        if key == "config":
+            from app.tabs.config_tab import ConfigTab
+            tab = ConfigTab(self.vram)
+            tab.vram_changed.connect(self.on_vram_changed)
+        elif key == "testing":
+            from app.tabs.testing_tab import TestingTab
+            tab = TestingTab(self.vram, self.ensure_tab("report"), self.library, self.job_client)
+            tab.memory_changed.connect(self.on_memory_changed)
+        elif key == "report":
+            from app.tabs.report_tab import ReportTab
+            tab = ReportTab()
+        else:
+            from app.tabs.coverage_tab import CoverageTab
+            tab = CoverageTab(self.library)
+        setattr(self, f"{key}_tab", tab)
+
+        layout = self.pages[key].layout()
+        layout.itemAt(0).widget().deleteLater()
+        layout.addWidget(tab)
+        return tab
+
+    def on_tab_changed(self, index):
+        if self.vram is not None:
+            self.ensure_tab(TABS[index][0])
+
+    def on_backend_loaded(self, vram):
+        from app.workers.test_library import TestLibrary
+        from app.workers.job_client import JobClient
+        self.vram = vram
+        self.library = TestLibrary()
+        self.job_client = JobClient(parent=self)
+        self.ensure_tab(TABS[self.tabs.currentIndex()][0])
+        # Готовность — когда цикл событий обработал всё, что накопилось при создании вкладки
+        QTimer.singleShot(0, self.on_interactive)
+
+    def on_backend_failed(self, message):
+        for page in self.pages.values():
+            page.layout().itemAt(0).widget().setText(f"Не удалось загрузить бэкенд: {message}")
+        QMessageBox.critical(self, "Ошибка загрузки", message)
+
+    def on_interactive(self):
+        self.interactive_s = time.perf_counter() - STARTED
+        self.report_startup()
+
+    def eventFilter(self, obj, event):
+        if obj is self.tabs and event.type() == QEvent.Type.Paint and self.first_paint_s is None:
+            self.first_paint_s = time.perf_counter() - STARTED
+            self.report_startup()
+        return super().eventFilter(obj, event)
+
+    def report_startup(self):
+        if self.first_paint_s is None or self.interactive_s is None:
+            return
+        self.statusBar().showMessage(
+            f"Запуск: окно {self.first_paint_s * 1000:.0f} мс, готово {self.interactive_s * 1000:.0f} мс", 10000)
+        if self.exit_when_ready:
+            print(json.dumps({"first_paint_s": self.first_paint_s, "interactive_s": self.interactive_s}))
+            self.close()
+
+    # Связи между вкладками идут через окно: другая вкладка может быть ещё не создана
+
+    def on_vram_changed(self, vram, size):
+        self.vram = vram
+        if self.testing_tab is not None:
+            self.testing_tab.set_new_vram(vram, size)
+
+    def on_memory_changed(self, addrs):
+        if self.config_tab is not None:
+            self.config_tab.mark_rows_stale(addrs)
+
+    def closeEvent(self, event):
+        self.loader.wait()
+        if self.library is not None:
+            self.library.close()
+        if self.job_client is not None:
+            self.job_client.close()
+        if self.coverage_tab is not None:
+            self.coverage_tab.stop_campaign()
+        if self.testing_tab is not None:
+            self.testing_tab.stop_worker()
+            self.testing_tab.close_trace()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
+    # Пул процессов кампании покрытия в сборке PyInstaller
+    multiprocessing.freeze_support()
+
     if os.name == 'nt':
 
         myappid = 'mycompany.kidsvt.ramsim.1.0' 
@@ -66,6 +192,7 @@ if __name__ == "__main__":
         app_icon = QIcon(AppConstants.ICON_PATH)
         app.setWindowIcon(app_icon)
 
-    window = MainWindow()
+    # --startup-time: напечатать JSON с временами запуска и выйти (см. app.bench)
+    window = MainWindow(exit_when_ready="--startup-time" in sys.argv)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,25 @@
+# tests/conftest.py
+"""
+Тесты бэкенда (back_pyd.vram_backend) и app.core. Нужен собранный модуль back_pyd;
+PyQt6 не нужен. Запуск из front/:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+FRONT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RES_DIR = os.path.join(FRONT_DIR, "res")
+
+# Импорты app.* и back_pyd.* — как при запуске из front/
+if FRONT_DIR not in sys.path:
+    sys.path.insert(0, FRONT_DIR)
+
+
+def res_path(name):
+    return os.path.join(RES_DIR, name)
+
+
+# Класс бэкенда называется Test*, но тестом не является
+from back_pyd.vram_backend import TestRunner
+TestRunner.__test__ = False
@@ -0,0 +1,96 @@
+# tests/test_checkpoints.py
+"""Контрольные точки TestRunner: seek против нового прогона до того же шага."""
+import random
+import numpy as np
+import pytest
+from conftest import res_path
+from app.core.trace import Trace
+from back_pyd.vram_backend import Vram, TestRunner
+
+WORDS = 64
+# Неисправности с побочными эффектами чтения: после seek их последствия тоже должны откатиться
+FAULTS = [(3, 0, Vram.ErrType.WRITE_OR_READ_DESTRUCTIVE_0), (17, 5, Vram.ErrType.DECEPTIVE_READ_1),
+          (40, 7, Vram.ErrType.STUCK_AT_1), (63, 2, Vram.ErrType.TRANSITION_1_TO_0)]
+
+
+def new_runner(program, word_bits):
+    vram = Vram(WORDS, word_bits)
+    for addr, bit, err_type in FAULTS:
+        vram.set_error(addr, bit, err_type)
+    return vram, TestRunner(vram, program)
+
+
+def state(vram, runner):
+    last = runner.last_result()
+    return (vram.raw_view().tolist(), list(runner.event_counts()), runner.detected_errors(),
+            runner.steps(), None if last is None else (last.type, last.i))
+
+
+def reference(program, word_bits, step):
+    vram, runner = new_runner(program, word_bits)
+    runner.run(step)
+    return state(vram, runner)
+
+
+@pytest.mark.parametrize("word_bits", [8, 16, 64])
+@pytest.mark.parametrize("budget", [1 << 20, 1 << 10])
+def test_seek_matches_rerun(word_bits, budget):
+    program = TestRunner.compile(res_path("march_x.kids"))
+    vram, runner = new_runner(program, word_bits)
+    # Малый бюджет: точки прореживаются, а интервал между ними растёт
+    runner.enable_checkpoints(16, budget)
+    runner.finish()
+    if budget < 1 << 20:
+        assert runner.checkpoints()["every"] > 16
+    total = runner.steps()
+    final = state(vram, runner)
+
+    rng = random.Random(word_bits)
+    # seek только назад: точки после цели отбрасываются
+    for step in sorted({0, 1, total // 2, total - 1, total, *rng.sample(range(total), 20)}, reverse=True):
+        runner.seek(step)
+        assert state(vram, runner) == reference(program, word_bits, step)
+
+    # С точки возврата прогон продолжается как обычно
+    runner.finish()
+    assert state(vram, runner) == final
+    runner.seek(total // 3)
+    runner.finish()
+    assert state(vram, runner) == final
+    with pytest.raises(IndexError):
+        runner.seek(total + 1)
+
+
+def test_seek_cuts_trace(tmp_path):
+    program = TestRunner.compile(res_path("march_x.kids"))
+    vram, runner = new_runner(program, 16)
+    runner.enable_checkpoints(32)
+    runner.start_trace(str(tmp_path / "seek.trace"))
+    runner.run(500)
+    runner.seek(123)
+    runner.finish()
+    runner.stop_trace()
+
+    ref_vram, ref_runner = new_runner(program, 16)
+    ref_runner.start_trace(str(tmp_path / "ref.trace"))
+    ref_runner.finish()
+    ref_runner.stop_trace()
+
+    trace, ref = Trace(str(tmp_path / "seek.trace")), Trace(str(tmp_path / "ref.trace"))
+    assert len(trace) == len(ref) == runner.steps()
+    assert np.array_equal(trace.records, ref.records)
+    trace.close()
+    ref.close()
+
+
+def test_seek_marks_restored_words_dirty():
+    program = TestRunner.compile(res_path("march_x.kids"))
+    vram, runner = new_runner(program, 16)
+    runner.enable_checkpoints(16)
+    runner.finish()
+    before = vram.raw_view().copy()
+    vram.take_dirty()
+    runner.seek(runner.steps() // 2)
+    changed = np.flatnonzero(vram.raw_view() != before)
+    assert len(changed) > 0
+    assert set(changed.tolist()) <= set(vram.take_dirty().tolist())
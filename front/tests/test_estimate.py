@@ -0,0 +1,67 @@
+# tests/test_estimate.py
+"""Program.estimate против настоящих прогонов."""
+import pytest
+from conftest import res_path
+from back_pyd.vram_backend import Vram, TestRunner
+
+SIZES = [1, 2, 3, 16, 100, 257]
+
+
+def actual(program, words, faults=()):
+    vram = Vram(words)
+    for addr, bit, err_type in faults:
+        vram.set_error(addr, bit, err_type)
+    runner = TestRunner(vram, program)
+    runner.enable_stats()
+    runner.finish()
+    return runner.stats()
+
+
+def check_exact(program, words):
+    estimate = program.estimate(words)
+    stats = actual(program, words)
+    events = stats["events"]
+    assert estimate["exact"]
+    assert estimate["writes"] == events["WRITE"] == stats["writes"]
+    assert estimate["asserts"] == events["TEST_SUCCEEDED"] + events["TEST_FAILED"]
+    assert estimate["reads"] == stats["reads"]
+    assert estimate["steps"] == stats["instructions"]
+
+
+@pytest.mark.parametrize("words", SIZES)
+@pytest.mark.parametrize("test", ["march_x.kids", "test.kids"])
+def test_res_programs(test, words):
+    check_exact(TestRunner.compile(res_path(test)), words)
+
+
+@pytest.mark.parametrize("words", SIZES)
+@pytest.mark.parametrize("source", [
+    "0 loop 1 cur write drop asc asc endloop",
+    "3 loop 0 read drop desc endloop",
+    "0 loop 0 loop 0 write asc endloop asc endloop",
+])
+def test_loops(source, words):
+    check_exact(TestRunner.compile_source(source), words)
+
+
+@pytest.mark.parametrize("words", SIZES)
+def test_then_is_an_upper_bound(words):
+    # Каждое второе слово с неисправностью: часть блоков then не выполняется
+    program = TestRunner.compile_source("0 loop 0 write 0 read then "
+                                        "0 read 0 equal? assert! endthen asc endloop")
+    faults = [(addr, 0, Vram.ErrType.STUCK_AT_1) for addr in range(0, words, 2)]
+    estimate = program.estimate(words)
+    stats = actual(program, words, faults)
+    assert not estimate["exact"]
+    assert estimate["reads"] >= stats["reads"]
+    assert estimate["asserts"] >= stats["events"]["TEST_SUCCEEDED"] + stats["events"]["TEST_FAILED"]
+    assert estimate["steps"] >= stats["instructions"]
+
+
+@pytest.mark.parametrize("source", [
+    "0 loop 5 i= asc endloop",
+    "1 loop endloop",
+    "0 read loop asc endloop",
+])
+def test_unpredictable_loops(source):
+    assert TestRunner.compile_source(source).estimate(16) is None
@@ -0,0 +1,59 @@
+# tests/test_fault_sim.py
+"""Бит-параллельная симуляция (FaultSim) против прогонов с одной неисправностью (campaign.detects)."""
+import numpy as np
+import pytest
+from conftest import res_path
+from app.core.campaign import detects, run_chunk
+from back_pyd.vram_backend import Vram, TestRunner, FaultSim
+
+WORDS = 6
+WORD_WIDTHS = (8, 16, 32, 64)
+FAULT_TYPES = [name for name in Vram.ErrType.__members__ if name != "NO"]
+# Ветвление по прочитанному значению: ход программы зависит от части неисправностей
+BRANCHING = "0 loop 0 write 0 read then 0 read 0 equal? assert! endthen 0 read 0 equal? assert! asc endloop"
+
+
+def lanes_of(mask, count):
+    return [bool(mask >> lane & 1) for lane in range(count)]
+
+
+@pytest.mark.parametrize("word_bits", WORD_WIDTHS)
+@pytest.mark.parametrize("type_name", FAULT_TYPES)
+@pytest.mark.parametrize("test", ["march_x.kids", "test.kids"])
+def test_matches_serial_runs(test, type_name, word_bits):
+    program = TestRunner.compile(res_path(test))
+    err_type = Vram.ErrType.__members__[type_name]
+    faults = [(addr, bit) for addr in range(WORDS) for bit in range(word_bits)]
+    sim = FaultSim(program, WORDS, word_bits)
+    for first in range(0, len(faults), FaultSim.lanes):
+        group = faults[first:first + FaultSim.lanes]
+        mask = sim.run(err_type, [a for a, _ in group], [b for _, b in group])
+        # В march-тестах ход программы от данных не зависит
+        assert mask is not None
+        assert lanes_of(mask, len(group)) == [detects(program, WORDS, word_bits, err_type, a, b)
+                                              for a, b in group]
+
+
+@pytest.mark.parametrize("word_bits", WORD_WIDTHS)
+@pytest.mark.parametrize("type_name", FAULT_TYPES)
+def test_divergent_control_flow(tmp_path, type_name, word_bits):
+    path = tmp_path / "branching.kids"
+    path.write_text(BRANCHING, encoding="utf-8")
+    program = TestRunner.compile(str(path))
+    err_type = Vram.ErrType.__members__[type_name]
+    sim = FaultSim(program, WORDS, word_bits)
+    addrs = np.repeat(np.arange(WORDS, dtype=np.uint32), word_bits)[:FaultSim.lanes]
+    bits = np.tile(np.arange(word_bits, dtype=np.uint8), WORDS)[:FaultSim.lanes]
+    mask = sim.run(err_type, addrs, bits)
+    # None — только если ход программы действительно расходится; иначе маска верна
+    if mask is not None:
+        assert lanes_of(mask, len(addrs)) == [detects(program, WORDS, word_bits, err_type, int(a), int(b))
+                                              for a, b in zip(addrs, bits)]
+    # Кампания с запасным последовательным путём даёт тот же результат
+    assert np.array_equal(run_chunk(str(path), WORDS, word_bits, type_name, 0, WORDS, bit_parallel=True),
+                          run_chunk(str(path), WORDS, word_bits, type_name, 0, WORDS, bit_parallel=False))
+
+
+def test_rejects_unsupported_width():
+    with pytest.raises(ValueError):
+        FaultSim(TestRunner.compile(res_path("march_x.kids")), WORDS, 12)
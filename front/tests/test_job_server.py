@@ -0,0 +1,151 @@
+# tests/test_job_server.py
+"""Сервер заданий (app.server) на свободном порту localhost, клиент — JobConnection."""
+import asyncio
+import threading
+import time
+import pytest
+from conftest import res_path
+from app.core import jobs
+from app.core.jobs import JobConnection, JobError
+from app.server import JobServer
+from app.utils.constants import AppConstants
+
+HOST = "127.0.0.1"
+CONFIG = {"ram_size_words": 16, "faults": [{"addr": 3, "bit": 0, "type": "STUCK_AT_1"}]}
+# Около полусекунды на 2048 словах: пока оно идёт, единственный процесс пула занят
+SLOW_SOURCE = "0 loop\n    0 loop\n        0 write\n    asc endloop\nasc endloop\n"
+SLOW_CONFIG = {"ram_size_words": 2048}
+
+
+@pytest.fixture
+def server():
+    """JobServer с одним процессом пула в цикле asyncio отдельного потока; отдаёт (сервер, порт)."""
+    loop = asyncio.new_event_loop()
+    job_server = JobServer(workers=1)
+    # Пул создаётся заранее: процесс, запущенный fork после подключения клиента этого же
+    # процесса тестов, унаследовал бы его сокет, и отключение клиента сервер бы не увидел
+    job_server.executor.submit(int).result()
+    listener = loop.run_until_complete(job_server.start(HOST, 0))
+    port = listener.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield job_server, port
+    # Клиенты к этому времени закрыты: обработчики соединений дочитывают до конца потока
+    asyncio.run_coroutine_threadsafe(wait_handlers(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    listener.close()
+    job_server.close()
+    loop.close()
+
+
+async def wait_handlers():
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    if tasks:
+        await asyncio.wait(tasks, timeout=10)
+
+
+def connect(port):
+    return JobConnection(HOST, port, timeout=30)
+
+
+def read_source(name):
+    with open(res_path(name), encoding="utf-8") as f:
+        return f.read()
+
+
+def wait_finished(conn, job_id):
+    """Уведомления о задании job_id до завершения."""
+    states = []
+    for update in conn.updates():
+        if update["job"] != job_id:
+            continue
+        states.append(update["state"])
+        if update["state"] in jobs.FINISHED:
+            return states, update
+
+
+def test_submit_notifies_running_then_done(server):
+    _, port = server
+    with connect(port) as conn:
+        reply = conn.submit("march_x", read_source("march_x.kids"), CONFIG)
+        assert reply == {"job": reply["job"], "queued": 0}
+        states, update = wait_finished(conn, reply["job"])
+
+        assert states == [jobs.RUNNING, jobs.DONE]
+        assert update["name"] == "march_x"
+        result = update["result"]
+        assert result["test"] == "march_x"
+        assert result["ram_size_words"] == 16
+        # STUCK_AT_1 в бите 0 слова 3 march_x находит
+        assert result["status"] == "failed"
+        assert conn.call("status", job=reply["job"])["state"] == jobs.DONE
+
+
+def test_rejects_program_that_does_not_compile(server):
+    _, port = server
+    with connect(port) as conn:
+        with pytest.raises(JobError) as e:
+            conn.submit("bad", "0 loop\n    w0 garbage(\n", CONFIG)
+        assert e.value.code == jobs.JOB_REJECTED
+        assert conn.call("stats")["queued"] == 0
+
+
+@pytest.mark.parametrize("words", [0, -1, AppConstants.MAX_WORD_COUNT + 1, "16", 16.0])
+def test_rejects_bad_ram_size(server, words):
+    _, port = server
+    with connect(port) as conn:
+        with pytest.raises(JobError) as e:
+            conn.submit("march_x", read_source("march_x.kids"), {"ram_size_words": words})
+        assert e.value.code == jobs.JOB_REJECTED
+
+
+def test_bool_is_not_a_job_id(server):
+    _, port = server
+    with connect(port) as conn:
+        job_id = conn.submit("march_x", read_source("march_x.kids"), CONFIG)["job"]
+        # True == 1 в Python, но номером задания не считается
+        assert job_id == 1
+        for method in ("status", "cancel"):
+            with pytest.raises(JobError) as e:
+                conn.call(method, job=True)
+            assert e.value.code == jobs.INVALID_PARAMS
+
+
+def test_cannot_cancel_other_clients_job(server):
+    _, port = server
+    with connect(port) as owner, connect(port) as other:
+        busy = owner.submit("slow", SLOW_SOURCE, SLOW_CONFIG)["job"]
+        queued = owner.submit("march_x", read_source("march_x.kids"), CONFIG)
+        assert queued["queued"] == 0
+        with pytest.raises(JobError) as e:
+            other.call("cancel", job=queued["job"])
+        assert e.value.code == jobs.INVALID_PARAMS
+        assert other.call("status", job=queued["job"])["state"] == jobs.QUEUED
+
+        # Владелец снимает своё задание из очереди, а начатое — уже нет
+        assert owner.call("cancel", job=queued["job"]) == {"cancelled": True}
+        assert owner.call("cancel", job=busy) == {"cancelled": False}
+        states, _ = wait_finished(owner, queued["job"])
+        assert states == [jobs.CANCELLED]
+        assert wait_finished(owner, busy)[0][-1] == jobs.DONE
+
+
+def test_disconnect_cancels_queued_jobs(server):
+    job_server, port = server
+    with connect(port) as watcher:
+        with connect(port) as owner:
+            busy = owner.submit("slow", SLOW_SOURCE, SLOW_CONFIG)["job"]
+            queued = [owner.submit("march_x", read_source("march_x.kids"), CONFIG)["job"] for _ in range(3)]
+
+        deadline = time.monotonic() + 10
+        while watcher.call("status", job=queued[-1])["state"] != jobs.CANCELLED:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert [watcher.call("status", job=j)["state"] for j in queued] == [jobs.CANCELLED] * 3
+        assert not job_server.queue
+        # Начатое задание отключение клиента не прерывает
+        while watcher.call("status", job=busy)["state"] == jobs.RUNNING:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert watcher.call("status", job=busy)["state"] == jobs.DONE
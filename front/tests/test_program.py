@@ -0,0 +1,69 @@
+# tests/test_program.py
+"""Компиляция .kids в байткод (Program) и выполнение скомпилированных программ."""
+import pytest
+from conftest import res_path
+from app.core.runner import summarize_events
+from back_pyd.vram_backend import Vram, TestRunner
+
+
+def run(source, words=16, word_bits=16):
+    vram = Vram(words, word_bits)
+    runner = TestRunner(vram, TestRunner.compile_source(source))
+    runner.finish()
+    return runner
+
+
+@pytest.mark.parametrize("source", [
+    "0 frobnicate",
+    "0 loop asc",
+    "asc endloop",
+    "0 then",
+    "endthen",
+])
+def test_invalid_programs_fail_to_compile(source):
+    with pytest.raises(RuntimeError):
+        TestRunner.compile_source(source)
+
+
+def test_compile_file_matches_compile_source():
+    with open(res_path("march_x.kids"), encoding="utf-8") as f:
+        source = f.read()
+    assert len(TestRunner.compile(res_path("march_x.kids"))) == len(TestRunner.compile_source(source))
+
+
+@pytest.mark.parametrize("words", [2, 16, 100])
+def test_march_x_on_clean_ram(words):
+    runner = TestRunner(Vram(words), TestRunner.compile(res_path("march_x.kids")))
+    runner.finish()
+    assert summarize_events(runner.event_counts()) == {"writes": 3 * words, "reads_ok": 4 * words,
+                                                       "reads_failed": 0}
+    assert runner.detected_errors() == []
+
+
+@pytest.mark.parametrize("err_type", [Vram.ErrType.STUCK_AT_0, Vram.ErrType.STUCK_AT_1,
+                                      Vram.ErrType.TRANSITION_0_TO_1, Vram.ErrType.TRANSITION_1_TO_0])
+def test_march_x_detects_single_faults(err_type):
+    vram = Vram(16)
+    vram.set_error(5, 3, err_type)
+    runner = TestRunner(vram, TestRunner.compile(res_path("march_x.kids")))
+    runner.finish()
+    assert set(runner.detected_errors()) == {5}
+
+
+def test_comparisons_and_or():
+    # greater? и less? сравнивают вершину стека с элементом под ней
+    runner = run("1 2 greater? assert! 2 1 less? assert! 0 1 or assert! 1 2 less? not assert!")
+    assert summarize_events(runner.event_counts()) == {"writes": 0, "reads_ok": 4, "reads_failed": 0}
+
+
+def test_then_skips_block_on_zero():
+    runner = run("0 then 0 assert! endthen 1 then 1 assert! endthen")
+    assert summarize_events(runner.event_counts()) == {"writes": 0, "reads_ok": 1, "reads_failed": 0}
+
+
+def test_words_are_masked_to_width():
+    # Стек тоже обрезается до ширины слова: "0 not" — это 0xFF и в памяти, и на стеке
+    # (константы шестнадцатеричные и начинаются с цифры: 0ff)
+    runner = run("0 not 0ff equal? assert! 0 loop 0 not write 0ff read equal? assert! asc endloop",
+                 words=4, word_bits=8)
+    assert summarize_events(runner.event_counts()) == {"writes": 4, "reads_ok": 5, "reads_failed": 0}
@@ -0,0 +1,125 @@
+# tests/test_result_cache.py
+"""ResultCache: ключ меняется вместе со всем, от чего зависит результат прогона; вытеснение по LRU."""
+import os
+import pytest
+from app.core import result_cache
+from app.core.result_cache import ResultCache
+
+CONFIG = {"ram_size_words": 64, "word_bits": 8,
+          "faults": [{"addr": 3, "bit": 0, "type": "STUCK_AT_1"}, {"addr": 7, "bit": 5, "type": "STUCK_AT_0"}]}
+RESULT = {"test": "t", "status": "failed", "errors": [[3, 1]]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite"), max_bytes=1 << 30)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def program(tmp_path):
+    path = tmp_path / "t.kids"
+    path.write_text("0 loop\n    0 write\nasc endloop\n")
+    return str(path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Время последнего обращения — по счётчику, чтобы порядок LRU не зависел от разрешения часов."""
+    ticks = iter(range(1, 1 << 20))
+    monkeypatch.setattr(result_cache.time, "time", lambda: float(next(ticks)))
+
+
+def with_faults(*faults):
+    return dict(CONFIG, faults=[{"addr": a, "bit": b, "type": t} for a, b, t in faults])
+
+
+def test_key_is_stable(cache, program):
+    assert cache.key(program, CONFIG) == cache.key(program, dict(CONFIG))
+    # Порядок неисправностей и назначения NO на ключ не влияют
+    same = with_faults((7, 5, "STUCK_AT_0"), (1, 1, "NO"), (3, 0, "STUCK_AT_1"))
+    assert cache.key(program, same) == cache.key(program, CONFIG)
+
+
+def test_key_follows_file_content(cache, program):
+    key = cache.key(program, CONFIG)
+    with open(program, "a") as f:
+        f.write("0 loop\n    0 not write\nasc endloop\n")
+    assert cache.key(program, CONFIG) != key
+
+    # Тот же текст в другом файле — тот же ключ
+    copy = os.path.join(os.path.dirname(program), "copy.kids")
+    with open(program) as src, open(copy, "w") as dst:
+        dst.write(src.read())
+    assert cache.key(copy, CONFIG) == cache.key(program, CONFIG)
+
+
+@pytest.mark.parametrize("change", [
+    {"ram_size_words": 65},
+    {"word_bits": 16},
+    {"faults": []},
+    {"faults": CONFIG["faults"][:1]},
+    {"faults": [{"addr": 3, "bit": 0, "type": "STUCK_AT_0"}, CONFIG["faults"][1]]},
+    {"faults": [{"addr": 3, "bit": 1, "type": "STUCK_AT_1"}, CONFIG["faults"][1]]},
+    {"faults": CONFIG["faults"] + [{"addr": 8, "bit": 0, "type": "TRANSITION_0_TO_1"}]},
+])
+def test_key_follows_config(cache, program, change):
+    assert cache.key(program, dict(CONFIG, **change)) != cache.key(program, CONFIG)
+
+
+def test_key_follows_engine_version(cache, program, monkeypatch):
+    key = cache.key(program, CONFIG)
+    cache.put(key, RESULT)
+    monkeypatch.setattr(result_cache, "ENGINE_VERSION", result_cache.ENGINE_VERSION + 1)
+    assert cache.key(program, CONFIG) != key
+    assert cache.get(cache.key(program, CONFIG)) is None
+
+
+def test_put_get_survives_reopen(tmp_path, cache, program):
+    key = cache.key(program, CONFIG)
+    assert cache.get(key) is None
+    cache.put(key, RESULT)
+    assert cache.get(key) == RESULT
+    cache.close()
+
+    reopened = ResultCache(str(tmp_path / "results.sqlite"))
+    try:
+        assert reopened.get(key) == RESULT
+        assert reopened.stats()["entries"] == 1
+    finally:
+        reopened.close()
+
+
+def test_evicts_least_recently_used(cache, clock):
+    # Случайные данные почти не сжимаются: записи примерно одного размера
+    results = {name: {"test": name, "blob": os.urandom(512).hex()} for name in "abcd"}
+    cache.put("a", results["a"])
+    cache.put("b", results["b"])
+    cache.put("c", results["c"])
+    # Обращение к a делает самой старой b
+    assert cache.get("a") == results["a"]
+
+    full = cache.stats()["bytes"]
+    cache.max_bytes = full + 64
+    cache.put("d", results["d"])
+
+    assert cache.get("b") is None
+    for name in "acd":
+        assert cache.get(name) == results[name]
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= cache.max_bytes
+
+
+def test_evicts_until_under_limit(cache, clock):
+    for i in range(10):
+        cache.put(f"k{i}", {"test": str(i), "blob": os.urandom(512).hex()})
+    one = cache.stats()["bytes"] // 10
+    cache.max_bytes = 3 * one + one // 2
+    cache.put("last", {"test": "last", "blob": os.urandom(512).hex()})
+
+    # Остаются самые новые записи
+    assert cache.stats()["entries"] == 3
+    assert [cache.get(f"k{i}") is not None for i in range(10)] == [False] * 8 + [True] * 2
+    assert cache.get("last") is not None
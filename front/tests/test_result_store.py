@@ -0,0 +1,144 @@
+# tests/test_result_store.py
+"""ResultStore: фильтры журнала по тесту и адресу, постраничное чтение и потоковый экспорт."""
+import csv
+import io
+import json
+import pytest
+from app.core.result_store import ResultStore, RUN_COLUMNS, config_hash
+
+CONFIG = {"ram_size_words": 16, "faults": [{"addr": 3, "bit": 0, "type": "STUCK_AT_1"}]}
+
+
+class Writes(io.StringIO):
+    """Текстовый файл, запоминающий каждый вызов write."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def write(self, s):
+        self.calls.append(s)
+        return super().write(s)
+
+
+@pytest.fixture
+def store():
+    store = ResultStore()
+    # id: 1..4
+    store.add_run("march_x", [3, 3, 5], CONFIG, timestamp=1000.0)
+    store.add_run("test", [5], CONFIG, timestamp=1001.0)
+    store.add_run("march_x", [], CONFIG, timestamp=1002.0)
+    store.add_run("march_x", [7, 5, 5, 5], None, timestamp=1003.0)
+    yield store
+    store.close()
+
+
+def ids(rows):
+    return [row[0] for row in rows]
+
+
+def test_add_run_summary(store):
+    run = store.run(1)
+    assert run == {"id": 1, "timestamp": 1000.0, "test": "march_x", "ram_size_words": 16,
+                   "config_hash": config_hash(CONFIG), "events": 3, "cells": 2}
+    assert store.error_counts(1) == {3: 2, 5: 1}
+    assert store.error_counts(3) == {}
+    assert store.run(4)["config_hash"] == "" and store.run(4)["ram_size_words"] is None
+    assert store.run(99) is None
+    assert store.tests() == ["march_x", "test"]
+
+
+@pytest.mark.parametrize("test, addr, expected", [
+    (None, None, [4, 3, 2, 1]),
+    ("march_x", None, [4, 3, 1]),
+    ("test", None, [2]),
+    ("nope", None, []),
+    (None, 5, [4, 2, 1]),
+    (None, 3, [1]),
+    (None, 7, [4]),
+    (None, 0, []),
+    ("march_x", 5, [4, 1]),
+    ("test", 3, []),
+])
+def test_filters(store, test, addr, expected):
+    assert ids(store.runs(test, addr)) == expected
+    assert store.count(test, addr) == len(expected)
+
+
+def test_pages(store):
+    assert ids(store.runs(limit=2)) == [4, 3]
+    assert ids(store.runs(before_id=3, limit=2)) == [2, 1]
+    assert ids(store.runs("march_x", 5, before_id=4)) == [1]
+
+
+def test_config_hash_ignores_fault_order():
+    faults = [{"addr": 1, "bit": 2, "type": "STUCK_AT_0"}, {"addr": 3, "bit": 0, "type": "STUCK_AT_1"}]
+    assert config_hash(dict(CONFIG, faults=faults)) == config_hash(dict(CONFIG, faults=faults[::-1]))
+    assert config_hash(dict(CONFIG, faults=faults)) != config_hash(CONFIG)
+
+
+def test_export_csv(store):
+    f = io.StringIO()
+    store.export_csv(f)
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert tuple(rows[0]) == RUN_COLUMNS + ("addr", "count")
+    # По строке на (прогон, адрес), прогон без ошибок — строка с пустым адресом
+    assert [(r[0], r[-2], r[-1]) for r in rows[1:]] == [
+        ("4", "5", "3"), ("4", "7", "1"), ("3", "", ""), ("2", "5", "1"), ("1", "3", "2"), ("1", "5", "1")]
+
+
+def test_export_csv_filtered(store):
+    f = io.StringIO()
+    store.export_csv(f, test="march_x", addr=5)
+    rows = list(csv.reader(io.StringIO(f.getvalue())))[1:]
+    # Фильтр по адресу отбирает прогоны, но выгружаются все их адреса
+    assert [(r[0], r[-2]) for r in rows] == [("4", "5"), ("4", "7"), ("1", "3"), ("1", "5")]
+
+
+def test_export_json(store):
+    f = Writes()
+    store.export_json(f)
+    records = json.loads(f.getvalue())
+    assert [r["id"] for r in records] == [4, 3, 2, 1]
+    assert records[0]["errors"] == {"0x0005": 3, "0x0007": 1}
+    assert records[1]["errors"] == {}
+    assert {k: v for k, v in records[3].items() if k != "errors"} == store.run(1)
+    # Потоковая запись: каждый прогон — отдельным write, а не одна собранная строка
+    assert sum(1 for s in f.calls if s.startswith("{")) == 4
+    assert max(map(len, f.calls)) < len(f.getvalue()) / 2
+
+
+def test_export_json_filtered(store):
+    f = io.StringIO()
+    store.export_json(f, test="march_x", addr=3)
+    assert [r["id"] for r in json.loads(f.getvalue())] == [1]
+
+    empty = io.StringIO()
+    store.export_json(empty, test="nope")
+    assert json.loads(empty.getvalue()) == []
+
+
+def test_export_streams_large_store():
+    store = ResultStore()
+    try:
+        for i in range(2000):
+            store.add_run(f"t{i % 3}", [i % 64, (i * 7) % 64], CONFIG, timestamp=float(i))
+        f = Writes()
+        store.export_json(f, test="t1")
+        records = json.loads(f.getvalue())
+        assert len(records) == store.count(test="t1") == 667
+        assert max(map(len, f.calls)) < 200
+
+        f = io.StringIO()
+        store.export_csv(f, addr=0)
+        rows = list(csv.reader(io.StringIO(f.getvalue())))[1:]
+        assert {r[0] for r in rows} == {str(row[0]) for row in store.runs(addr=0)}
+    finally:
+        store.close()
+
+
+def test_clear(store):
+    store.clear()
+    assert store.count() == 0
+    assert store.error_counts(1) == {}
+    assert store.tests() == []
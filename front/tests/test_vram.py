@@ -0,0 +1,153 @@
+# tests/test_vram.py
+"""Модель неисправностей Vram: маски слов против побитовой эталонной модели."""
+import random
+import numpy as np
+import pytest
+from back_pyd.vram_backend import Vram
+
+E = Vram.ErrType
+WORD_WIDTHS = (8, 16, 32, 64)
+FAULT_TYPES = [t for name, t in E.__members__.items() if name != "NO"]
+
+# Эталон для одного бита: (бит после записи value, (хранится после чтения, возвращается))
+WRITE = {
+    E.TRANSITION_0_TO_1: lambda value: 0,
+    E.TRANSITION_1_TO_0: lambda value: 1,
+    E.WRITE_OR_READ_DESTRUCTIVE_0: lambda value: 1,
+    E.WRITE_OR_READ_DESTRUCTIVE_1: lambda value: 0,
+}
+READ = {
+    E.STUCK_AT_0: lambda stored: (stored, 0),
+    E.STUCK_AT_1: lambda stored: (stored, 1),
+    E.INCORRECT_READ_0: lambda stored: (stored, 1),
+    E.INCORRECT_READ_1: lambda stored: (stored, 0),
+    E.WRITE_OR_READ_DESTRUCTIVE_0: lambda stored: (1, 1),
+    E.WRITE_OR_READ_DESTRUCTIVE_1: lambda stored: (0, 0),
+    E.DECEPTIVE_READ_0: lambda stored: (1, stored),
+    E.DECEPTIVE_READ_1: lambda stored: (0, stored),
+}
+
+
+class Reference:
+    """Память как списки битов; каждая неисправность применяется к своему биту отдельно."""
+
+    def __init__(self, words, word_bits):
+        self.word_bits = word_bits
+        self.bits = [[0] * word_bits for _ in range(words)]
+        self.faults = {}
+
+    def write(self, i, value):
+        for b in range(self.word_bits):
+            bit = value >> b & 1
+            fault = self.faults.get((i, b))
+            self.bits[i][b] = WRITE[fault](bit) if fault in WRITE else bit
+
+    def read(self, i):
+        value = 0
+        for b in range(self.word_bits):
+            stored = self.bits[i][b]
+            fault = self.faults.get((i, b))
+            if fault in READ:
+                self.bits[i][b], stored = READ[fault](stored)
+            value |= stored << b
+        return value
+
+    def stored(self, i):
+        return sum(bit << b for b, bit in enumerate(self.bits[i]))
+
+
+@pytest.mark.parametrize("word_bits", WORD_WIDTHS)
+@pytest.mark.parametrize("faults_per_word", [1, 4])
+def test_matches_reference_model(word_bits, faults_per_word):
+    rng = random.Random(word_bits * 10 + faults_per_word)
+    words = 24
+    vram, ref = Vram(words, word_bits), Reference(words, word_bits)
+    # Каждому типу — хотя бы по слову; часть слов без неисправностей
+    for i in range(words - 4):
+        for k, b in enumerate(rng.sample(range(word_bits), faults_per_word)):
+            fault = FAULT_TYPES[(i * faults_per_word + k) % len(FAULT_TYPES)]
+            vram.set_error(i, b, fault)
+            ref.faults[(i, b)] = fault
+
+    for _ in range(4000):
+        i = rng.randrange(words)
+        if rng.random() < 0.5:
+            value = rng.getrandbits(word_bits)
+            vram.write(i, value)
+            ref.write(i, value)
+        else:
+            assert vram.read(i) == ref.read(i)
+        assert int(vram.raw_view()[i]) == ref.stored(i)
+
+
+def test_fault_free_words_have_no_side_effects():
+    vram = Vram(4)
+    vram.set_error(1, 0, E.DECEPTIVE_READ_0)
+    vram.write(0, 0x1234)
+    assert vram.read(0) == 0x1234
+    assert vram.take_dirty().tolist() == [0]
+    vram.read(0)
+    assert vram.take_dirty().tolist() == []
+    vram.read(1)
+    assert vram.take_dirty().tolist() == [1]
+
+
+def test_get_and_set_error_check_range():
+    vram = Vram(4, 8)
+    for call in (lambda: vram.get_error(4, 0), lambda: vram.get_error(0, 8),
+                 lambda: vram.set_error(4, 0, E.STUCK_AT_0), lambda: vram.set_error(0, 8, E.STUCK_AT_0)):
+        with pytest.raises(IndexError):
+            call()
+
+
+def test_clearing_last_error_frees_the_word():
+    vram = Vram(8)
+    vram.set_error(3, 1, E.STUCK_AT_1)
+    vram.set_error(3, 2, E.STUCK_AT_0)
+    assert vram.memory_stats()["faulty_words"] == 1
+    vram.set_error(3, 1, E.NO)
+    assert vram.memory_stats()["faulty_words"] == 1
+    vram.set_error(3, 2, E.NO)
+    assert vram.memory_stats()["faulty_words"] == 0
+    # get_error не создаёт записей
+    assert vram.get_error(5, 0) == E.NO
+    assert vram.memory_stats()["faulty_words"] == 0
+    assert not np.any(vram.error_map())
+
+
+def test_set_errors_matches_set_error():
+    rng = np.random.default_rng(1)
+    addrs = rng.integers(0, 64, 500).astype(np.uint32)
+    bits = rng.integers(0, 16, 500).astype(np.uint8)
+    types = rng.integers(0, len(E.__members__), 500).astype(np.uint8)
+    bulk, single = Vram(64), Vram(64)
+    bulk.set_errors(addrs, bits, types)
+    # Повторы одного бита: побеждает последний, NO снимает неисправность
+    for a, b, t in zip(addrs, bits, types):
+        single.set_error(int(a), int(b), E(int(t)))
+    assert np.array_equal(bulk.error_map(), single.error_map())
+    assert bulk.memory_stats()["faulty_words"] == single.memory_stats()["faulty_words"]
+
+
+@pytest.mark.parametrize("addrs, bits, types, error", [
+    ([0, 1], [0], [1], ValueError),
+    ([0, 16], [0, 0], [1, 1], IndexError),
+    ([0, 1], [0, 16], [1, 1], IndexError),
+    ([0, 1], [0, 0], [1, len(E.__members__)], ValueError),
+])
+def test_set_errors_validates_whole_batch(addrs, bits, types, error):
+    vram = Vram(16)
+    vram.set_error(5, 5, E.STUCK_AT_1)
+    before = vram.error_map()
+    with pytest.raises(error):
+        vram.set_errors(addrs, bits, types)
+    # Ничего не применено, даже верные записи перед ошибочной
+    assert np.array_equal(vram.error_map(), before)
+
+
+def test_clear_errors():
+    vram = Vram(16)
+    vram.set_errors([1, 2, 3], [0, 1, 2], [int(E.STUCK_AT_0)] * 3)
+    vram.clear_errors()
+    assert not np.any(vram.error_map())
+    assert vram.memory_stats()["faulty_words"] == 0